@@ -0,0 +1,88 @@
+"""Benchmark: Audio beim Kombinieren kopieren (-c copy) gegen Neucodierung nach AAC
+
+Beide Varianten kombinieren dieselben Eingaben über DownloadEngine.combine_video_audio -
+einmal mit copy_audio=True (wie bei AAC-Audiospuren, Video und Audio werden nur kopiert),
+einmal mit copy_audio=False (Audio wird mit dem AAC-Encoder von FFmpeg neu codiert, wie
+früher bei jeder MP4-Zusammenführung).
+
+Ohne --video/--audio werden Testdateien mit FFmpeg erzeugt (fragmentiertes MP4 wie
+bei YouTube-DASH-Streams, H.264 + AAC).
+
+Aufruf: python benchmarks/mux_copy_benchmark.py [--video V.mp4 --audio A.m4a] [--runs 3]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fetchio
+from stream_mux_benchmark import create_inputs
+
+MB = 1024 * 1024
+
+
+def run(engine, video_file, audio_file, output_dir, copy_audio):
+    """Einmal kombinieren, gibt (Sekunden, Größe der Ausgabe) zurück"""
+    job = fetchio.DownloadJob("https://youtu.be/benchmark00", output_dir, "mp4", "highest")
+    job.video_id = "benchmark00"
+    output_file = os.path.join(output_dir, "benchmark.mp4")
+    start = time.perf_counter()
+    try:
+        if not engine.combine_video_audio(job, video_file, audio_file, output_file, copy_audio=copy_audio):
+            raise RuntimeError("Kombinieren fehlgeschlagen")
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(output_file)
+    finally:
+        engine.cleanup_job(job)
+        if os.path.exists(output_file):
+            os.remove(output_file)
+    return elapsed, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audio kopieren gegen AAC-Neucodierung beim Kombinieren")
+    parser.add_argument("--video", help="Video-Eingabe (fragmentiertes MP4)")
+    parser.add_argument("--audio", help="Audio-Eingabe (fragmentiertes M4A, AAC)")
+    parser.add_argument("--duration", type=int, default=120, help="Länge der erzeugten Testdateien in Sekunden")
+    parser.add_argument("--runs", type=int, default=3, help="Durchläufe je Variante (Bestwert zählt)")
+    parser.add_argument("--ffmpeg", help="Pfad zu FFmpeg (Standard: Suche wie im Programm)")
+    args = parser.parse_args()
+    
+    ffmpeg_path = args.ffmpeg or fetchio.find_ffmpeg()
+    if not ffmpeg_path:
+        sys.exit("FFmpeg nicht gefunden")
+    
+    work_dir = tempfile.mkdtemp(prefix="mux_copy_benchmark_")
+    os.environ["FETCHIO_WORK_DIR"] = os.path.join(work_dir, "scratch")
+    try:
+        if args.video and args.audio:
+            video_file, audio_file = args.video, args.audio
+        else:
+            video_file, audio_file = create_inputs(ffmpeg_path, work_dir, args.duration)
+        total = os.path.getsize(video_file) + os.path.getsize(audio_file)
+        
+        engine = fetchio.DownloadEngine(ffmpeg_path)
+        if not (engine.ffmpeg_info and engine.ffmpeg_info.aac_encoder):
+            sys.exit("FFmpeg enthält keinen AAC-Encoder - Neucodierung nicht messbar")
+        print(f"Eingaben: {total / MB:.1f} MB, AAC-Encoder {engine.ffmpeg_info.aac_encoder}")
+        
+        results = {}
+        for label, copy_audio in (("AAC neu codiert", False), ("kopiert (-c copy)", True)):
+            runs = [run(engine, video_file, audio_file, work_dir, copy_audio) for _ in range(args.runs)]
+            results[label] = min(runs)
+        
+        print()
+        print(f"{'Variante':<18} {'Laufzeit':>9} {'Ausgabe':>9}")
+        baseline = None
+        for label, (elapsed, size) in results.items():
+            baseline = baseline or elapsed
+            print(f"{label:<18} {elapsed:>7.2f} s {size / MB:>6.1f} MB  x{baseline / elapsed:.1f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
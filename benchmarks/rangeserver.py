@@ -0,0 +1,105 @@
+"""Lokaler HTTP-Server mit Range-Unterstützung als Ersatz für die YouTube-Server
+
+Liefert Dateien bzw. Byte-Puffer unter festen Pfaden aus und kann jede Verbindung
+auf eine feste Rate drosseln (wie die Drosselung pro Verbindung bei YouTube).
+"""
+import os
+import re
+import threading
+import time
+import http.server
+
+
+class RangeServer:
+    """Startet einen ThreadingHTTPServer auf 127.0.0.1 mit einem freien Port
+    
+    add_file()/add_data() registrieren Inhalte und geben deren URL zurück.
+    rate_per_connection begrenzt jede einzelne Verbindung (Bytes/s, None = unbegrenzt).
+    """
+    
+    def __init__(self, rate_per_connection=None, chunk_size=64 * 1024):
+        self.rate_per_connection = rate_per_connection
+        self.chunk_size = chunk_size
+        self.contents = {}
+        self.served = 0
+        self.lock = threading.Lock()
+        
+        server = self
+        
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def log_message(self, *args):
+                pass
+            
+            def do_GET(self):
+                server.handle(self)
+        
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}/"
+    
+    def add_data(self, name, data):
+        self.contents[name] = (data, len(data))
+        return self.base_url + name
+    
+    def add_file(self, name, path):
+        self.contents[name] = (path, os.path.getsize(path))
+        return self.base_url + name
+    
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+    
+    def handle(self, request):
+        content = self.contents.get(request.path.lstrip("/"))
+        if content is None:
+            request.send_error(404)
+            return
+        source, size = content
+        
+        start, end = 0, size - 1
+        match = re.match(r"bytes=(\d+)-(\d*)", request.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            request.send_response(206)
+            request.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            request.send_response(200)
+        request.send_header("Content-Length", str(end - start + 1))
+        request.end_headers()
+        
+        began = time.perf_counter()
+        try:
+            for position, chunk in self.read(source, start, end):
+                request.wfile.write(chunk)
+                with self.lock:
+                    self.served += len(chunk)
+                if self.rate_per_connection:
+                    # Nächsten Chunk erst senden, wenn die Verbindung im Zeitplan ist
+                    due = (position + len(chunk) - start) / self.rate_per_connection
+                    elapsed = time.perf_counter() - began
+                    if due > elapsed:
+                        time.sleep(due - elapsed)
+        except OSError:
+            # Client hat die Verbindung vorzeitig geschlossen
+            pass
+    
+    def read(self, source, start, end):
+        """(Position, Chunk)-Paare für den Bereich start..end"""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            view = memoryview(source)
+            for position in range(start, end + 1, self.chunk_size):
+                yield position, view[position:min(position + self.chunk_size, end + 1)]
+            return
+        with open(source, "rb") as file:
+            file.seek(start)
+            position = start
+            while position <= end:
+                chunk = file.read(min(self.chunk_size, end + 1 - position))
+                if not chunk:
+                    break
+                yield position, chunk
+                position += len(chunk)
@@ -0,0 +1,77 @@
+"""Benchmark: einfacher Download gegen SegmentedDownloader mit mehreren Verbindungen
+
+Ein lokaler Range-Server drosselt jede Verbindung einzeln (wie YouTube). Verglichen
+werden ein sequenzieller Download über eine Verbindung (wie Stream.download() von
+PyTubeFix) und SegmentedDownloader mit unterschiedlich vielen Verbindungen.
+
+Aufruf: python benchmarks/segmented_benchmark.py [--size 8] [--rate 2] [--connections 1 2 4 8]
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fetchio
+from rangeserver import RangeServer
+
+MB = 1024 * 1024
+
+
+def single_stream(url, target_file):
+    """Datei über eine einzige Verbindung der Reihe nach herunterladen"""
+    with fetchio.requests.get(url, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        with open(target_file, "wb") as file:
+            for chunk in response.iter_content(256 * 1024):
+                file.write(chunk)
+
+
+def checksum(path):
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Einfacher gegen segmentierten Download")
+    parser.add_argument("--size", type=float, default=8, help="Dateigröße in MB")
+    parser.add_argument("--rate", type=float, default=2, help="Drosselung pro Verbindung in MB/s")
+    parser.add_argument("--connections", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Zu messende Verbindungszahlen")
+    args = parser.parse_args()
+    
+    fetchio.load_network_modules()
+    data = os.urandom(int(args.size * MB))
+    expected = hashlib.sha256(data).hexdigest()
+    server = RangeServer(args.rate * MB)
+    url = server.add_data("stream.bin", data)
+    
+    print(f"Datei {args.size:g} MB, Drosselung {args.rate:g} MB/s pro Verbindung")
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            target_file = os.path.join(temp_dir, "stream.bin")
+            runs = [("einfacher Download", lambda: single_stream(url, target_file))]
+            for connections in args.connections:
+                downloader = fetchio.SegmentedDownloader(connections=connections)
+                runs.append((f"segmentiert, {connections} Verb.",
+                             lambda downloader=downloader: downloader.download(url, target_file, len(data))))
+            
+            baseline = None
+            for label, download in runs:
+                start = time.perf_counter()
+                download()
+                elapsed = time.perf_counter() - start
+                if checksum(target_file) != expected:
+                    sys.exit(f"{label}: Datei beschädigt")
+                os.remove(target_file)
+                baseline = baseline or elapsed
+                print(f"{label:<24} {elapsed:6.2f} s  {len(data) / elapsed / MB:6.2f} MB/s  "
+                      f"x{baseline / elapsed:.1f}")
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
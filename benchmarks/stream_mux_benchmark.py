@@ -0,0 +1,155 @@
+"""Benchmark: direktes Kombinieren über Named Pipes gegen Zwischendateien
+
+Beide Varianten laden Video und Audio über SegmentedDownloader von einem lokalen
+Range-Server und kombinieren sie mit FFmpeg zu einer MP4-Datei - genau wie
+DownloadEngine.download_video:
+
+  Zwischendateien:  download_streams_parallel() + combine_video_audio() (mit ResumeJournal)
+  direkt:           stream_mux() (FIFOs; ResumeJournal nur mit --resumable-streaming)
+
+Gemessen werden Laufzeit und geschriebene/gelesene Bytes auf dem Datenträger
+(/proc/self/io, das auch die beendeten FFmpeg-Prozesse enthält). Auf tmpfs
+zählt der Kernel keine Datenträgerzugriffe - Arbeits- und Zielverzeichnis daher
+auf einem echten Dateisystem wählen (--work-dir, Standard: aktuelles Verzeichnis).
+
+Ohne --video/--audio werden Testdateien mit FFmpeg erzeugt (fragmentiertes MP4 wie
+bei YouTube-DASH-Streams, H.264 + AAC).
+
+Aufruf: python benchmarks/stream_mux_benchmark.py [--video V.mp4 --audio A.m4a] [--runs 3]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fetchio
+from rangeserver import RangeServer
+
+MB = 1024 * 1024
+
+
+def disk_io():
+    """(gelesene, geschriebene) Bytes auf dem Datenträger - enthält laut Kernel auch beendete Kindprozesse"""
+    with open("/proc/self/io") as file:
+        counters = dict(line.split(": ") for line in file.read().splitlines())
+    return int(counters["read_bytes"]), int(counters["write_bytes"])
+
+
+def create_inputs(ffmpeg_path, directory, duration):
+    """Fragmentierte Test-Eingaben (720p H.264 und AAC) erzeugen"""
+    video_file = os.path.join(directory, "video.mp4")
+    audio_file = os.path.join(directory, "audio.m4a")
+    fragmented = ["-movflags", "frag_keyframe+empty_moov+default_base_moof"]
+    print(f"Erzeuge Testdateien ({duration} s)...")
+    subprocess.run([ffmpeg_path, "-hide_banner", "-loglevel", "error", "-y",
+                    "-f", "lavfi", "-i", f"testsrc2=size=1280x720:rate=30:duration={duration}",
+                    "-c:v", "libx264", "-preset", "ultrafast", "-b:v", "8M", *fragmented, video_file],
+                   check=True)
+    subprocess.run([ffmpeg_path, "-hide_banner", "-loglevel", "error", "-y",
+                    "-f", "lavfi", "-i", f"sine=frequency=440:duration={duration}",
+                    "-c:a", "aac", "-b:a", "128k", *fragmented, audio_file],
+                   check=True)
+    return video_file, audio_file
+
+
+def run(engine, server, video_file, audio_file, output_dir, streamed):
+    """Einen Auftrag herunterladen und kombinieren, gibt (Sekunden, gelesen, geschrieben) zurück"""
+    video_stream = SimpleNamespace(url=server.add_file("video.mp4", video_file), itag=136, subtype="mp4",
+                                   filesize=os.path.getsize(video_file), audio_codec=None)
+    audio_stream = SimpleNamespace(url=server.add_file("audio.m4a", audio_file), itag=140, subtype="mp4",
+                                   filesize=os.path.getsize(audio_file), audio_codec="mp4a.40.2")
+    
+    job = fetchio.DownloadJob("https://youtu.be/benchmark00", output_dir, "mp4", "highest")
+    job.video_id = "benchmark00"
+    output_file = os.path.join(output_dir, "benchmark.mp4")
+    transfer_failed = threading.Event()
+    
+    def progress_callback(stream, chunk, remaining):
+        pass
+    
+    # Schreibcache leeren, damit Daten früherer Durchläufe nicht mitgezählt werden
+    os.sync()
+    read_before, written_before = disk_io()
+    start = time.perf_counter()
+    try:
+        if streamed:
+            if not engine.stream_mux(job, video_stream, audio_stream, output_file, transfer_failed, progress_callback):
+                raise RuntimeError("Direktes Kombinieren fehlgeschlagen")
+        else:
+            scratch = engine.scratch_dir(job)
+            temp_video_file = scratch.file("video.mp4")
+            temp_audio_file = scratch.file("audio.mp4")
+            engine.download_streams_parallel(job, [(video_stream, temp_video_file), (audio_stream, temp_audio_file)],
+                                             transfer_failed, progress_callback, job.video_id)
+            if not engine.combine_video_audio(job, temp_video_file, temp_audio_file, output_file, copy_audio=True):
+                raise RuntimeError("Kombinieren fehlgeschlagen")
+        # Zurückschreiben auf den Datenträger gehört zur Laufzeit
+        os.sync()
+        elapsed = time.perf_counter() - start
+        read_after, written_after = disk_io()
+    finally:
+        engine.cleanup_job(job)
+        if os.path.exists(output_file):
+            os.remove(output_file)
+    return elapsed, read_after - read_before, written_after - written_before
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Direktes Kombinieren gegen Zwischendateien")
+    parser.add_argument("--video", help="Video-Eingabe (fragmentiertes MP4)")
+    parser.add_argument("--audio", help="Audio-Eingabe (fragmentiertes M4A, AAC)")
+    parser.add_argument("--duration", type=int, default=120, help="Länge der erzeugten Testdateien in Sekunden")
+    parser.add_argument("--runs", type=int, default=3, help="Durchläufe je Variante (Bestwert zählt)")
+    parser.add_argument("--rate", type=float, help="Drosselung pro Verbindung in MB/s")
+    parser.add_argument("--connections", type=int, default=4, help="Verbindungen pro Stream")
+    parser.add_argument("--resumable-streaming", action="store_true",
+                        help="Direkte Variante zusätzlich ins ResumeJournal schreiben (wie fetchio --resumable-streaming)")
+    parser.add_argument("--work-dir", default=os.getcwd(), help="Verzeichnis für Ziel- und Zwischendateien")
+    parser.add_argument("--ffmpeg", help="Pfad zu FFmpeg (Standard: Suche wie im Programm)")
+    args = parser.parse_args()
+    
+    if not hasattr(os, "mkfifo"):
+        sys.exit("Named Pipes werden auf diesem System nicht unterstützt")
+    ffmpeg_path = args.ffmpeg or fetchio.find_ffmpeg()
+    if not ffmpeg_path:
+        sys.exit("FFmpeg nicht gefunden")
+    fetchio.load_network_modules()
+    
+    work_dir = tempfile.mkdtemp(prefix="mux_benchmark_", dir=args.work_dir)
+    os.environ["FETCHIO_WORK_DIR"] = os.path.join(work_dir, "scratch")
+    server = RangeServer(args.rate * MB if args.rate else None)
+    try:
+        if args.video and args.audio:
+            video_file, audio_file = args.video, args.audio
+        else:
+            video_file, audio_file = create_inputs(ffmpeg_path, work_dir, args.duration)
+        total = os.path.getsize(video_file) + os.path.getsize(audio_file)
+        print(f"Eingaben: {total / MB:.1f} MB, {args.connections} Verbindungen pro Stream, "
+              f"Drosselung {f'{args.rate} MB/s' if args.rate else 'keine'}, "
+              f"fortsetzbares direktes Kombinieren {'an' if args.resumable_streaming else 'aus'}")
+        
+        engine = fetchio.DownloadEngine(ffmpeg_path, connections=args.connections,
+                                        resumable_streaming=args.resumable_streaming)
+        results = {}
+        for label, streamed in (("Zwischendateien", False), ("direkt (FIFOs)", True)):
+            runs = [run(engine, server, video_file, audio_file, work_dir, streamed)
+                    for _ in range(args.runs)]
+            results[label] = min(runs)
+        
+        print()
+        print(f"{'Variante':<16} {'Laufzeit':>9} {'geschrieben':>12} {'gelesen':>9}")
+        for label, (elapsed, read, written) in results.items():
+            print(f"{label:<16} {elapsed:>7.2f} s {written / MB:>9.0f} MB {read / MB:>6.0f} MB")
+    finally:
+        server.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,3651 @@
+import time
+# Beginn der Startzeitmessung (StartupProfile) - vor allen übrigen Importen
+STARTUP_BEGIN = time.perf_counter()
+
 import os
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+import argparse
 import threading
 import re
 import subprocess
 import sys
-import time
-import requests
+import importlib.util
 from io import BytesIO
+from urllib.parse import urlparse, parse_qs
 from datetime import datetime
 import tempfile
 import shutil
+import json
+import sqlite3
+import hashlib
+import itertools
+import heapq
+from collections import deque, OrderedDict
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+
+class StartupProfile:
+    """Zeitmessung des Programmstarts, aufgeteilt in Phasen (Bericht im Stil von -X importtime)
+    
+    mark() schließt die laufende Phase des Startpfads ab, record() erfasst Phasen, die im
+    Hintergrund oder erst bei der ersten Nutzung laufen (z.B. FFmpeg-Suche, PyTubeFix).
+    """
+    
+    def __init__(self, start):
+        self.start = start
+        self.last = start
+        self.phases = []
+        self.lock = threading.Lock()
+    
+    def mark(self, phase):
+        now = time.perf_counter()
+        with self.lock:
+            self.phases.append((phase, now - self.last, False))
+            self.last = now
+    
+    def record(self, phase, duration):
+        with self.lock:
+            self.phases.append((phase, duration, True))
+    
+    def report(self):
+        """Bericht als Textzeilen (Dauer in ms | Phase)"""
+        with self.lock:
+            phases = list(self.phases)
+            total = self.last - self.start
+        lines = ["startup:   ms | Phase"]
+        for phase, duration, background in phases:
+            lines.append(f"startup: {duration * 1000:6.1f} | {'  (nachgelagert) ' if background else ''}{phase}")
+        lines.append(f"startup: {total * 1000:6.1f} | Gesamt (Startpfad)")
+        return lines
+    
+    def save(self, path, keep=100):
+        """Messung an die Verlaufsdatei (JSON pro Zeile) anhängen, nur die letzten keep Starts behalten"""
+        with self.lock:
+            entry = {
+                "time": time.time(),
+                "total": self.last - self.start,
+                "phases": [{"phase": phase, "seconds": duration, "background": background}
+                           for phase, duration, background in self.phases],
+            }
+        try:
+            lines = []
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    lines = f.read().splitlines()
+            lines = lines[-(keep - 1):] + [json.dumps(entry)]
+            temp_path = path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Startzeiten konnten nicht gespeichert werden: {e}")
+
+
+STARTUP = StartupProfile(STARTUP_BEGIN)
+
+_network_modules_lock = threading.Lock()
+_network_modules_loaded = False
+
+
+def load_network_modules():
+    """PyTubeFix und requests erst bei der ersten Netzwerkaktion importieren (verkürzt den Start)"""
+    global _network_modules_loaded, requests, YouTube, Playlist, Channel, Stream, StreamQuery, Monostate
+    
+    with _network_modules_lock:
+        if _network_modules_loaded:
+            return
+        start = time.perf_counter()
+        
+        import requests
+        from pytubefix import YouTube, Playlist, Channel, Stream, StreamQuery
+        from pytubefix.monostate import Monostate
+        
+        _network_modules_loaded = True
+        STARTUP.record("PyTubeFix/requests importiert (erste Nutzung)", time.perf_counter() - start)
+
+
+def load_gui_modules():
+    """Tkinter und Pillow erst für die grafische Oberfläche importieren (Headless-Modus braucht sie nicht)"""
+    global tk, ttk, filedialog, messagebox, Image, ImageTk
+    
+    import tkinter as tk
+    from tkinter import ttk, filedialog, messagebox
+    
+    # PIL für Thumbnails
+    try:
+        from PIL import Image, ImageTk
+    except ImportError:
+        print("Pillow nicht gefunden! Installiere mit: pip install pillow")
+        sys.exit(1)
+
+
+# Audio-Codecs, die ohne Neucodierung in einen MP4-Container kopiert werden können
+MP4_AUDIO_CODECS = ("mp4a",)
+
+# Dateiendung für die unveränderte Audiospur je Codec (Modus "Audio (Original)")
+NATIVE_AUDIO_EXTENSIONS = {"mp4a": "m4a", "opus": "opus", "vorbis": "ogg"}
+
+# Muster für gültige YouTube-URLs
+YOUTUBE_URL_PATTERN = re.compile(r'^(https?://)?(www\.)?(youtube\.com|youtu\.be)/.+$')
+
+# Playlists (youtube.com/playlist?list=...) und Kanäle (/@name, /channel/ID, /c/name, /user/name)
+PLAYLIST_URL_PATTERN = re.compile(r'^(https?://)?(www\.|m\.)?youtube\.com/playlist\?(.*&)?list=[\w-]+')
+CHANNEL_URL_PATTERN = re.compile(r'^(https?://)?(www\.|m\.)?youtube\.com/(@[^/?]+|channel/[\w-]+|c/[^/?]+|user/[^/?]+)')
+
+# Video-IDs: genau 11 Zeichen; Pfade, unter denen youtube.com die ID im Pfad führt (/shorts/<id> usw.)
+VIDEO_ID_PATTERN = re.compile(r'^[0-9A-Za-z_-]{11}$')
+VIDEO_ID_PATHS = ("shorts", "embed", "live", "v")
+
+
+def find_resource_path(filename):
+    """Findet den Pfad zu einer Ressourcendatei"""
+    # Prüfen, ob die Anwendung als exe ausgeführt wird
+    if getattr(sys, 'frozen', False):
+        # Im ausführbaren Verzeichnis suchen
+        base_dir = os.path.dirname(sys.executable)
+    else:
+        # Im Skriptverzeichnis suchen
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+    
+    # Verschiedene mögliche Pfade ausprobieren
+    paths = [
+        os.path.join(base_dir, filename),
+        os.path.join(base_dir, "resources", filename),
+    ]
+    
+    for path in paths:
+        if os.path.exists(path):
+            return path
+    
+    return None
+
+
+def ffmpeg_candidates():
+    """Mögliche FFmpeg-Pfade in der Reihenfolge ihrer Priorität"""
+    if os.name == "nt":  # Windows
+        ffmpeg_paths = [
+            "resources/windows/bin/ffmpeg.exe",
+            "resources/ffmpeg.exe",
+            "ffmpeg.exe",
+            os.path.join(os.path.dirname(sys.executable), "ffmpeg.exe"),
+            find_resource_path("resources/windows/bin/ffmpeg.exe"),
+            find_resource_path("resources/ffmpeg.exe")
+        ]
+    else:  # macOS/Linux
+        ffmpeg_paths = [
+            "resources/ffmpeg/mac/ffmpeg",
+            "resources/ffmpeg",
+            "ffmpeg",
+            "/usr/bin/ffmpeg",
+            "/usr/local/bin/ffmpeg",
+            "/opt/local/bin/ffmpeg",
+            "/opt/homebrew/bin/ffmpeg",
+            os.path.join(os.path.dirname(sys.executable), "ffmpeg"),
+            find_resource_path("resources/ffmpeg/mac/ffmpeg"),
+            find_resource_path("resources/ffmpeg")
+        ]
+    
+    # System-FFmpeg aus dem Suchpfad (PATH) zuletzt
+    ffmpeg_paths.append(shutil.which("ffmpeg"))
+    
+    # None-Werte herausfiltern, relative Pfade in absolute umwandeln
+    return [os.path.abspath(path) for path in ffmpeg_paths if path]
+
+
+def find_ffmpeg():
+    """FFmpeg im System finden (Pfad oder None)
+    
+    Nur vorhandene Dateien werden geprüft; Version und Fähigkeiten bereits bekannter
+    Programme kommen aus der FFmpegRegistry, ohne FFmpeg erneut zu starten.
+    """
+    for path in ffmpeg_candidates():
+        if not os.path.isfile(path):
+            continue
+        info = FFMPEG_REGISTRY.info(path)
+        if info:
+            print(f"FFmpeg gefunden unter: {path} (Version {info.version})")
+            return path
+    
+    # FFmpeg nicht gefunden
+    print("Warnung: FFmpeg nicht gefunden. MP3-Konvertierung nicht möglich.")
+    return None
+
+
+def get_cache_dir(*subdirs):
+    """Cache-Verzeichnis der Anwendung ermitteln (wird bei Bedarf angelegt)"""
+    if os.name == "nt":  # Windows
+        base_dir = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        path = os.path.join(base_dir, "Fetch.io", *subdirs)
+    else:  # macOS/Linux
+        base_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        path = os.path.join(base_dir, "fetchio", *subdirs)
+    
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def write_json_atomic(path, data):
+    """JSON-Datei atomar schreiben (erst temporär, dann umbenennen)"""
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class FFmpegInfo:
+    """Version und Fähigkeiten eines FFmpeg-Programms (Encoder, Muxer, -progress)"""
+    
+    # Bevorzugte Encoder je Zielformat, in absteigender Reihenfolge
+    AAC_ENCODERS = ("aac_at", "libfdk_aac", "aac")
+    MP3_ENCODERS = ("libmp3lame", "libshine", "mp3_mf")
+    
+    # Muxer, den FFmpeg anhand der Dateiendung wählt
+    MUXERS_BY_EXTENSION = {"m4a": "ipod", "mp4": "mp4", "mp3": "mp3", "opus": "opus", "ogg": "ogg"}
+    
+    def __init__(self, path, version, encoders, muxers, progress):
+        self.path = path
+        self.version = version
+        self.encoders = frozenset(encoders)
+        self.muxers = frozenset(muxers)
+        self.progress = progress
+    
+    def to_dict(self):
+        return {
+            "version": self.version,
+            "encoders": sorted(self.encoders),
+            "muxers": sorted(self.muxers),
+            "progress": self.progress,
+        }
+    
+    def select_encoder(self, names):
+        """Ersten verfügbaren Encoder aus names liefern (None, falls keiner vorhanden ist)"""
+        for name in names:
+            if name in self.encoders:
+                return name
+        return None
+    
+    @property
+    def aac_encoder(self):
+        return self.select_encoder(self.AAC_ENCODERS)
+    
+    @property
+    def mp3_encoder(self):
+        return self.select_encoder(self.MP3_ENCODERS)
+    
+    def has_muxer(self, name):
+        return name in self.muxers
+    
+    def can_write(self, extension):
+        """Prüfen, ob FFmpeg Dateien mit dieser Endung schreiben kann"""
+        return self.has_muxer(self.MUXERS_BY_EXTENSION.get(extension, extension))
+
+
+class FFmpegRegistry:
+    """Zwischenspeicher für Version und Fähigkeiten von FFmpeg-Programmen (ffmpeg.json)
+    
+    Schlüssel ist der Programmpfad; ein Eintrag gilt, solange Änderungszeit und Größe
+    der Datei unverändert sind. Erst dann wird FFmpeg erneut gestartet und abgefragt.
+    """
+    
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = None
+        self.infos = {}
+        self.lock = threading.Lock()
+    
+    def _load(self):
+        """Einträge beim ersten Zugriff aus der Datei lesen"""
+        if self.entries is not None:
+            return
+        if self.path is None:
+            self.path = os.path.join(get_cache_dir(), "ffmpeg.json")
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+    
+    def _save(self):
+        # Einträge für nicht mehr vorhandene Programme verwerfen
+        self.entries = {path: entry for path, entry in self.entries.items() if os.path.exists(path)}
+        try:
+            write_json_atomic(self.path, self.entries)
+        except OSError as e:
+            print(f"FFmpeg-Informationen konnten nicht gespeichert werden: {e}")
+    
+    def info(self, path):
+        """FFmpegInfo für das Programm unter path (None, wenn es nicht funktioniert)"""
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = [stat.st_mtime_ns, stat.st_size]
+        
+        with self.lock:
+            self._load()
+            entry = self.entries.get(path)
+            if entry and entry.get("key") == key:
+                info = self.infos.get(path)
+                if info is None:
+                    info = self.infos[path] = FFmpegInfo(path, entry["version"], entry["encoders"],
+                                                         entry["muxers"], entry["progress"])
+                return info
+            
+            info = self.probe(path)
+            if info is None:
+                return None
+            self.infos[path] = info
+            self.entries[path] = dict(info.to_dict(), key=key)
+            self._save()
+            return info
+    
+    @staticmethod
+    def probe(path):
+        """FFmpeg starten und Version, Encoder, Muxer und -progress-Unterstützung abfragen"""
+        def run(*arguments):
+            result = subprocess.run(
+                [path, "-hide_banner", *arguments],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                timeout=10,
+                check=False
+            )
+            if result.returncode != 0:
+                raise RuntimeError(f"Exit-Code {result.returncode}")
+            return result.stdout.decode("utf-8", errors="replace")
+        
+        def names(output, separator):
+            # Tabelle nach der Trennzeile: "<Flags> <Name> <Beschreibung>"
+            lines = output.splitlines()
+            for index, line in enumerate(lines):
+                if line.strip() == separator:
+                    lines = lines[index + 1:]
+                    break
+            return [line.split()[1] for line in lines if len(line.split()) >= 2]
+        
+        print(f"Prüfe FFmpeg unter: {path}")
+        try:
+            version_match = re.search(r"version (\S+)", run("-version"))
+            encoders = names(run("-encoders"), "------")
+            muxers = names(run("-muxers"), "---")
+            progress = "-progress" in run("-h", "long")
+        except Exception as e:
+            print(f"Fehler beim Testen von FFmpeg unter {path}: {e}")
+            return None
+        
+        return FFmpegInfo(path, version_match.group(1) if version_match else "unbekannt",
+                          encoders, muxers, progress)
+
+
+FFMPEG_REGISTRY = FFmpegRegistry()
+
+
+class ResumeJournal:
+    """Persistentes Journal der bereits geladenen Byte-Bereiche eines Streams
+    
+    Schlüssel ist Video-ID + itag + Dateigröße. Neben dem Journal (.json) liegt die
+    vorbelegte Teildatei (.part), die nach Abschluss an ihr Ziel verschoben wird.
+    Gleichzeitige Aufträge mit demselben Schlüssel (z.B. doppelte URL, MP4 und Audio mit
+    demselben Audio-Stream) schließen sich über claim()/release() und eine Sperrdatei
+    (.lock mit der Prozess-ID) gegenseitig aus.
+    """
+    
+    def __init__(self, directory, video_id, itag, filesize):
+        key = f"{re.sub(r'[^A-Za-z0-9_-]', '_', str(video_id))}_{itag}_{filesize}"
+        self.filesize = filesize
+        self.partial_file = os.path.join(directory, key + ".part")
+        self.journal_file = os.path.join(directory, key + ".json")
+        self.lock_file = os.path.join(directory, key + ".lock")
+        self.claimed = False
+        self.segments = []
+        self.lock = threading.Lock()
+    
+    def claim(self):
+        """Journal exklusiv beanspruchen, False falls es ein anderer Auftrag gerade verwendet"""
+        for _ in range(2):
+            try:
+                fd = os.open(self.lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    with open(self.lock_file, "r", encoding="utf-8") as f:
+                        pid = int(f.read())
+                except FileNotFoundError:
+                    continue
+                except (OSError, ValueError):
+                    # Wird gerade angelegt (noch ohne Prozess-ID) - als belegt ansehen
+                    return False
+                if process_alive(pid):
+                    return False
+                # Sperre eines abgestürzten Programmlaufs übernehmen
+                self._remove(self.lock_file)
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(str(os.getpid()))
+            self.claimed = True
+            return True
+        return False
+    
+    def release(self):
+        """Mit claim() erhaltene Sperre freigeben (Teildatei und Journal bleiben erhalten)"""
+        if self.claimed:
+            self._remove(self.lock_file)
+            self.claimed = False
+    
+    def load(self):
+        """Gespeicherte Segmente [start, ende, position] laden, falls ein gültiger Zwischenstand existiert"""
+        try:
+            with open(self.journal_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            
+            if (data.get("filesize") != self.filesize
+                    or not os.path.exists(self.partial_file)
+                    or os.path.getsize(self.partial_file) != self.filesize):
+                return None
+            
+            segments = [list(map(int, segment)) for segment in data["segments"]]
+            # Positionen müssen innerhalb ihres Segments liegen
+            if not all(start <= position <= end + 1 for start, end, position in segments):
+                return None
+            
+            self.segments = segments
+            return self.segments
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    def start(self, segments):
+        """Neues Journal für die angegebenen Segmente anlegen"""
+        with self.lock:
+            self.segments = [[start, end, start] for start, end in segments]
+            self._save()
+        return self.segments
+    
+    def update(self, index, position):
+        """Bestätigten Fortschritt eines Segments festhalten (Daten müssen bereits auf Platte sein)"""
+        with self.lock:
+            self.segments[index][2] = position
+            self._save()
+    
+    def fill(self, position):
+        """Der Reihe nach bis position geladene Bytes in allen Segmenten bestätigen (Daten müssen bereits auf Platte sein)"""
+        with self.lock:
+            for segment in self.segments:
+                start, end, current = segment
+                segment[2] = max(current, min(max(position, start), end + 1))
+            self._save()
+    
+    def completed_bytes(self):
+        """Anzahl der bereits bestätigten Bytes"""
+        return sum(position - start for start, _, position in self.segments)
+    
+    def contiguous_bytes(self):
+        """Anzahl der ab Byte 0 lückenlos bestätigten Bytes (fortsetzbar für SegmentedDownloader.stream)"""
+        position = 0
+        for start, end, current in sorted(self.segments):
+            if start > position:
+                break
+            position = max(position, current)
+            if current <= end:
+                break
+        return position
+    
+    def finish(self, target_file):
+        """Fertige Teildatei an ihr Ziel verschieben und Journal entfernen"""
+        if os.path.exists(target_file):
+            os.remove(target_file)
+        shutil.move(self.partial_file, target_file)
+        self._remove(self.journal_file)
+    
+    def discard(self):
+        """Teildatei und Journal verwerfen"""
+        self._remove(self.partial_file)
+        self._remove(self.journal_file)
+    
+    def _save(self):
+        write_json_atomic(self.journal_file, {
+            "filesize": self.filesize,
+            "segments": self.segments,
+            "updated": time.time()
+        })
+    
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    
+    @staticmethod
+    def prune(directory, max_age=7 * 24 * 3600):
+        """Veraltete Zwischenstände (Teildatei + Journal) löschen"""
+        now = time.time()
+        for filename in os.listdir(directory):
+            if not filename.endswith((".part", ".json", ".tmp", ".lock")):
+                continue
+            filepath = os.path.join(directory, filename)
+            try:
+                if now - os.path.getmtime(filepath) > max_age:
+                    os.remove(filepath)
+                    print(f"Veralteter Download-Zwischenstand gelöscht: {filepath}")
+            except OSError as e:
+                print(f"Fehler beim Löschen von {filepath}: {e}")
+
+
+class RangeNotSupportedError(Exception):
+    """Server beantwortet HTTP-Range-Anfragen nicht mit 206 Partial Content"""
+    pass
+
+
+class BandwidthLimiter:
+    """Globale Begrenzung der Download-Bandbreite (Token-Bucket)
+    
+    Jede Übertragung verbraucht pro empfangenem Chunk entsprechend viele Tokens (Bytes) und
+    wartet, falls keine mehr übrig sind. Wartende Anfragen werden per Start-Time Fair
+    Queueing bedient: jeder Datenfluss (z.B. ein Auftrag) erhält Bandbreite im Verhältnis
+    seines Gewichts, unabhängig von der Anzahl seiner Verbindungen. rate=None bedeutet
+    unbegrenzt; die Grenze kann jederzeit mit set_rate() geändert werden.
+    """
+    
+    def __init__(self, rate=None, burst_time=0.1, min_burst=64 * 1024):
+        self.condition = threading.Condition()
+        self.burst_time = burst_time
+        self.min_burst = min_burst
+        self.rate = None
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        # Virtuelle Zeit (Start-Tag der zuletzt bedienten Anfrage) und End-Tags je Datenfluss
+        self.virtual_time = 0.0
+        self.finish_tags = {}
+        self.waiting = []
+        self.sequence = itertools.count()
+        self.set_rate(rate)
+    
+    @property
+    def burst(self):
+        """Maximale Anzahl angesparter Tokens (Bytes)"""
+        return max(self.rate * self.burst_time, self.min_burst)
+    
+    def set_rate(self, rate):
+        """Grenze in Bytes/s setzen (None oder 0 = unbegrenzt), wirkt sofort auf wartende Übertragungen"""
+        with self.condition:
+            self._refill()
+            self.rate = float(rate) if rate and rate > 0 else None
+            if self.rate:
+                self.tokens = min(self.tokens, self.burst)
+            self.condition.notify_all()
+    
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def acquire(self, amount, flow=None, weight=1.0, cancel_event=None):
+        """amount Bytes für den Datenfluss flow verbrauchen, blockiert bis die Tokens verfügbar sind
+        
+        Wird cancel_event während des Wartens gesetzt, kehrt acquire() sofort zurück, damit ein
+        Abbruch nicht auf die gedrosselte Übertragung warten muss.
+        """
+        if self.rate is None:
+            return
+        
+        with self.condition:
+            # Start-Tag: frühestens jetzt (virtuelle Zeit), spätestens nach der letzten Anfrage des Flusses
+            start = max(self.virtual_time, self.finish_tags.get(flow, 0.0))
+            self.finish_tags[flow] = start + amount / max(weight, 0.01)
+            ticket = (start, next(self.sequence))
+            heapq.heappush(self.waiting, ticket)
+            
+            try:
+                while self.rate is not None and not (cancel_event and cancel_event.is_set()):
+                    self._refill()
+                    # Chunks größer als der Puffer dürfen die Tokens ins Minus ziehen (Schulden)
+                    needed = min(amount, self.burst) - self.tokens
+                    if self.waiting[0] == ticket:
+                        if needed <= 0:
+                            self.tokens -= amount
+                            break
+                        timeout = needed / self.rate
+                    else:
+                        timeout = None
+                    # Mit cancel_event in kurzen Abständen auf Abbruch prüfen
+                    if cancel_event:
+                        timeout = min(timeout or 0.1, 0.1)
+                    self.condition.wait(timeout)
+            finally:
+                self.waiting.remove(ticket)
+                heapq.heapify(self.waiting)
+                self.virtual_time = max(self.virtual_time, start)
+                
+                # End-Tags inaktiver Flüsse verwerfen, sobald die virtuelle Zeit sie überholt hat
+                if len(self.finish_tags) > 256:
+                    self.finish_tags = {key: tag for key, tag in self.finish_tags.items()
+                                        if tag > self.virtual_time}
+                self.condition.notify_all()
+
+
+# Gemeinsame Bandbreitengrenze aller Übertragungen (Streams, Thumbnails, FFmpeg-Download)
+BANDWIDTH = BandwidthLimiter()
+
+
+def rate_value(rate):
+    """Bandbreite wie "500K", "2M" oder "1.5M" (Bytes/s) in Bytes/s umrechnen, 0 = unbegrenzt"""
+    match = re.match(r"^\s*(\d+(?:\.\d+)?)\s*([KMG]?)(?:i?B)?(?:/s)?\s*$", str(rate), re.IGNORECASE)
+    if not match:
+        raise argparse.ArgumentTypeError(f"Ungültige Bandbreite: {rate}")
+    factor = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}[match.group(2).upper()]
+    return int(float(match.group(1)) * factor)
+
+
+class SegmentedDownloader:
+    """Lädt eine Datei über mehrere parallele HTTP-Range-Verbindungen herunter
+    
+    throttle(anzahl_bytes) wird nach jedem empfangenen Chunk aufgerufen und kann blockieren,
+    um die Übertragung zu drosseln (z.B. BandwidthLimiter.acquire).
+    """
+    
+    def __init__(self, connections=4, chunk_size=256 * 1024, min_segment_size=1024 * 1024,
+                 timeout=30, max_retries=3, checkpoint_size=4 * 1024 * 1024, throttle=None):
+        self.connections = max(1, int(connections))
+        self.throttle = throttle
+        self.chunk_size = chunk_size
+        self.min_segment_size = min_segment_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        # Nach so vielen Bytes pro Segment wird der Fortschritt im Journal gesichert
+        self.checkpoint_size = checkpoint_size
+    
+    def split_segments(self, filesize):
+        """Teilt die Dateigröße in zusammenhängende Byte-Bereiche (start, ende inklusive) auf"""
+        # Nicht mehr Verbindungen als sinnvoll große Segmente
+        count = max(1, min(self.connections, filesize // self.min_segment_size))
+        segment_size = -(-filesize // count)  # Aufrunden
+        
+        segments = []
+        for start in range(0, filesize, segment_size):
+            segments.append((start, min(start + segment_size, filesize) - 1))
+        return segments
+    
+    def download(self, url, target_file, filesize, progress_callback=None, journal=None):
+        """Datei segmentiert herunterladen
+        
+        progress_callback(bytes_downloaded) wird nach jedem Chunk aufgerufen und darf eine
+        Exception auslösen, um den Download abzubrechen. Mit einem ResumeJournal wird ein
+        früherer Zwischenstand fortgesetzt und der Fortschritt laufend gesichert.
+        """
+        if not filesize or filesize <= 0:
+            raise RangeNotSupportedError("Dateigröße unbekannt")
+        load_network_modules()
+        
+        segments = journal.load() if journal else None
+        write_file = journal.partial_file if journal else target_file
+        
+        if segments:
+            print(f"Setze Download fort: {journal.completed_bytes()} von {filesize} Bytes bereits vorhanden")
+        else:
+            # Zieldatei in voller Größe vorbelegen, damit alle Segmente direkt hineinschreiben können
+            with open(write_file, "wb") as f:
+                f.truncate(filesize)
+            
+            ranges = self.split_segments(filesize)
+            if journal:
+                segments = journal.start(ranges)
+            else:
+                segments = [[start, end, start] for start, end in ranges]
+        
+        progress_lock = threading.Lock()
+        failed = threading.Event()
+        downloaded = [sum(position - start for start, _, position in segments)]
+        
+        def add_progress(length):
+            with progress_lock:
+                downloaded[0] += length
+                total = downloaded[0]
+            if progress_callback:
+                progress_callback(total)
+        
+        # Bereits vorhandene Bytes sofort melden
+        if downloaded[0] and progress_callback:
+            progress_callback(downloaded[0])
+        
+        # Eine vollständige 200-Antwort (Range ignoriert) ist nur bei einem einzigen Segment brauchbar
+        allow_full_response = len(segments) == 1
+        
+        errors = []
+        
+        def segment_worker(index):
+            try:
+                self._download_segment(url, write_file, segments, index, add_progress, failed,
+                                       journal, allow_full_response)
+            except Exception as e:
+                # Ursprünglichen Fehler merken und übrige Segmente beim nächsten Chunk beenden
+                if not failed.is_set():
+                    errors.append(e)
+                failed.set()
+        
+        pending = [index for index, (_, end, position) in enumerate(segments) if position <= end]
+        if pending:
+            with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+                for index in pending:
+                    executor.submit(segment_worker, index)
+        
+        if failed.is_set():
+            raise errors[0] if errors else Exception("Segmentierter Download fehlgeschlagen")
+        
+        if downloaded[0] != filesize:
+            raise Exception(f"Unvollständiger Download: {downloaded[0]} von {filesize} Bytes")
+        
+        if journal:
+            journal.finish(target_file)
+        
+        return target_file
+    
+    def stream(self, url, filesize, write, progress_callback=None, block_size=None, journal=None):
+        """Datei in der richtigen Reihenfolge an write(data) übergeben (z.B. in eine Pipe)
+        
+        Blöcke werden über mehrere Verbindungen parallel geladen, aber der Reihe nach
+        weitergegeben; höchstens 2 Blöcke pro Verbindung liegen gleichzeitig im Speicher.
+        
+        Mit einem ResumeJournal landet jeder Block vor der Weitergabe zusätzlich in dessen
+        Teildatei und wird laufend bestätigt (kostet so viele Schreibzugriffe wie eine
+        Zwischendatei). Ein späterer Aufruf mit demselben Journal gibt den lückenlos
+        vorhandenen Anfang aus der Teildatei weiter und lädt nur den Rest.
+        """
+        if not filesize or filesize <= 0:
+            raise RangeNotSupportedError("Dateigröße unbekannt")
+        load_network_modules()
+        
+        if not block_size:
+            # Kleine Blöcke, damit die ersten Daten schnell ankommen und sich die Verbindungen
+            # gleichmäßig auslasten; große Dateien mit bis zu 2 MB pro Anfrage
+            block_size = max(self.chunk_size, min(2 * 1024 * 1024, filesize // (self.connections * 8)))
+        
+        progress_lock = threading.Lock()
+        failed = threading.Event()
+        downloaded = [0]
+        
+        def add_progress(length):
+            with progress_lock:
+                downloaded[0] += length
+                total = downloaded[0]
+            if progress_callback:
+                progress_callback(total)
+        
+        # In die Teildatei geschriebene (bzw. ohne Journal weitergegebene) und im Journal bestätigte Bytes
+        fed = [0]
+        checkpoint_position = [0]
+        part = None
+        resume_position = 0
+        if journal:
+            if journal.load():
+                resume_position = journal.contiguous_bytes()
+            if resume_position:
+                part = open(journal.partial_file, "r+b")
+            else:
+                # Teildatei wie bei download() in voller Größe vorbelegen und der Reihe nach füllen
+                part = open(journal.partial_file, "wb")
+                part.truncate(filesize)
+                journal.start(self.split_segments(filesize))
+        
+        if resume_position:
+            print(f"Setze Download fort: {resume_position} von {filesize} Bytes bereits vorhanden")
+            try:
+                # Vorhandenen Anfang aus der Teildatei weitergeben
+                while fed[0] < resume_position:
+                    data = part.read(min(block_size, resume_position - fed[0]))
+                    if not data:
+                        raise OSError(f"Teildatei {journal.partial_file} ist kürzer als erwartet")
+                    write(data)
+                    fed[0] += len(data)
+            except BaseException:
+                part.close()
+                raise
+            checkpoint_position[0] = fed[0]
+            add_progress(resume_position)
+        
+        blocks = iter([(start, min(start + block_size, filesize) - 1)
+                       for start in range(resume_position, filesize, block_size)])
+        # Eine vollständige 200-Antwort ist nur für einen einzigen Block ab Byte 0 brauchbar
+        allow_full_response = filesize <= block_size and not resume_position
+        
+        def checkpoint():
+            part.flush()
+            os.fsync(part.fileno())
+            journal.fill(fed[0])
+            checkpoint_position[0] = fed[0]
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.connections) as executor:
+                pending = deque(
+                    executor.submit(self._fetch_block, url, start, end, add_progress, failed, allow_full_response)
+                    for start, end in itertools.islice(blocks, self.connections * 2)
+                )
+                try:
+                    while pending:
+                        data = pending.popleft().result()
+                        # Erst in die Teildatei, dann weitergeben - bricht die Pipe beim Schreiben
+                        # (Abbruch, FFmpeg beendet), ist der Block trotzdem gesichert
+                        if part:
+                            part.write(data)
+                        fed[0] += len(data)
+                        write(data)
+                        if part and fed[0] - checkpoint_position[0] >= self.checkpoint_size:
+                            checkpoint()
+                        
+                        # Fenster auffüllen, sobald ein Block weitergegeben wurde
+                        for start, end in itertools.islice(blocks, 1):
+                            pending.append(executor.submit(self._fetch_block, url, start, end, add_progress, failed))
+                except BaseException:
+                    # Laufende Blöcke beim nächsten Chunk beenden, wartende gar nicht erst starten
+                    failed.set()
+                    for future in pending:
+                        future.cancel()
+                    raise
+        finally:
+            if part:
+                # Auch bei Abbruch oder Fehler den erreichten Stand sichern
+                if fed[0] != checkpoint_position[0]:
+                    checkpoint()
+                part.close()
+        
+        if downloaded[0] != filesize:
+            raise Exception(f"Unvollständiger Download: {downloaded[0]} von {filesize} Bytes")
+    
+    def _fetch_block(self, url, start, end, add_progress, failed, allow_full_response=False):
+        """Einen Byte-Bereich in den Speicher laden (mit Wiederholung bei Verbindungsfehlern)"""
+        data = bytearray()
+        
+        def consume(chunk):
+            data.extend(chunk)
+            add_progress(len(chunk))
+        
+        self._transfer_range(url, start, end, start, consume, failed, allow_full_response, "Block")
+        return data
+    
+    def _download_segment(self, url, write_file, segments, index, add_progress, failed,
+                          journal=None, allow_full_response=False):
+        """Einen Byte-Bereich mit eigener Verbindung in die vorbelegte Datei schreiben"""
+        start, end, position = segments[index]
+        # Erreichte und im Journal bestätigte Position
+        position = [position]
+        checkpoint_position = [position[0]]
+        
+        def checkpoint(f):
+            # Daten erst auf die Platte bringen, dann die Position im Journal bestätigen
+            f.flush()
+            os.fsync(f.fileno())
+            journal.update(index, position[0])
+            checkpoint_position[0] = position[0]
+        
+        with open(write_file, "r+b") as f:
+            def consume(chunk):
+                f.write(chunk)
+                position[0] += len(chunk)
+                add_progress(len(chunk))
+                if journal and position[0] - checkpoint_position[0] >= self.checkpoint_size:
+                    checkpoint(f)
+            
+            f.seek(position[0])
+            try:
+                self._transfer_range(url, start, end, position[0], consume, failed, allow_full_response, "Segment")
+            finally:
+                # Auch bei Abbruch oder Fehler den erreichten Stand sichern
+                if journal and position[0] != checkpoint_position[0]:
+                    checkpoint(f)
+    
+    def _transfer_range(self, url, start, end, position, consume, failed, allow_full_response=False,
+                        label="Block"):
+        """Bytes von position bis end (inklusive) laden und chunkweise an consume(chunk) übergeben
+        
+        Verbindungsfehler werden ab der bereits erreichten Position mit wachsender Wartezeit
+        erneut versucht (höchstens max_retries Mal). Ein gesetztes failed beendet die
+        Übertragung beim nächsten Chunk. Gibt die erreichte Position zurück.
+        """
+        attempt = 0
+        
+        while position <= end:
+            try:
+                response = requests.get(
+                    url,
+                    headers={"Range": f"bytes={position}-{end}"},
+                    stream=True,
+                    timeout=self.timeout
+                )
+                with response:
+                    response.raise_for_status()
+                    
+                    if response.status_code != 206 and not (allow_full_response and position == 0):
+                        raise RangeNotSupportedError("Server unterstützt keine Range-Anfragen")
+                    
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        if failed.is_set():
+                            raise Exception("Parallele Übertragung fehlgeschlagen")
+                        if not chunk:
+                            continue
+                        
+                        # Nie über das Bereichsende hinaus lesen
+                        chunk = chunk[:end - position + 1]
+                        if self.throttle:
+                            self.throttle(len(chunk))
+                        consume(chunk)
+                        position += len(chunk)
+                        
+                        if position > end:
+                            break
+                
+                if position <= end:
+                    raise requests.exceptions.ChunkedEncodingError("Verbindung vorzeitig beendet")
+            
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError) as e:
+                # Verbindungsfehler: ab aktueller Position erneut versuchen
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                print(f"{label} {start}-{end}: Verbindungsfehler ({e}), Versuch {attempt}/{self.max_retries}")
+                time.sleep(min(2 ** attempt, 10))
+        
+        return position
+
+
+class FFmpegInstaller:
+    """Lädt ein FFmpeg-Archiv herunter und entpackt das Programm daraus
+    
+    Das Archiv wird blockweise auf die Platte geschrieben (SegmentedDownloader mit
+    ResumeJournal) statt im Speicher gehalten; ein abgebrochener Download wird beim
+    nächsten Versuch per HTTP-Range fortgesetzt. Das Programm wird gestreamt entpackt,
+    die CRC-32 des Archiv-Eintrags und optional die SHA-256 des Archivs werden geprüft.
+    """
+    
+    def __init__(self, url, target_file, member_suffix, sha256=None, connections=4,
+                 chunk_size=1024 * 1024, progress_interval=0.25, timeout=30):
+        self.url = url
+        self.target_file = target_file
+        self.member_suffix = member_suffix
+        self.sha256 = sha256.lower() if sha256 else None
+        self.downloader = SegmentedDownloader(connections=connections, chunk_size=chunk_size, timeout=timeout,
+                                              throttle=self.throttle)
+        self.chunk_size = chunk_size
+        self.progress_interval = progress_interval
+        self.timeout = timeout
+        self.archive_file = os.path.join(get_cache_dir("ffmpeg"),
+                                         hashlib.sha1(url.encode("utf-8")).hexdigest()[:16] + ".zip")
+    
+    @staticmethod
+    def throttle(amount):
+        BANDWIDTH.acquire(amount, "ffmpeg")
+    
+    def download(self, on_progress=None):
+        """Archiv herunterladen (bzw. fortsetzen), on_progress(geladen, gesamt) höchstens alle progress_interval Sekunden"""
+        load_network_modules()
+        
+        # Größe und Version (ETag/Last-Modified) des Archivs nach allen Weiterleitungen ermitteln
+        url, filesize, validator = self.url, 0, ""
+        try:
+            response = requests.head(self.url, allow_redirects=True, timeout=self.timeout)
+            if response.ok:
+                url = response.url
+                filesize = int(response.headers.get("content-length", 0))
+                validator = response.headers.get("ETag") or response.headers.get("Last-Modified") or ""
+        except requests.exceptions.RequestException as e:
+            print(f"Größe des FFmpeg-Archivs unbekannt: {e}")
+        
+        report_lock = threading.Lock()
+        last_report = [0.0]
+        
+        def report(downloaded):
+            # Fortschritt gedrosselt melden, den Abschluss immer
+            if not on_progress:
+                return
+            now = time.monotonic()
+            with report_lock:
+                if now - last_report[0] < self.progress_interval and downloaded != filesize:
+                    return
+                last_report[0] = now
+            on_progress(downloaded, filesize)
+        
+        if filesize:
+            # Journal-Schlüssel aus URL und Archiv-Version - ein geändertes Archiv wird neu geladen
+            resume_dir = get_cache_dir("resume")
+            prefix = "ffmpeg_" + hashlib.sha1(self.url.encode("utf-8")).hexdigest()[:12]
+            journal = ResumeJournal(resume_dir, prefix, hashlib.sha1(validator.encode("utf-8")).hexdigest()[:8],
+                                    filesize)
+            
+            # Zwischenstände älterer Archiv-Versionen verwerfen
+            current = (journal.partial_file, journal.journal_file)
+            for filename in os.listdir(resume_dir):
+                filepath = os.path.join(resume_dir, filename)
+                if filename.startswith(prefix + "_") and filepath not in current:
+                    os.remove(filepath)
+            
+            try:
+                return self.downloader.download(url, self.archive_file, filesize, report, journal)
+            except RangeNotSupportedError:
+                journal.discard()
+                print("Server unterstützt keine Range-Anfragen, lade FFmpeg-Archiv am Stück")
+        
+        return self._download_whole(url, report)
+    
+    def _download_whole(self, url, report):
+        """Archiv ohne Range-Anfragen in großen Blöcken auf die Platte schreiben"""
+        partial_file = self.archive_file + ".part"
+        downloaded = 0
+        with requests.get(url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            with open(partial_file, "wb") as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    self.throttle(len(chunk))
+                    f.write(chunk)
+                    downloaded += len(chunk)
+                    report(downloaded)
+        os.replace(partial_file, self.archive_file)
+        return self.archive_file
+    
+    def verify(self):
+        """SHA-256 des Archivs blockweise berechnen und mit der erwarteten Prüfsumme vergleichen
+        
+        Ohne erwartete Prüfsumme wird das Archiv nicht erneut gelesen - die CRC-32 beim
+        Entpacken prüft das Programm ohnehin. Bei Abweichung wird das Archiv gelöscht,
+        damit der nächste Versuch neu beginnt.
+        """
+        if not self.sha256:
+            return None
+        
+        digest = hashlib.sha256()
+        with open(self.archive_file, "rb") as f:
+            for block in iter(lambda: f.read(self.chunk_size), b""):
+                digest.update(block)
+        checksum = digest.hexdigest()
+        print(f"SHA-256 des FFmpeg-Archivs: {checksum}")
+        if checksum != self.sha256:
+            os.remove(self.archive_file)
+            raise Exception("Prüfsumme des FFmpeg-Archivs stimmt nicht überein")
+        return checksum
+    
+    def extract(self):
+        """Programm aus dem Archiv entpacken (CRC-geprüft) und das Archiv danach löschen"""
+        import zipfile
+        
+        try:
+            with zipfile.ZipFile(self.archive_file) as archive:
+                member = next((info for info in archive.infolist()
+                               if info.filename.endswith(self.member_suffix) and not info.is_dir()), None)
+                if member is None:
+                    raise Exception("FFmpeg-Datei nicht im Archiv gefunden.")
+                
+                # Erst vollständig in eine temporäre Datei, zipfile prüft dabei die CRC-32
+                temp_file = self.target_file + ".tmp"
+                try:
+                    with archive.open(member) as source, open(temp_file, "wb") as target:
+                        shutil.copyfileobj(source, target, self.chunk_size)
+                    if os.path.getsize(temp_file) != member.file_size:
+                        raise Exception("FFmpeg-Datei unvollständig entpackt")
+                    
+                    # Ausführungsrechte unter macOS/Linux setzen
+                    if os.name != "nt":
+                        os.chmod(temp_file, 0o755)
+                    os.replace(temp_file, self.target_file)
+                except BaseException:
+                    if os.path.exists(temp_file):
+                        os.remove(temp_file)
+                    raise
+        finally:
+            # Defektes Archiv nicht fortsetzen, sondern beim nächsten Versuch neu laden
+            os.remove(self.archive_file)
+        
+        return self.target_file
+    
+    def install(self, on_progress=None):
+        """Herunterladen, prüfen und entpacken, gibt den Pfad des Programms zurück"""
+        self.download(on_progress)
+        self.verify()
+        return self.extract()
+
+
+def default_work_root():
+    """Arbeitsverzeichnis für Zwischendateien (FETCHIO_WORK_DIR, sonst im System-Temp-Verzeichnis)"""
+    return os.environ.get("FETCHIO_WORK_DIR") or os.path.join(tempfile.gettempdir(), "fetchio")
+
+
+def process_alive(pid):
+    """Prüfen, ob ein Prozess mit dieser ID noch läuft"""
+    if os.name == "nt":  # Windows - os.kill() würde den Prozess beenden
+        import ctypes
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            # Zugriff verweigert heißt: Prozess existiert
+            return ctypes.get_last_error() == 5
+        try:
+            exit_code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+            return exit_code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ScratchDir:
+    """Eigenes Verzeichnis für die Zwischendateien eines Auftrags
+    
+    Jede Datei wird im Manifest (manifest.json) vermerkt, bevor sie entsteht; cleanup()
+    löscht genau diese Dateien statt ein Verzeichnis zu durchsuchen. Verzeichnisse
+    abgestürzter Programmläufe räumt reclaim() beim nächsten Start auf.
+    """
+    
+    MANIFEST = "manifest.json"
+    # Verzeichnisse ohne Manifest erst nach dieser Zeit (Sekunden) als verwaist ansehen -
+    # ein anderer Programmlauf könnte es gerade erst mit mkdtemp angelegt haben
+    RECLAIM_GRACE = 300
+    
+    def __init__(self, root, job_id):
+        os.makedirs(root, exist_ok=True)
+        # mkdtemp vergibt eindeutige Namen, auch für gleichzeitige Aufträge mehrerer Programmläufe
+        self.path = tempfile.mkdtemp(prefix=f"job{job_id}_", dir=root)
+        self.manifest_file = os.path.join(self.path, self.MANIFEST)
+        self.files = []
+        self.lock = threading.Lock()
+        self._save()
+    
+    def file(self, name):
+        """Pfad für eine Zwischendatei reservieren und im Manifest vermerken"""
+        with self.lock:
+            if name not in self.files:
+                self.files.append(name)
+                self._save()
+        return os.path.join(self.path, name)
+    
+    def remove(self, path):
+        """Einzelne Zwischendatei vorzeitig löschen"""
+        name = os.path.basename(path)
+        with self.lock:
+            self._remove_files(self.path, [name])
+            if name in self.files:
+                self.files.remove(name)
+                self._save()
+    
+    def cleanup(self):
+        """Alle Zwischendateien laut Manifest und das Verzeichnis selbst löschen"""
+        with self.lock:
+            self._remove_directory(self.path, self.files)
+            self.files = []
+    
+    def _save(self):
+        write_json_atomic(self.manifest_file, {
+            "pid": os.getpid(),
+            "created": time.time(),
+            "files": self.files
+        })
+    
+    @staticmethod
+    def _remove_files(path, files):
+        for name in files:
+            filepath = os.path.join(path, name)
+            try:
+                os.remove(filepath)
+                print(f"Temporäre Datei gelöscht: {filepath}")
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Fehler beim Löschen von {filepath}: {e}")
+    
+    @classmethod
+    def _remove_directory(cls, path, files):
+        cls._remove_files(path, files)
+        for name in (cls.MANIFEST, cls.MANIFEST + ".tmp"):
+            try:
+                os.remove(os.path.join(path, name))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Fehler beim Löschen von {os.path.join(path, name)}: {e}")
+        try:
+            os.rmdir(path)
+        except OSError as e:
+            # Nicht leer (z.B. Datei noch geöffnet) - beim nächsten Start erneut versuchen
+            print(f"Arbeitsverzeichnis {path} konnte nicht entfernt werden: {e}")
+    
+    @classmethod
+    def reclaim(cls, root):
+        """Verzeichnisse beendeter Programmläufe (Prozess läuft nicht mehr) aufräumen"""
+        if not os.path.isdir(root):
+            return
+        reclaimed = 0
+        for entry in os.scandir(root):
+            if not entry.is_dir() or not entry.name.startswith("job"):
+                continue
+            try:
+                with open(os.path.join(entry.path, cls.MANIFEST), "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+                pid = int(manifest["pid"])
+                files = [os.path.basename(name) for name in manifest["files"]]
+            except FileNotFoundError:
+                # Absturz vor dem ersten Manifest - nur ein leeres Verzeichnis entfernen, und nur,
+                # wenn es nicht gerade erst von einem gleichzeitig laufenden Auftrag angelegt wurde
+                try:
+                    if time.time() - entry.stat().st_mtime >= cls.RECLAIM_GRACE:
+                        os.rmdir(entry.path)
+                except OSError:
+                    pass
+                continue
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Manifest in {entry.path} nicht lesbar: {e}")
+                continue
+            
+            if process_alive(pid):
+                continue
+            cls._remove_directory(entry.path, files)
+            reclaimed += 1
+        
+        if reclaimed:
+            print(f"{reclaimed} verwaiste Arbeitsverzeichnisse aufgeräumt")
+
+
+def format_size(size_bytes):
+    """Dateigröße formatieren"""
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if size_bytes < 1024.0:
+            return f"{size_bytes:.2f} {unit}"
+        size_bytes /= 1024.0
+    return f"{size_bytes:.2f} PB"
+
+
+def format_time(seconds):
+    """Zeit formatieren"""
+    if seconds < 0:
+        return "--:--"
+    
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    
+    if hours > 0:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    else:
+        return f"{minutes}:{seconds:02d}"
+
+
+def sanitize_filename(title):
+    """Ungültige Zeichen aus einem Dateinamen entfernen"""
+    return re.sub(r'[\\/*?:"<>|]', "_", title)
+
+
+def unique_path(path):
+    """Freien Dateinamen wählen - bei Kollision "Name (2).ext", "Name (3).ext", ..."""
+    base, extension = os.path.splitext(path)
+    candidate = path
+    counter = 2
+    while os.path.exists(candidate):
+        candidate = f"{base} ({counter}){extension}"
+        counter += 1
+    return candidate
+
+
+def is_valid_url(url):
+    """Prüfen, ob es sich um eine YouTube-URL handelt"""
+    return bool(YOUTUBE_URL_PATTERN.match(url))
+
+
+def is_collection_url(url):
+    """Prüfen, ob die URL auf eine Playlist oder einen Kanal statt auf ein einzelnes Video zeigt"""
+    return bool(PLAYLIST_URL_PATTERN.match(url) or CHANNEL_URL_PATTERN.match(url))
+
+
+class CachedVideo:
+    """Aus dem MetadataCache wiederhergestelltes Video
+    
+    Bietet den Teil der YouTube-Schnittstelle, den fetch.io nutzt (Titel, Länge, Thumbnail,
+    Streams, Fortschritts-Callback). Die Streams sind echte PyTubeFix-Streams, die aus den
+    gespeicherten, bereits entschlüsselten Formatdaten erzeugt werden.
+    
+    PyTubeFix erneuert abgelaufene SABR-URLs über monostate.youtube; dafür dient das
+    CachedVideo selbst, das diese Anfragen an ein erst dann geladenes YouTube(url) weiterreicht.
+    """
+    
+    def __init__(self, url, data):
+        load_network_modules()
+        self.watch_url = url
+        self.video_id = data["video_id"]
+        self.title = data["title"]
+        self.length = data["length"]
+        self.thumbnail_url = data["thumbnail_url"]
+        self._youtube = None
+        
+        self.stream_monostate = Monostate(on_progress=None, on_complete=None,
+                                          title=self.title, duration=self.length, youtube=self)
+        self.fmt_streams = [
+            Stream(
+                stream=stream_data,
+                monostate=self.stream_monostate,
+                po_token=data.get("po_token"),
+                video_playback_ustreamer_config=data.get("ustreamer_config")
+            )
+            for stream_data in data["formats"]
+        ]
+        self.streams = StreamQuery(self.fmt_streams)
+    
+    def register_on_progress_callback(self, func):
+        self.stream_monostate.on_progress = func
+    
+    @property
+    def youtube(self):
+        """Echtes YouTube-Objekt zur URL, erst bei Bedarf geladen (Netzwerkzugriff)"""
+        if self._youtube is None:
+            self._youtube = YouTube(self.watch_url)
+        return self._youtube
+    
+    # Schnittstelle, über die ServerAbrStream.reload() frische Stream-URLs anfordert
+    @property
+    def vid_info(self):
+        return self.youtube.vid_info
+    
+    @vid_info.setter
+    def vid_info(self, value):
+        self.youtube.vid_info = value
+    
+    @property
+    def server_abr_streaming_url(self):
+        return self.youtube.server_abr_streaming_url
+    
+    @property
+    def video_playback_ustreamer_config(self):
+        return self.youtube.video_playback_ustreamer_config
+
+
+class MetadataCache:
+    """Persistenter Cache (SQLite) für Metadaten und Stream-Manifest pro Video-ID
+    
+    Gespeichert werden Titel, Länge, Thumbnail-URL und die entschlüsselten Formatdaten, aus
+    denen beim Laden der StreamIndex aufgebaut wird. Einträge verfallen nach ttl Sekunden, spätestens aber kurz
+    bevor die signierten Stream-URLs ablaufen; über max_entries hinaus werden die am
+    längsten nicht genutzten Einträge verdrängt (LRU).
+    """
+    
+    # Sicherheitsabstand zum Ablauf der Stream-URLs, damit laufende Downloads nicht abbrechen
+    EXPIRY_MARGIN = 1800
+    
+    def __init__(self, path=None, ttl=2 * 3600, max_entries=500):
+        self.path = path or os.path.join(get_cache_dir(), "metadata.sqlite")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.connection = None
+    
+    def _connect(self):
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS videos ("
+                "video_id TEXT PRIMARY KEY, data TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS videos_last_access ON videos (last_access)")
+            self.connection.commit()
+        return self.connection
+    
+    @staticmethod
+    def video_id(url):
+        """Video-ID aus der URL ermitteln (ohne Netzwerkzugriff), None falls nicht erkennbar
+        
+        Erkannt werden der Parameter v von /watch, youtu.be/<id> sowie /shorts/, /embed/,
+        /live/ und /v/<id>. Kanal- und Playlist-URLs liefern None.
+        """
+        parsed = urlparse(url if "://" in url else f"https://{url}")
+        host = (parsed.hostname or "").lower()
+        segments = [segment for segment in parsed.path.split("/") if segment]
+        
+        candidate = None
+        if host == "youtu.be":
+            candidate = segments[0] if segments else None
+        elif host == "youtube.com" or host.endswith((".youtube.com", "youtube-nocookie.com")):
+            if segments == ["watch"]:
+                candidate = parse_qs(parsed.query).get("v", [None])[0]
+            elif len(segments) >= 2 and segments[0] in VIDEO_ID_PATHS:
+                candidate = segments[1]
+        
+        return candidate if candidate and VIDEO_ID_PATTERN.match(candidate) else None
+    
+    def get(self, url):
+        """Gespeichertes Video liefern, gibt (yt, stream_index) oder None zurück"""
+        video_id = self.video_id(url)
+        if not video_id:
+            return None
+        
+        try:
+            with self.lock:
+                connection = self._connect()
+                row = connection.execute(
+                    "SELECT data, expires_at FROM videos WHERE video_id = ?", (video_id,)
+                ).fetchone()
+                if row is None:
+                    return None
+                now = time.time()
+                if row[1] <= now:
+                    connection.execute("DELETE FROM videos WHERE video_id = ?", (video_id,))
+                    connection.commit()
+                    return None
+                connection.execute("UPDATE videos SET last_access = ? WHERE video_id = ?", (now, video_id))
+                connection.commit()
+            data = json.loads(row[0])
+        except sqlite3.Error as e:
+            print(f"Fehler beim Lesen des Metadaten-Caches: {e}")
+            return None
+        
+        try:
+            yt = CachedVideo(url, data)
+            # Der Index entsteht aus den gespeicherten Formatdaten ohne Netzwerkzugriff
+            return yt, StreamIndex(yt)
+        except Exception as e:
+            # z.B. geändertes Format nach einem PyTubeFix-Update - Eintrag neu laden
+            print(f"Cache-Eintrag für {video_id} unbrauchbar: {e}")
+            self.invalidate(video_id)
+            return None
+    
+    def put(self, yt):
+        """Video samt Stream-Manifest speichern (nur nachdem yt.streams bereits geladen wurde)"""
+        try:
+            # PyTubeFix entschlüsselt die Formatdaten beim Laden der Streams direkt in streaming_data
+            streaming_data = yt.streaming_data
+            formats = streaming_data.get("formats", []) + streaming_data.get("adaptiveFormats", [])
+            data = {
+                "video_id": yt.video_id,
+                "title": yt.title,
+                "length": yt.length,
+                "thumbnail_url": yt.thumbnail_url,
+                "formats": formats,
+                "po_token": getattr(yt, "po_token", None),
+                "ustreamer_config": getattr(yt, "video_playback_ustreamer_config", None),
+            }
+            encoded = json.dumps(data)
+        except Exception as e:
+            print(f"Video {getattr(yt, 'video_id', '?')} nicht zwischengespeichert: {e}")
+            return
+        
+        now = time.time()
+        expires_at = now + self.ttl
+        for stream_data in formats:
+            expire = parse_qs(urlparse(stream_data.get("url", "")).query).get("expire")
+            if expire and expire[0].isdigit():
+                expires_at = min(expires_at, int(expire[0]) - MetadataCache.EXPIRY_MARGIN)
+        if expires_at <= now:
+            return
+        
+        try:
+            with self.lock:
+                connection = self._connect()
+                connection.execute(
+                    "INSERT OR REPLACE INTO videos (video_id, data, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                    (yt.video_id, encoded, expires_at, now)
+                )
+                # Abgelaufene und über die Größenbegrenzung hinausgehende Einträge verdrängen
+                connection.execute("DELETE FROM videos WHERE expires_at <= ?", (now,))
+                connection.execute(
+                    "DELETE FROM videos WHERE video_id NOT IN "
+                    "(SELECT video_id FROM videos ORDER BY last_access DESC LIMIT ?)",
+                    (self.max_entries,)
+                )
+                connection.commit()
+        except sqlite3.Error as e:
+            print(f"Fehler beim Schreiben des Metadaten-Caches: {e}")
+    
+    def invalidate(self, video_id):
+        """Eintrag entfernen (z.B. nach abgelaufenen Stream-URLs)"""
+        try:
+            with self.lock:
+                connection = self._connect()
+                connection.execute("DELETE FROM videos WHERE video_id = ?", (video_id,))
+                connection.commit()
+        except sqlite3.Error as e:
+            print(f"Fehler beim Schreiben des Metadaten-Caches: {e}")
+    
+    def load(self, url):
+        """Video aus dem Cache oder von YouTube laden, gibt (yt, stream_index) zurück"""
+        cached = self.get(url)
+        if cached:
+            return cached
+        
+        load_network_modules()
+        yt = YouTube(url)
+        stream_index = StreamIndex(yt)
+        self.put(yt)
+        return yt, stream_index
+
+
+class DownloadArchive:
+    """Persistentes Verzeichnis (SQLite) bereits heruntergeladener Videos
+    
+    Pro Video-ID, Format, Qualität und Ausgabeverzeichnis werden Zieldatei, Größe, Änderungszeit,
+    die verwendeten itags und der Titel gespeichert (die SHA-256 nur, wenn der Aufrufer sie kennt -
+    die Datei wird dafür nicht gelesen). Die Abfrage kommt ohne Netzwerkzugriff aus (Primärschlüssel
+    + Vergleich von Größe und Änderungszeit), so dass erneut eingereihte Videos übersprungen
+    werden, bevor Metadaten geladen werden. Die Qualität wird über StreamPolicy.quality_key
+    vereinheitlicht, damit GUI ("1080p* (beste)") und CLI ("1080p") denselben Eintrag treffen. Von FFmpeg geschriebene Dateien tragen die Video-URL
+    im Kommentar-Tag, darüber lässt sich das Archiv aus einem Ausgabeverzeichnis neu aufbauen.
+    """
+    
+    # Dateiendung -> Format des Auftrags (für rebuild)
+    FORMATS_BY_EXTENSION = {
+        ".mp4": "mp4",
+        ".mp3": "mp3",
+        ".m4a": "audio",
+        ".opus": "audio",
+        ".ogg": "audio",
+    }
+    
+    # Qualität beim Neuaufbau unbekannt - passt zu jeder angeforderten Qualität
+    ANY_QUALITY = "*"
+    
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_cache_dir(), "archive.sqlite")
+        self.lock = threading.Lock()
+        self.connection = None
+    
+    def _connect(self):
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS downloads ("
+                "video_id TEXT NOT NULL, format_type TEXT NOT NULL, quality TEXT NOT NULL, "
+                "directory TEXT NOT NULL, output_file TEXT NOT NULL, size INTEGER NOT NULL, "
+                "sha256 TEXT, itags TEXT, title TEXT, created REAL NOT NULL, mtime REAL, "
+                "PRIMARY KEY (video_id, format_type, directory, quality))"
+            )
+            try:
+                # Archive älterer Versionen ohne Änderungszeit ergänzen
+                self.connection.execute("ALTER TABLE downloads ADD COLUMN mtime REAL")
+            except sqlite3.OperationalError:
+                pass  # Spalte bereits vorhanden
+            self.connection.commit()
+        return self.connection
+    
+    @staticmethod
+    def directory_key(path):
+        """Ausgabeverzeichnis vergleichbar machen (absolut, unter Windows ohne Groß-/Kleinschreibung)"""
+        return os.path.normcase(os.path.abspath(path))
+    
+    def lookup(self, url, format_type, quality, output_path):
+        """Archivierten Download liefern, falls die Datei noch unverändert vorhanden ist
+        
+        Gibt ein dict (output_file, size, sha256, itags, title) oder None zurück. Einträge, deren
+        Datei gelöscht oder verändert wurde (Größe oder Änderungszeit), werden entfernt.
+        """
+        video_id = MetadataCache.video_id(url)
+        if not video_id:
+            return None
+        
+        directory = self.directory_key(output_path)
+        try:
+            with self.lock:
+                row = self._connect().execute(
+                    "SELECT quality, output_file, size, mtime, sha256, itags, title FROM downloads "
+                    "WHERE video_id = ? AND format_type = ? AND directory = ? AND quality IN (?, ?)",
+                    (video_id, format_type, directory, StreamPolicy.quality_key(format_type, quality),
+                     DownloadArchive.ANY_QUALITY)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Fehler beim Lesen des Download-Archivs: {e}")
+            return None
+        if row is None:
+            return None
+        
+        stored_quality, output_file, size, mtime, sha256, itags, title = row
+        try:
+            stat = os.stat(output_file)
+            present = stat.st_size == size and (mtime is None or stat.st_mtime == mtime)
+        except OSError:
+            present = False
+        if not present:
+            self.forget(video_id, format_type, output_path, stored_quality)
+            return None
+        
+        return {
+            "output_file": output_file,
+            "size": size,
+            "sha256": sha256,
+            "itags": json.loads(itags) if itags else [],
+            "title": title,
+        }
+    
+    def record(self, video_id, format_type, quality, output_file, title=None, itags=(), sha256=None):
+        """Abgeschlossenen Download eintragen (Größe und Änderungszeit werden aus der Datei ermittelt)"""
+        try:
+            stat = os.stat(output_file)
+        except OSError as e:
+            print(f"Download nicht archiviert: {e}")
+            return
+        
+        try:
+            with self.lock:
+                connection = self._connect()
+                connection.execute(
+                    "INSERT OR REPLACE INTO downloads (video_id, format_type, quality, directory, output_file, "
+                    "size, mtime, sha256, itags, title, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (video_id, format_type, StreamPolicy.quality_key(format_type, quality),
+                     self.directory_key(os.path.dirname(output_file)), os.path.abspath(output_file),
+                     stat.st_size, stat.st_mtime, sha256, json.dumps(list(itags)), title, time.time())
+                )
+                connection.commit()
+        except sqlite3.Error as e:
+            print(f"Fehler beim Schreiben des Download-Archivs: {e}")
+    
+    def forget(self, video_id, format_type, output_path, quality):
+        """Eintrag entfernen (z.B. nachdem die Datei gelöscht wurde)"""
+        try:
+            with self.lock:
+                connection = self._connect()
+                connection.execute(
+                    "DELETE FROM downloads WHERE video_id = ? AND format_type = ? AND directory = ? AND quality = ?",
+                    (video_id, format_type, self.directory_key(output_path), quality)
+                )
+                connection.commit()
+        except sqlite3.Error as e:
+            print(f"Fehler beim Schreiben des Download-Archivs: {e}")
+    
+    @staticmethod
+    def tagged_video_id(ffmpeg_path, path):
+        """Video-ID aus dem Kommentar-Tag einer Datei lesen, None falls keiner vorhanden ist
+        
+        Ohne Ausgabedatei listet FFmpeg nur die Eingabe samt Metadaten auf stderr auf - globale
+        Tags (MP4, MP3) ebenso wie Stream-Tags (Ogg/Opus).
+        """
+        try:
+            result = subprocess.run(
+                [ffmpeg_path, "-hide_banner", "-i", path],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                timeout=30,
+                check=False
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        match = re.search(r"^\s*comment\s*:\s*(\S+)", result.stderr.decode("utf-8", errors="replace"), re.MULTILINE)
+        return MetadataCache.video_id(match.group(1)) if match else None
+    
+    def rebuild(self, directory, ffmpeg_path):
+        """Archiv für ein Ausgabeverzeichnis aus den vorhandenen Dateien neu aufbauen
+        
+        Bisherige Einträge des Verzeichnisses werden ersetzt. Dateien ohne Video-URL im
+        Kommentar-Tag (nicht über FFmpeg geschrieben) lassen sich keinem Video zuordnen.
+        Gibt (eingetragen, nicht zuordenbar) zurück.
+        """
+        existing = {}
+        try:
+            with self.lock:
+                connection = self._connect()
+                # Bekannte Hashes unveränderter Dateien übernehmen
+                for output_file, size, mtime, sha256 in connection.execute(
+                    "SELECT output_file, size, mtime, sha256 FROM downloads WHERE directory = ?",
+                    (self.directory_key(directory),)
+                ):
+                    existing[output_file] = (size, mtime, sha256)
+                connection.execute("DELETE FROM downloads WHERE directory = ?", (self.directory_key(directory),))
+                connection.commit()
+        except sqlite3.Error as e:
+            print(f"Fehler beim Lesen des Download-Archivs: {e}")
+            return 0, 0
+        
+        recorded = 0
+        unknown = 0
+        for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+            extension = os.path.splitext(entry.name)[1].lower()
+            format_type = DownloadArchive.FORMATS_BY_EXTENSION.get(extension)
+            if not format_type or not entry.is_file():
+                continue
+            
+            video_id = self.tagged_video_id(ffmpeg_path, entry.path) if ffmpeg_path else None
+            if not video_id:
+                unknown += 1
+                continue
+            
+            path = os.path.abspath(entry.path)
+            size, mtime, sha256 = existing.get(path, (None, None, None))
+            stat = entry.stat()
+            self.record(video_id, format_type, DownloadArchive.ANY_QUALITY, path,
+                        title=os.path.splitext(entry.name)[0],
+                        sha256=sha256 if (size, mtime) == (stat.st_size, stat.st_mtime) else None)
+            recorded += 1
+        
+        return recorded, unknown
+
+
+class CancelEvent(threading.Event):
+    """threading.Event, das beim Setzen angemeldete Callbacks aufruft
+    
+    Damit reagieren Prozesse sofort auf einen Abbruch, statt den Status regelmäßig abzufragen.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self._callbacks = []
+        self._callback_lock = threading.Lock()
+    
+    def set(self):
+        super().set()
+        with self._callback_lock:
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            callback()
+    
+    def subscribe(self, callback):
+        """Callback beim Setzen aufrufen (sofort, falls bereits gesetzt), gibt die Abmeldefunktion zurück"""
+        with self._callback_lock:
+            self._callbacks.append(callback)
+        if self.is_set():
+            callback()
+        
+        def unsubscribe():
+            with self._callback_lock:
+                if callback in self._callbacks:
+                    self._callbacks.remove(callback)
+        
+        return unsubscribe
+
+
+class DownloadJob:
+    """Ein Auftrag in der Download-Warteschlange"""
+    
+    # Zustände eines Auftrags
+    QUEUED = "queued"
+    FETCHING = "fetching"
+    MUXING = "muxing"
+    CONVERTING = "converting"
+    DONE = "done"
+    FAILED = "failed"
+    ABORTED = "aborted"
+    
+    STATE_LABELS = {
+        QUEUED: "Wartend",
+        FETCHING: "Lädt herunter",
+        MUXING: "Kombiniert",
+        CONVERTING: "Konvertiert",
+        DONE: "Fertig",
+        FAILED: "Fehler",
+        ABORTED: "Abgebrochen",
+    }
+    
+    _ids = itertools.count(1)
+    
+    def __init__(self, url, output_path, format_type, quality, yt=None, stream_index=None, policy=None,
+                 weight=1.0):
+        self.job_id = next(DownloadJob._ids)
+        self.url = url
+        self.output_path = output_path
+        self.format_type = format_type
+        self.quality = quality
+        
+        # Bereits geladene Video-Informationen (erspart erneute Netzwerkanfragen)
+        self.yt = yt
+        self.stream_index = stream_index
+        
+        # Auswahlregeln für Streams (StreamPolicy), None = Standardauswahl
+        self.policy = policy
+        
+        # Anteil an einer begrenzten Bandbreite im Verhältnis zu anderen Aufträgen (jederzeit änderbar)
+        self.weight = weight
+        
+        self.state = DownloadJob.QUEUED
+        self.title = url
+        self.status = DownloadJob.STATE_LABELS[DownloadJob.QUEUED]
+        
+        # Fortschritt der Netzwerkphase
+        self.start_time = None
+        self.bytes_downloaded = 0
+        self.total_bytes = 0
+        self.progress = 0.0
+        self.speed = 0.0
+        self.remaining_time = 0
+        
+        # Fortschritt der Nachbearbeitung laut FFmpeg (None = unbekannt), Geschwindigkeit
+        # als Vielfaches der Echtzeit
+        self.processing_progress = None
+        self.processing_speed = 0.0
+        self.processing_remaining_time = 0
+        
+        # Ergebnis
+        self.output_file = None
+        self.message = None
+        self.error = None
+        
+        # Geladenes Video und verwendete Streams (für das Download-Archiv)
+        self.video_id = None
+        self.itags = []
+        
+        # Arbeitsverzeichnis für alle Zwischendateien (ScratchDir, wird bei Bedarf angelegt und
+        # bei Abschluss, Abbruch oder Fehler samt Inhalt gelöscht)
+        self.scratch = None
+        
+        self.cancel_event = CancelEvent()
+    
+    @property
+    def aborted(self):
+        return self.cancel_event.is_set()
+    
+    @property
+    def finished(self):
+        return self.state in (DownloadJob.DONE, DownloadJob.FAILED, DownloadJob.ABORTED)
+    
+    def abort(self):
+        """Abbruch anfordern (wird beim nächsten Chunk bemerkt, laufende FFmpeg-Prozesse werden sofort beendet)"""
+        self.cancel_event.set()
+    
+    def check_abort(self):
+        """Exception auslösen, falls der Abbruch angefordert wurde"""
+        if self.aborted:
+            raise Exception("Download abgebrochen")
+    
+    def set_state(self, state, status=None):
+        self.state = state
+        self.status = status or DownloadJob.STATE_LABELS[state]
+
+
+class FFmpegProgress:
+    """Wertet die Ausgabe von `ffmpeg -progress` zeilenweise aus
+    
+    FFmpeg schreibt Blöcke aus Zeilen "schlüssel=wert", die jeweils mit "progress=..."
+    enden. Aus der verarbeiteten Medienzeit und der bekannten Gesamtdauer ergeben sich
+    Fortschritt, Geschwindigkeit (Vielfaches der Echtzeit) und Restzeit.
+    """
+    
+    def __init__(self, duration=None):
+        self.duration = duration or 0
+        self.out_time = 0.0
+        self.speed = 0.0
+        self.finished = False
+    
+    def parse_line(self, line):
+        """Eine Zeile verarbeiten, gibt True am Ende eines Blocks zurück"""
+        key, _, value = line.strip().partition("=")
+        value = value.strip()
+        
+        # out_time_ms enthält trotz des Namens Mikrosekunden (wie out_time_us)
+        if key in ("out_time_us", "out_time_ms"):
+            if value.isdigit():
+                self.out_time = int(value) / 1000000
+        elif key == "speed":
+            try:
+                self.speed = float(value.rstrip("x"))
+            except ValueError:
+                pass  # "N/A" zu Beginn
+        elif key == "progress":
+            self.finished = value == "end"
+            return True
+        return False
+    
+    @property
+    def percent(self):
+        if self.finished:
+            return 100.0
+        if not self.duration:
+            return 0.0
+        return min(100.0, self.out_time / self.duration * 100)
+    
+    @property
+    def remaining_time(self):
+        if not self.duration or self.speed <= 0:
+            return 0
+        return max(0, self.duration - self.out_time) / self.speed
+
+
+class FFmpegResult:
+    """Ergebnis eines FFmpeg-Aufrufs inklusive Ressourcenverbrauch (None = nicht ermittelbar)"""
+    
+    def __init__(self, returncode, cancelled=False, feed_error=None, stderr_tail=(),
+                 cpu_time=None, peak_rss=None, wall_time=0.0):
+        self.returncode = returncode
+        self.cancelled = cancelled
+        self.feed_error = feed_error
+        self.stderr_tail = list(stderr_tail)
+        self.cpu_time = cpu_time
+        self.peak_rss = peak_rss
+        self.wall_time = wall_time
+    
+    @property
+    def success(self):
+        return self.returncode == 0 and not self.cancelled and not self.feed_error
+
+
+class FFmpegSupervisor:
+    """Zentrale Verwaltung aller FFmpeg-Prozesse
+    
+    Begrenzt die Zahl gleichzeitig laufender Prozesse, beendet Prozesse sofort beim Setzen
+    eines ihrer Abbruch-Events (CancelEvent, ohne Abfrage-Threads) und ermittelt nach
+    Prozessende CPU-Zeit und maximalen Speicherbedarf (RSS).
+    """
+    
+    def __init__(self, max_processes=None):
+        self.max_processes = max(1, max_processes or os.cpu_count() or 1)
+        self.condition = threading.Condition()
+        self.running = 0
+        
+        # Summen für die Auswertung über alle Prozesse
+        self.process_count = 0
+        self.total_cpu_time = 0.0
+        self.peak_rss = 0
+    
+    def _acquire_slot(self, cancel_events):
+        with self.condition:
+            while self.running >= self.max_processes:
+                if any(event.is_set() for event in cancel_events):
+                    return False
+                self.condition.wait()
+            if any(event.is_set() for event in cancel_events):
+                return False
+            self.running += 1
+            return True
+    
+    def _release_slot(self):
+        with self.condition:
+            self.running -= 1
+            self.condition.notify_all()
+    
+    def run(self, command, cancel_events=(), feed=None, on_output_line=None):
+        """FFmpeg-Befehl ausführen, sobald ein Platz frei ist, gibt ein FFmpegResult zurück
+        
+        stdout wird zeilenweise an on_output_line übergeben, feed(write) liefert die Eingabe
+        für "pipe:0". Wird eines der cancel_events gesetzt, wird der Prozess sofort beendet
+        bzw. gar nicht erst gestartet.
+        """
+        cancel_events = [event for event in cancel_events if event is not None]
+        state = {"process": None, "cancelled": False}
+        state_lock = threading.Lock()
+        
+        def cancel():
+            with state_lock:
+                state["cancelled"] = True
+                process = state["process"]
+            if process is not None and process.returncode is None:
+                try:
+                    # Die Ausgabe wird ohnehin verworfen, daher ohne Schonfrist beenden
+                    process.kill()
+                except OSError:
+                    pass
+            # Auf einen freien Platz wartende Aufrufe aufwecken
+            with self.condition:
+                self.condition.notify_all()
+        
+        unsubscribers = [event.subscribe(cancel) if hasattr(event, "subscribe") else None
+                         for event in cancel_events]
+        try:
+            if not self._acquire_slot(cancel_events):
+                return FFmpegResult(None, cancelled=True)
+            try:
+                return self._run_process(command, feed, on_output_line, state, state_lock)
+            finally:
+                self._release_slot()
+        finally:
+            for unsubscribe in unsubscribers:
+                if unsubscribe:
+                    unsubscribe()
+    
+    def _run_process(self, command, feed, on_output_line, state, state_lock):
+        # Windows-spezifische Flags zur Verhinderung des Konsolenfensters
+        startupinfo = None
+        if os.name == 'nt':
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            startupinfo.wShowWindow = 0  # SW_HIDE
+        
+        start_time = time.time()
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE if feed else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            startupinfo=startupinfo  # Windows-spezifisch für verstecktes Fenster
+        )
+        with state_lock:
+            state["process"] = process
+            cancelled = state["cancelled"]
+        if cancelled:
+            # Abbruch kam zwischen Platzvergabe und Start
+            process.kill()
+        
+        # Von stderr nur die letzten Zeilen für Fehlermeldungen behalten (begrenzter Speicher)
+        stderr_tail = deque(maxlen=20)
+        
+        def drain_stderr():
+            for line in process.stderr:
+                stderr_tail.append(line.decode("utf-8", errors="replace").rstrip())
+        
+        feed_errors = []
+        
+        def feed_stdin():
+            try:
+                feed(process.stdin.write)
+            except Exception as e:
+                # Unvollständige Eingabe darf nicht als fertige Datei enden
+                feed_errors.append(e)
+                process.kill()
+            finally:
+                try:
+                    process.stdin.close()
+                except OSError:
+                    pass
+        
+        helper_threads = [threading.Thread(target=drain_stderr, daemon=True)]
+        if feed:
+            # Eingabe parallel liefern, während FFmpeg bereits kodiert
+            helper_threads.append(threading.Thread(target=feed_stdin, daemon=True))
+        for thread in helper_threads:
+            thread.start()
+        
+        try:
+            for line in process.stdout:
+                if on_output_line:
+                    on_output_line(line.decode("utf-8", errors="replace"))
+        finally:
+            process.stdout.close()
+            cpu_time, peak_rss = self._wait(process)
+            for thread in helper_threads:
+                thread.join()
+        
+        with self.condition:
+            self.process_count += 1
+            if cpu_time is not None:
+                self.total_cpu_time += cpu_time
+            if peak_rss is not None:
+                self.peak_rss = max(self.peak_rss, peak_rss)
+        
+        with state_lock:
+            cancelled = state["cancelled"]
+        return FFmpegResult(process.returncode, cancelled=cancelled,
+                            feed_error=feed_errors[0] if feed_errors else None,
+                            stderr_tail=stderr_tail, cpu_time=cpu_time, peak_rss=peak_rss,
+                            wall_time=time.time() - start_time)
+    
+    @staticmethod
+    def _wait(process):
+        """Auf das Prozessende warten, gibt (CPU-Zeit in Sekunden, maximaler RSS in Bytes) zurück"""
+        if not hasattr(os, "wait4"):
+            # Ohne wait4 (Windows) ist der Verbrauch ohne Zusatzbibliotheken nicht ermittelbar
+            process.wait()
+            return None, None
+        
+        try:
+            _, status, usage = os.wait4(process.pid, 0)
+        except ChildProcessError:
+            # Bereits von Popen eingesammelt
+            process.wait()
+            return None, None
+        
+        # Exitcode wie Popen setzen, da der Prozess hier statt in Popen eingesammelt wurde
+        if os.WIFSIGNALED(status):
+            process.returncode = -os.WTERMSIG(status)
+        else:
+            process.returncode = os.WEXITSTATUS(status)
+        
+        # ru_maxrss ist unter macOS in Bytes, sonst in Kilobytes angegeben
+        peak_rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+        return usage.ru_utime + usage.ru_stime, peak_rss
+
+
+def resolution_value(resolution):
+    """Auflösung als Zahl (z.B. "1080p" -> 1080, unbekannt -> 0)"""
+    digits = "".join(filter(str.isdigit, resolution or ""))
+    return int(digits) if digits else 0
+
+
+class StreamPolicy:
+    """Regeln für die Stream-Auswahl, z.B. für Stapelaufträge (alle Angaben optional)
+    
+    max_resolution: höchste erlaubte Auflösung (z.B. 1080)
+    prefer_fps: bevorzugte Bildrate, die nächstliegende gewinnt (z.B. 30 oder 60)
+    prefer_codec: bevorzugter Video-Codec ("av1", "vp9" oder "h264")
+    max_filesize: Höchstgröße von Video und Audio zusammen in Bytes
+    audio_language: bevorzugte Audiosprache (z.B. "de"), sofern mehrere Tonspuren existieren
+    """
+    
+    # Codec-Namen in den Stream-Daten von YouTube
+    CODEC_PREFIXES = {"av1": ("av01",), "vp9": ("vp9", "vp09"), "h264": ("avc1",)}
+    
+    def __init__(self, max_resolution=None, prefer_fps=None, prefer_codec=None, max_filesize=None,
+                 audio_language=None):
+        self.max_resolution = max_resolution
+        self.prefer_fps = prefer_fps
+        self.prefer_codec = prefer_codec
+        self.max_filesize = max_filesize
+        self.audio_language = audio_language
+    
+    @staticmethod
+    def quality_key(format_type, quality):
+        """Qualitätsangabe vereinheitlichen, wie GUI und CLI sie unterschiedlich schreiben
+        
+        "1080p* (beste)", "1080P" und "1080" werden zu "1080p", "192k" und "192" (MP3) zu
+        "192kbps"; "highest", "m4a" und DownloadArchive.ANY_QUALITY bleiben unverändert.
+        """
+        if quality == DownloadArchive.ANY_QUALITY:
+            return quality
+        key = quality.split("*")[0].strip().lower()
+        if format_type == "mp4" and key.isdigit():
+            return key + "p"
+        if format_type == "mp3":
+            bitrate = key.replace("kbps", "").rstrip("k")
+            if bitrate.isdigit():
+                return bitrate + "kbps"
+        return key
+    
+    def allows_resolution(self, resolution):
+        return not self.max_resolution or resolution_value(resolution) <= self.max_resolution
+    
+    def video_rank(self, stream):
+        """Sortierschlüssel innerhalb einer Auflösung (kleiner = besser)"""
+        codec_mismatch = 0
+        if self.prefer_codec:
+            codec = getattr(stream, "video_codec", None) or ""
+            codec_mismatch = 0 if codec.startswith(StreamPolicy.CODEC_PREFIXES[self.prefer_codec]) else 1
+        fps_distance = abs((getattr(stream, "fps", None) or 0) - self.prefer_fps) if self.prefer_fps else 0
+        return codec_mismatch, fps_distance
+
+
+class StreamIndex:
+    """Unveränderlicher Index aller Streams eines Videos und zentrale Stream-Auswahl
+    
+    Wird einmal im Hintergrund aufgebaut (greift dabei auf yt.streams zu) und beantwortet
+    danach alle Abfragen als Dictionary-Zugriffe, ohne PyTubeFix erneut zu bemühen.
+    Kandidaten sind pro Auflösung in Standard-Reihenfolge abgelegt (progressives MP4,
+    adaptives MP4, WebM). Die Auswahl berücksichtigt optional eine StreamPolicy.
+    """
+    
+    def __init__(self, yt):
+        streams = list(yt.streams)
+        
+        # Wie order_by(...).desc() von PyTubeFix: stabil aufsteigend sortieren, dann umkehren
+        videos = [stream for stream in streams if stream.includes_video_track and stream.resolution]
+        videos = sorted(videos, key=lambda stream: resolution_value(stream.resolution))[::-1]
+        audios = [stream for stream in streams if stream.includes_audio_track and not stream.includes_video_track]
+        audios = sorted(audios, key=lambda stream: resolution_value(stream.abr))[::-1]
+        
+        # Kandidaten pro Auflösung in Standard-Reihenfolge: progressives MP4, adaptives MP4, WebM
+        candidates = {}
+        for stream in videos:
+            candidates.setdefault(stream.resolution, [])
+        for resolution, streams_at_resolution in candidates.items():
+            at_resolution = [stream for stream in videos if stream.resolution == resolution]
+            streams_at_resolution.extend(stream for stream in at_resolution
+                                         if stream.subtype == "mp4" and stream.is_progressive)
+            streams_at_resolution.extend(stream for stream in at_resolution
+                                         if stream.subtype == "mp4" and not stream.is_progressive)
+            streams_at_resolution.extend(stream for stream in at_resolution if stream.subtype == "webm")
+        self.candidates = MappingProxyType({resolution: tuple(streams_at_resolution)
+                                            for resolution, streams_at_resolution in candidates.items()
+                                            if streams_at_resolution})
+        
+        # Bester Stream pro Auflösung und Auflösungen absteigend sortiert (einmal pro Video)
+        self.video_streams = MappingProxyType({resolution: streams_at_resolution[0]
+                                               for resolution, streams_at_resolution in self.candidates.items()})
+        self.resolutions = tuple(sorted(self.video_streams, key=resolution_value, reverse=True))
+        
+        # Fallback wie get_highest_resolution(): höchster progressiver MP4-Stream
+        self.highest_progressive = next((stream for stream in videos
+                                         if stream.is_progressive and stream.subtype == "mp4"), None)
+        
+        self.audio_streams = tuple(audios)
+    
+    @property
+    def highest_resolution(self):
+        return self.resolutions[0] if self.resolutions else None
+    
+    def select_video(self, quality, policy=None):
+        """Video-Stream für eine Qualitätsangabe ("highest", "1080p* (beste)", "720p") wählen"""
+        policy = policy or StreamPolicy()
+        
+        if quality == "highest":
+            resolutions = self.resolutions
+            if not resolutions:
+                return self.highest_progressive
+        else:
+            # Auflösung aus dem String extrahieren (z.B. "1080p* (beste)" -> "1080p")
+            resolution = quality.split("*")[0].strip()
+            if resolution not in self.candidates:
+                print(f"Keine {quality} Auflösung verfügbar, verwende höchste verfügbare Auflösung")
+                return self.highest_progressive
+            resolutions = (resolution,)
+        
+        # Höchstauflösung beachten - ist keine erlaubt, die niedrigste der Auswahl verwenden
+        allowed = [resolution for resolution in resolutions if policy.allows_resolution(resolution)]
+        allowed = allowed or list(resolutions[-1:])
+        
+        audio_size = 0
+        if policy.max_filesize:
+            mux_audio = self.mux_audio(policy)
+            audio_size = mux_audio.filesize if mux_audio else 0
+        
+        def total_size(stream):
+            return (stream.filesize or 0) + (0 if stream.is_progressive else audio_size)
+        
+        for resolution in allowed:
+            # sorted() ist stabil - ohne Vorlieben bleibt die Standard-Reihenfolge erhalten
+            for stream in sorted(self.candidates[resolution], key=policy.video_rank):
+                if not policy.max_filesize or total_size(stream) <= policy.max_filesize:
+                    return stream
+        
+        # Nichts passt unter die Höchstgröße - kleinsten Stream verwenden
+        smallest = min((stream for resolution in allowed for stream in self.candidates[resolution]),
+                       key=total_size)
+        print(f"Kein Stream unter {format_size(policy.max_filesize)}, verwende den kleinsten ({smallest.resolution})")
+        return smallest
+    
+    def audio_candidates(self, policy=None):
+        """Audio-Streams nach Bitrate absteigend, bei gewünschter Sprache nur passende Tonspuren"""
+        language = policy.audio_language if policy else None
+        if language:
+            matching = tuple(stream for stream in self.audio_streams
+                             if (getattr(stream, "audio_track_language_id", None) or "").lower() == language.lower())
+            if matching:
+                return matching
+        return self.audio_streams
+    
+    def select_audio(self, policy=None):
+        """Besten Audio-Stream wählen"""
+        candidates = self.audio_candidates(policy)
+        return candidates[0] if candidates else None
+    
+    def mux_audio(self, policy=None):
+        """Audio-Stream fürs Muxing - AAC wird bevorzugt, da er nur kopiert werden muss; andere
+        Codecs (z.B. Opus) werden beim Muxing nach AAC umgewandelt"""
+        candidates = self.audio_candidates(policy)
+        return next((stream for stream in candidates if DownloadEngine.is_mp4_audio(stream)),
+                    candidates[0] if candidates else None)
+    
+    def mp3_audio(self, quality, policy=None):
+        """Audio-Stream für die gewählte MP3-Qualität (z.B. "192kbps", sonst der beste)"""
+        if quality != "highest":
+            for stream in self.audio_candidates(policy):
+                if stream.abr and stream.abr.replace("kbps", "") == quality.replace("kbps", ""):
+                    return stream
+        return self.select_audio(policy)
+    
+    def native_audio(self, quality, policy=None):
+        """Audio-Stream für den Original-Modus ("m4a" = beste AAC-Spur, sonst beste Spur)"""
+        if quality == "m4a":
+            for stream in self.audio_candidates(policy):
+                if DownloadEngine.is_mp4_audio(stream):
+                    return stream
+        return self.select_audio(policy)
+
+
+class DownloadEngine:
+    """Tk-unabhängige Download-Pipeline: Stream-Auswahl, Download, Muxing und Konvertierung"""
+    
+    def __init__(self, ffmpeg_path=None, connections=4, streaming=True, ffmpeg_processes=None,
+                 metadata_cache=None, work_root=None, limiter=None, archive=None, resumable_streaming=False):
+        # FFmpeg-Pfad - kann mit probe_ffmpeg() auch im Hintergrund ermittelt werden
+        self._ffmpeg_ready = threading.Event()
+        self.ffmpeg_path = ffmpeg_path
+        self.connections = connections
+        # Optionaler MetadataCache für Aufträge ohne bereits geladene Video-Informationen
+        self.metadata_cache = metadata_cache
+        # Gemeinsame Überwachung aller FFmpeg-Prozesse (Standard: ein Prozess pro CPU-Kern)
+        self.ffmpeg = FFmpegSupervisor(ffmpeg_processes)
+        # Downloads direkt an FFmpeg übergeben (Named Pipes bzw. stdin) statt über Zwischendateien
+        self.streaming = streaming
+        # Direkt übergebene Streams zusätzlich in ein ResumeJournal schreiben (fortsetzbar, aber
+        # mit den Schreibzugriffen einer Zwischendatei)
+        self.resumable_streaming = resumable_streaming
+        # Wurzel der Arbeitsverzeichnisse (ScratchDir) der Aufträge, z.B. auf einer schnellen SSD
+        self.work_root = work_root or default_work_root()
+        # Bandbreitengrenze, die sich alle Übertragungen teilen
+        self.limiter = limiter or BANDWIDTH
+        # Optionales DownloadArchive - bereits vorhandene Downloads werden übersprungen
+        self.archive = archive
+        # Schützt die Namenswahl für Ausgabedateien gleichzeitig fertig werdender Aufträge
+        self.output_lock = threading.Lock()
+    
+    def throttle(self, job):
+        """Drossel-Funktion für die Übertragungen eines Auftrags (Gewicht wird bei jedem Chunk gelesen)"""
+        return lambda amount: self.limiter.acquire(amount, job.job_id, job.weight, job.cancel_event)
+    
+    def downloader(self, job):
+        """SegmentedDownloader für einen Auftrag (Verbindungen und Bandbreitengrenze der Engine)"""
+        return SegmentedDownloader(connections=self.connections, throttle=self.throttle(job))
+    
+    @staticmethod
+    def is_mp4_audio(stream):
+        """Prüfen, ob der Audio-Codec ohne Neucodierung in einen MP4-Container passt (AAC)"""
+        codec = getattr(stream, "audio_codec", None) or ""
+        return codec.startswith(MP4_AUDIO_CODECS)
+    
+    @staticmethod
+    def native_audio_extension(stream):
+        """Dateiendung, unter der die Audiospur ohne Neucodierung gespeichert wird (oder None)"""
+        codec = getattr(stream, "audio_codec", None) or ""
+        for prefix, extension in NATIVE_AUDIO_EXTENSIONS.items():
+            if codec.startswith(prefix):
+                return extension
+        return None
+    
+    def fetch(self, job, notify):
+        """Netzwerkphase eines Auftrags: Metadaten laden, Streams wählen und herunterladen
+        
+        Gibt None zurück, wenn der Auftrag damit fertig ist, sonst (Zustand, Funktion) für die
+        Nachbearbeitung (Muxing/Konvertierung), die in einem eigenen Pool läuft.
+        """
+        job.start_time = time.time()
+        
+        # Bereits heruntergeladene Videos überspringen - vor jedem Netzwerkzugriff
+        if self.skip_archived(job):
+            return None
+        
+        load_network_modules()
+        
+        # Fortschritt pro Stream (itag -> (heruntergeladen, gesamt)), damit parallele
+        # Downloads (Video + Audio) zu einem gemeinsamen Fortschritt zusammengefasst werden
+        stream_progress = {}
+        
+        # Wird gesetzt, wenn einer von mehreren parallelen Downloads fehlschlägt
+        transfer_failed = CancelEvent()
+        throttle = self.throttle(job)
+        
+        # Fortschritts-Callback - schreibt nur Zähler in den Auftrag, die Anzeige liest sie
+        # im festen Takt des ProgressAggregator (keine UI-Ereignisse pro Chunk)
+        def progress_callback(stream, chunk, bytes_remaining):
+            # Abbruch prüfen - PyTubefix hat keine integrierte Möglichkeit, den Download zu
+            # stoppen, daher lösen wir eine Exception aus, um den Prozess zu beenden
+            job.check_abort()
+            
+            # Paralleler Download fehlgeschlagen - diesen Stream ebenfalls beenden
+            if transfer_failed.is_set():
+                raise Exception("Paralleler Download fehlgeschlagen")
+            
+            # Downloads über PyTubeFix liefern den Chunk mit - hier drosseln (der
+            # SegmentedDownloader drosselt selbst und übergibt keinen Chunk)
+            if chunk:
+                throttle(len(chunk))
+            
+            # Einzelne Zuweisungen sind unter dem GIL atomar, daher ohne Lock
+            stream_progress[stream.itag] = (stream.filesize - bytes_remaining, stream.filesize)
+            
+            # Summe über alle laufenden Streams bilden
+            progress = list(stream_progress.values())
+            bytes_downloaded = sum(done for done, total in progress)
+            total_bytes = sum(total for done, total in progress)
+            job.total_bytes = total_bytes
+            job.bytes_downloaded = bytes_downloaded
+            if total_bytes > 0:
+                job.progress = bytes_downloaded / total_bytes * 100
+        
+        # YouTube-Objekt erstellen (bzw. aus dem Metadaten-Cache übernehmen)
+        if not job.yt and self.metadata_cache:
+            job.yt, job.stream_index = self.metadata_cache.load(job.url)
+        yt = job.yt if job.yt else YouTube(job.url)
+        yt.register_on_progress_callback(progress_callback)
+        
+        job.title = yt.title
+        job.video_id = yt.video_id
+        notify(job)
+        job.check_abort()
+        
+        sanitized_title = sanitize_filename(yt.title)
+        
+        # Stream-Auswahl einmal pro Video indizieren
+        if not job.stream_index:
+            job.stream_index = StreamIndex(yt)
+        index = job.stream_index
+        
+        # Video herunterladen
+        if job.format_type == "mp4":
+            # Stream basierend auf der gewählten Qualität und den Auswahlregeln finden
+            stream = index.select_video(job.quality, job.policy)
+            
+            if not stream:
+                raise Exception("Kein passender Video-Stream gefunden")
+            
+            requires_muxing = not stream.is_progressive
+            job.itags = [stream.itag]
+            print(f"Ausgewählter Stream: {stream.resolution}, {stream.fps} fps, {stream.video_codec}, "
+                  f"{format_size(stream.filesize)}")
+            
+            if requires_muxing and self.ffmpeg_path:
+                audio_stream = index.mux_audio(job.policy)
+                best_audio = index.select_audio(job.policy)
+                if audio_stream:
+                    job.itags.append(audio_stream.itag)
+                if audio_stream is not best_audio:
+                    print(f"Verwende AAC-Audio ({audio_stream.abr}) statt {best_audio.audio_codec}, um Neucodierung zu vermeiden")
+                
+                # Zieldateiname (wird erst unmittelbar vor FFmpeg per reserve_output belegt)
+                output_base = os.path.join(job.output_path, f"{sanitized_title}.mp4")
+                
+                # Named Pipes für zwei Eingaben gibt es nur unter POSIX
+                if audio_stream and hasattr(os, "mkfifo") and self.can_stream_to_ffmpeg(yt.video_id, stream, audio_stream):
+                    job.status = "Lade herunter und kombiniere Video und Audio..."
+                    notify(job)
+                    
+                    for transfer_stream in (stream, audio_stream):
+                        stream_progress[transfer_stream.itag] = (0, transfer_stream.filesize)
+                    
+                    output_file = self.reserve_output(output_base)
+                    if self.stream_mux(job, stream, audio_stream, output_file, transfer_failed, progress_callback,
+                                       duration=yt.length):
+                        job.output_file = output_file
+                        return None
+                    self.release_output(output_file)
+                    
+                    # Fallback: klassisch über Zwischendateien herunterladen und danach kombinieren
+                    job.check_abort()
+                    print("Direktes Kombinieren fehlgeschlagen, verwende Zwischendateien...")
+                    transfer_failed.clear()
+                    stream_progress.clear()
+                
+                # Zwischendateien im eigenen Arbeitsverzeichnis des Auftrags (keine Kollisionen)
+                scratch = self.scratch_dir(job)
+                temp_video_file = scratch.file(f"video.{stream.subtype}")
+                transfers = [(stream, temp_video_file)]
+                
+                temp_audio_file = None
+                if audio_stream:
+                    temp_audio_file = scratch.file(f"audio.{audio_stream.subtype}")
+                    transfers.append((audio_stream, temp_audio_file))
+                    job.status = "Lade Video und Audio herunter (Phase 1/2)..."
+                else:
+                    job.status = "Lade Video herunter (Phase 1/2)..."
+                notify(job)
+                
+                # Gesamtgröße von Anfang an kennen, damit Fortschritt und ETA beide Streams abdecken
+                for transfer_stream, temp_file in transfers:
+                    stream_progress[transfer_stream.itag] = [0, transfer_stream.filesize]
+                
+                # Video- und Audio-Stream gleichzeitig herunterladen
+                self.download_streams_parallel(job, transfers, transfer_failed, progress_callback, yt.video_id)
+                
+                # Nach dem Download Abbruch prüfen
+                job.check_abort()
+                
+                if not temp_audio_file:
+                    # Kein Audio-Stream gefunden - Nur Video speichern
+                    job.output_file = self.place_output(
+                        temp_video_file, os.path.join(job.output_path, f"{sanitized_title}_video_only.{stream.subtype}"))
+                    job.message = "Kein Audio-Stream gefunden. Nur Video wird gespeichert."
+                    return None
+                
+                def mux():
+                    # Mit FFmpeg kombinieren
+                    job.status = "Kombiniere Video und Audio (Phase 2/2)..."
+                    notify(job)
+                    
+                    output_file = self.reserve_output(output_base)
+                    combine_success = self.combine_video_audio(
+                        job, temp_video_file, temp_audio_file, output_file,
+                        copy_audio=self.is_mp4_audio(audio_stream),
+                        duration=yt.length
+                    )
+                    if not combine_success:
+                        self.release_output(output_file)
+                    job.check_abort()
+                    
+                    if combine_success:
+                        job.output_file = output_file
+                    else:
+                        # Fehler beim Kombinieren - Nur Video behalten
+                        job.output_file = self.place_output(
+                            temp_video_file, os.path.join(job.output_path, f"{sanitized_title}_video_only.{stream.subtype}"))
+                        job.message = "Kombinieren von Video und Audio fehlgeschlagen. Nur Video-Stream wird gespeichert."
+                    
+                    # Temporäre Dateien löschen
+                    self.cleanup_job(job)
+                
+                return DownloadJob.MUXING, mux
+            
+            # Normaler Download ohne Muxing
+            job.status = "Lade Video herunter..."
+            notify(job)
+            output_file = self.reserve_output(os.path.join(job.output_path, f"{sanitized_title}.{stream.subtype}"))
+            try:
+                job.output_file = self.download_stream(job, stream, output_file, progress_callback, yt.video_id)
+            except BaseException:
+                self.release_output(output_file)
+                raise
+            return None
+        
+        elif job.format_type == "mp3":
+            job.status = "Lade Audio herunter..."
+            notify(job)
+            
+            # Audio-Stream basierend auf Qualität auswählen
+            stream = index.mp3_audio(job.quality, job.policy)
+            
+            if not stream:
+                raise Exception("Kein Audio-Stream gefunden")
+            
+            print(f"Ausgewählter Audio-Stream: {stream.abr if hasattr(stream, 'abr') else 'unbekannte Bitrate'}")
+            job.itags = [stream.itag]
+            
+            # Zieldateiname der MP3-Datei (wird erst unmittelbar vor FFmpeg per reserve_output belegt)
+            mp3_base = os.path.join(job.output_path, f"{sanitized_title}.mp3")
+            
+            # Bitrate für MP3-Konvertierung festlegen (z.B. "128kbps" -> "128k")
+            bitrate = "192k"  # Standardwert
+            if job.quality in ("192kbps", "128kbps", "96kbps", "64kbps"):
+                bitrate = job.quality.replace("kbps", "k")
+            
+            # Ohne MP3-Encoder (FFmpeg fehlt oder wurde ohne libmp3lame gebaut) keine Konvertierung
+            can_convert = bool(self.ffmpeg_info and self.ffmpeg_info.mp3_encoder)
+            
+            if can_convert and self.can_stream_to_ffmpeg(yt.video_id, stream):
+                # Während des Downloads konvertieren - ohne Zwischendatei im Ausgabeverzeichnis
+                job.status = "Lade herunter und konvertiere zu MP3..."
+                notify(job)
+                stream_progress[stream.itag] = (0, stream.filesize)
+                
+                mp3_file = self.reserve_output(mp3_base)
+                if self.stream_convert_to_mp3(job, stream, mp3_file, bitrate, progress_callback,
+                                             duration=yt.length):
+                    job.output_file = mp3_file
+                    return None
+                self.release_output(mp3_file)
+                
+                # Fallback: erst vollständig herunterladen, dann konvertieren
+                job.check_abort()
+                print("Direkte Konvertierung fehlgeschlagen, verwende Zwischendatei...")
+                stream_progress.clear()
+                job.status = "Lade Audio herunter..."
+                notify(job)
+            
+            # Audio ins Arbeitsverzeichnis herunterladen (wird bei Abbruch mit ihm gelöscht)
+            temp_file = self.scratch_dir(job).file(f"audio.{stream.subtype}")
+            original_file = os.path.join(job.output_path, f"{sanitized_title}.{stream.subtype}")
+            self.download_stream(job, stream, temp_file, progress_callback, yt.video_id)
+            job.check_abort()
+            
+            # Kein FFmpeg bzw. MP3-Encoder verfügbar, Audio im Originalformat behalten
+            if not can_convert:
+                job.output_file = self.place_output(temp_file, original_file)
+                job.message = ("FFmpeg enthält keinen MP3-Encoder." if self.ffmpeg_info else "FFmpeg nicht gefunden.") \
+                    + " Audio bleibt im Originalformat."
+                return None
+            
+            def convert():
+                # MP3-Konvertierung starten
+                job.status = "Konvertiere zu MP3..."
+                notify(job)
+                
+                mp3_file = self.reserve_output(mp3_base)
+                conversion_success = self.convert_to_mp3(job, temp_file, mp3_file, bitrate, duration=yt.length)
+                if not conversion_success:
+                    self.release_output(mp3_file)
+                job.check_abort()
+                
+                if conversion_success:
+                    # Temporäre Datei löschen
+                    job.output_file = mp3_file
+                    self.cleanup_job(job)
+                else:
+                    # Echter Fehler bei der Konvertierung - Original behalten
+                    job.output_file = self.place_output(temp_file, original_file)
+                    job.message = "Konvertierung zu MP3 fehlgeschlagen. Datei bleibt im Originalformat."
+            
+            return DownloadJob.CONVERTING, convert
+        
+        elif job.format_type == "audio":
+            job.status = "Lade Audio herunter..."
+            notify(job)
+            
+            # Audiospur im Originalformat - keine Neucodierung, nur Containerwechsel
+            stream = index.native_audio(job.quality, job.policy)
+            
+            if not stream:
+                raise Exception("Kein Audio-Stream gefunden")
+            
+            print(f"Ausgewählter Audio-Stream: {stream.audio_codec}, {stream.abr}")
+            job.itags = [stream.itag]
+            
+            # Zwischendatei im Arbeitsverzeichnis - ins Ausgabeverzeichnis kommt nur das Ergebnis
+            temp_file = self.scratch_dir(job).file(f"audio.{stream.subtype}")
+            self.download_stream(job, stream, temp_file, progress_callback, yt.video_id)
+            job.check_abort()
+            
+            extension = self.native_audio_extension(stream)
+            base_file = os.path.join(job.output_path, sanitized_title)
+            
+            if not extension or not (self.ffmpeg_info and self.ffmpeg_info.can_write(extension)):
+                if extension == "m4a":
+                    # AAC im MP4-Container ist bereits eine gültige M4A-Datei
+                    job.output_file = self.place_output(temp_file, f"{base_file}.m4a")
+                else:
+                    job.output_file = self.place_output(temp_file, f"{base_file}.{stream.subtype}")
+                    job.message = ("FFmpeg kann dieses Format nicht schreiben." if self.ffmpeg_info
+                                   else "FFmpeg nicht gefunden.") + " Audio bleibt im Originalcontainer."
+                return None
+            
+            def extract():
+                job.status = "Extrahiere Audio..."
+                notify(job)
+                
+                audio_file = self.reserve_output(f"{base_file}.{extension}")
+                extraction_success = self.extract_audio(job, temp_file, audio_file, duration=yt.length)
+                if not extraction_success:
+                    self.release_output(audio_file)
+                job.check_abort()
+                
+                if extraction_success:
+                    job.output_file = audio_file
+                    self.cleanup_job(job)
+                else:
+                    job.output_file = self.place_output(temp_file, f"{base_file}.{stream.subtype}")
+                    job.message = "Extrahieren der Audiospur fehlgeschlagen. Datei bleibt im Originalcontainer."
+            
+            return DownloadJob.CONVERTING, extract
+        
+        else:
+            raise Exception(f"Unbekanntes Format: {job.format_type}")
+    
+    def download_stream(self, job, stream, target_file, progress_callback, video_id=None):
+        """Einzelnen Stream herunterladen - segmentiert, falls der Server Range-Anfragen unterstützt"""
+        # SABR-Streams und Streams ohne bekannte Größe können nur über PyTubeFix geladen werden
+        filesize = stream.filesize
+        if getattr(stream, "is_sabr", False) or not filesize:
+            return stream.download(
+                output_path=os.path.dirname(target_file),
+                filename=os.path.basename(target_file)
+            )
+        
+        # Zwischenstand pro Video-ID + itag + Größe, damit abgebrochene Downloads fortgesetzt werden
+        journal = self.claim_journal(video_id, stream)
+        
+        downloader = self.downloader(job)
+        try:
+            return downloader.download(
+                stream.url,
+                target_file,
+                filesize,
+                progress_callback=lambda downloaded: progress_callback(stream, None, filesize - downloaded),
+                journal=journal
+            )
+        except RangeNotSupportedError as e:
+            print(f"Segmentierter Download nicht möglich ({e}), verwende einfachen Download...")
+            if journal:
+                journal.discard()
+            return stream.download(
+                output_path=os.path.dirname(target_file),
+                filename=os.path.basename(target_file)
+            )
+        finally:
+            if journal:
+                journal.release()
+    
+    def claim_journal(self, video_id, stream):
+        """ResumeJournal eines Streams exklusiv beanspruchen
+        
+        None ohne Video-ID oder wenn ein anderer Auftrag denselben Stream gerade lädt - dann
+        wird ohne Zwischenstand geladen. Der Aufrufer gibt das Journal mit release() frei.
+        """
+        if not video_id:
+            return None
+        journal = ResumeJournal(get_cache_dir("resume"), video_id, stream.itag, stream.filesize)
+        if not journal.claim():
+            print(f"Stream {stream.itag} wird bereits von einem anderen Auftrag geladen - lade ohne Zwischenstand")
+            return None
+        return journal
+    
+    def can_stream_to_ffmpeg(self, video_id, *streams):
+        """Prüfen, ob die Streams direkt (ohne Zwischendateien) an FFmpeg übergeben werden können"""
+        if not (self.streaming and self.ffmpeg_path):
+            return False
+        
+        for stream in streams:
+            if not stream.filesize or getattr(stream, "is_sabr", False):
+                return False
+            
+            # Ein abgebrochener Download wird über Zwischendateien fortgesetzt statt neu geladen -
+            # außer SegmentedDownloader.stream() darf das Journal selbst fortsetzen
+            journal = ResumeJournal(get_cache_dir("resume"), video_id, stream.itag, stream.filesize)
+            if not self.resumable_streaming and os.path.exists(journal.journal_file):
+                return False
+        
+        return True
+    
+    def stream_mux(self, job, video_stream, audio_stream, output_file, transfer_failed, progress_callback,
+                   duration=None):
+        """Video und Audio während des Downloads über Named Pipes an FFmpeg übergeben
+        
+        Jeder Stream wird in der richtigen Reihenfolge in eine eigene FIFO geschrieben, FFmpeg
+        kombiniert direkt in die Zieldatei. Gibt False zurück, wenn das Kombinieren nicht
+        möglich war (der Aufrufer fällt dann auf Zwischendateien zurück). Fortsetzbar nach
+        einem Abbruch ist das nur mit resumable_streaming (siehe stream_journal).
+        """
+        scratch = self.scratch_dir(job)
+        fifos = []
+        errors = []
+        journals = [self.stream_journal(job, stream) for stream in (video_stream, audio_stream)]
+        
+        def feed(stream, fifo, journal):
+            try:
+                # open() blockiert, bis FFmpeg die Pipe zum Lesen öffnet
+                with open(fifo, "wb") as pipe:
+                    self.downloader(job).stream(
+                        stream.url,
+                        stream.filesize,
+                        pipe.write,
+                        progress_callback=lambda downloaded: progress_callback(stream, None, stream.filesize - downloaded),
+                        journal=journal
+                    )
+            except Exception as e:
+                # Ursprünglichen Fehler merken, FFmpeg und den anderen Stream beenden
+                if not transfer_failed.is_set():
+                    errors.append(e)
+                transfer_failed.set()
+        
+        try:
+            for index, stream in enumerate((video_stream, audio_stream)):
+                fifo = scratch.file(f"input{index}.{stream.subtype}")
+                os.mkfifo(fifo)
+                fifos.append(fifo)
+            
+            feeders = [threading.Thread(target=feed, args=(stream, fifo, journal), daemon=True)
+                       for stream, fifo, journal in zip((video_stream, audio_stream), fifos, journals)]
+            for feeder in feeders:
+                feeder.start()
+            
+            success = self.combine_video_audio(
+                job, fifos[0], fifos[1], output_file,
+                copy_audio=self.is_mp4_audio(audio_stream),
+                cancel_event=transfer_failed,
+                duration=duration
+            )
+            
+            # Schreiber freigeben, die noch auf das Öffnen einer Pipe warten (FFmpeg vorzeitig beendet)
+            transfer_failed.set()
+            for feeder in feeders:
+                while feeder.is_alive():
+                    for fifo in fifos:
+                        try:
+                            os.close(os.open(fifo, os.O_RDONLY | os.O_NONBLOCK))
+                        except OSError:
+                            pass
+                    feeder.join(0.1)
+            
+            if errors:
+                # Unvollständige Eingabe - Ergebnis verwerfen, auch wenn FFmpeg erfolgreich war
+                if os.path.exists(output_file):
+                    os.remove(output_file)
+                print(f"Fehler beim direkten Kombinieren: {errors[0]}")
+                return False
+            
+            if success:
+                # Zwischenstände werden nur für eine Fortsetzung nach Abbruch oder Fehler gebraucht
+                for journal in journals:
+                    if journal:
+                        journal.discard()
+            return success
+        finally:
+            for fifo in fifos:
+                scratch.remove(fifo)
+            for journal in journals:
+                if journal:
+                    journal.release()
+    
+    def stream_journal(self, job, stream):
+        """ResumeJournal für einen direkt an FFmpeg übergebenen Stream
+        
+        Nur mit resumable_streaming - sonst (und ohne bekannte Video-ID) None, damit das
+        direkte Übergeben keine Kopie des Streams auf die Platte schreibt. Beansprucht wie
+        claim_journal(); der Aufrufer gibt das Journal mit release() frei.
+        """
+        if not self.resumable_streaming:
+            return None
+        return self.claim_journal(job.video_id, stream)
+    
+    def stream_convert_to_mp3(self, job, stream, output_file, bitrate, progress_callback, duration=None):
+        """Audio-Stream während des Downloads über stdin an FFmpeg übergeben und zu MP3 kodieren
+        
+        Gibt False zurück, wenn Download oder Konvertierung fehlgeschlagen sind (der Aufrufer
+        fällt dann auf eine Zwischendatei zurück).
+        """
+        journal = self.stream_journal(job, stream)
+        
+        def feed(write):
+            self.downloader(job).stream(
+                stream.url,
+                stream.filesize,
+                write,
+                progress_callback=lambda downloaded: progress_callback(stream, None, stream.filesize - downloaded),
+                journal=journal
+            )
+        
+        try:
+            success = self.convert_to_mp3(job, "pipe:0", output_file, bitrate, feed=feed, duration=duration)
+            if success and journal:
+                # Zwischenstand wird nur für eine Fortsetzung nach Abbruch oder Fehler gebraucht
+                journal.discard()
+            return success
+        finally:
+            if journal:
+                journal.release()
+    
+    def download_streams_parallel(self, job, transfers, transfer_failed, progress_callback, video_id=None):
+        """Mehrere Streams (z.B. Video und Audio) gleichzeitig herunterladen"""
+        errors = []
+        
+        def download_worker(stream, target_file):
+            try:
+                return self.download_stream(job, stream, target_file, progress_callback, video_id)
+            except Exception as e:
+                # Ursprünglichen Fehler merken und übrige Downloads beim nächsten Chunk beenden
+                if not transfer_failed.is_set():
+                    errors.append(e)
+                transfer_failed.set()
+        
+        with ThreadPoolExecutor(max_workers=len(transfers)) as executor:
+            futures = [executor.submit(download_worker, stream, target_file)
+                       for stream, target_file in transfers]
+        
+        # Executor hat beim Verlassen auf alle Threads gewartet
+        if transfer_failed.is_set():
+            raise errors[0] if errors else Exception("Paralleler Download fehlgeschlagen")
+        return [future.result() for future in futures]
+    
+    @property
+    def ffmpeg_ready(self):
+        """True, sobald die FFmpeg-Suche abgeschlossen ist (ffmpeg_info/ffmpeg_path blockieren dann nicht mehr)"""
+        return self._ffmpeg_ready.is_set()
+    
+    @property
+    def ffmpeg_info(self):
+        """FFmpegInfo des verwendeten FFmpeg (None = nicht vorhanden), wartet ggf. auf die laufende Suche"""
+        self._ffmpeg_ready.wait()
+        return self._ffmpeg_info
+    
+    @property
+    def ffmpeg_path(self):
+        """Pfad zu FFmpeg (None = nicht vorhanden)"""
+        info = self.ffmpeg_info
+        return info.path if info else None
+    
+    @ffmpeg_path.setter
+    def ffmpeg_path(self, path):
+        # Version und Fähigkeiten kommen aus der FFmpegRegistry (nur neue Programme werden gestartet)
+        self._ffmpeg_info = FFMPEG_REGISTRY.info(path) if path else None
+        self._ffmpeg_ready.set()
+    
+    def probe_ffmpeg(self, on_found=None):
+        """FFmpeg im Hintergrund suchen, on_found(pfad) wird danach im Such-Thread aufgerufen"""
+        self._ffmpeg_ready.clear()
+        
+        def probe():
+            start = time.perf_counter()
+            try:
+                path = find_ffmpeg()
+            except Exception as e:
+                print(f"Fehler bei der Suche nach FFmpeg: {e}")
+                path = None
+            STARTUP.record("FFmpeg-Suche", time.perf_counter() - start)
+            self.ffmpeg_path = path
+            if on_found:
+                on_found(path)
+        
+        threading.Thread(target=probe, daemon=True).start()
+    
+    def forget_cached_video(self, job):
+        """Zwischengespeicherte Video-Informationen nach einem Fehler verwerfen (z.B. abgelaufene URLs)"""
+        if self.metadata_cache and isinstance(job.yt, CachedVideo):
+            self.metadata_cache.invalidate(job.yt.video_id)
+    
+    def skip_archived(self, job):
+        """Auftrag als erledigt markieren, falls das Video laut Archiv bereits vorliegt"""
+        entry = self.archive.lookup(job.url, job.format_type, job.quality, job.output_path) if self.archive else None
+        if not entry:
+            return False
+        
+        job.output_file = entry["output_file"]
+        job.title = entry["title"] or job.title
+        job.message = "Bereits heruntergeladen - übersprungen"
+        return True
+    
+    def record_download(self, job):
+        """Erfolgreichen Auftrag im Archiv eintragen (nicht bei Ersatzergebnissen wie "nur Video")"""
+        if not (self.archive and job.video_id and job.output_file) or job.message:
+            return
+        self.archive.record(job.video_id, job.format_type, job.quality, job.output_file,
+                            title=job.title, itags=job.itags)
+    
+    def place_output(self, source, target):
+        """Fertige Datei ins Ausgabeverzeichnis verschieben, ohne eine vorhandene Datei zu überschreiben"""
+        with self.output_lock:
+            target = unique_path(target)
+            shutil.move(source, target)
+        return target
+    
+    def reserve_output(self, target):
+        """Freien Namen für eine Ausgabedatei wählen und als leere Datei belegen (FFmpeg schreibt hinein)"""
+        with self.output_lock:
+            target = unique_path(target)
+            open(target, "wb").close()
+        return target
+    
+    def release_output(self, target):
+        """Nicht genutzte Reservierung wieder freigeben (nur solange die Datei leer ist)"""
+        try:
+            if os.path.getsize(target) == 0:
+                os.remove(target)
+        except OSError:
+            pass
+    
+    def scratch_dir(self, job):
+        """Arbeitsverzeichnis des Auftrags (wird beim ersten Zugriff angelegt)"""
+        if job.scratch is None:
+            job.scratch = ScratchDir(self.work_root, job.job_id)
+        return job.scratch
+    
+    def cleanup_job(self, job):
+        """Zwischendateien eines Auftrags (Arbeitsverzeichnis laut Manifest) löschen"""
+        if job.scratch:
+            job.scratch.cleanup()
+            job.scratch = None
+    
+    def combine_video_audio(self, job, video_file, audio_file, output_file, copy_audio=False, cancel_event=None,
+                            duration=None):
+        """Video und Audio mit FFmpeg kombinieren
+        
+        Mit copy_audio=True (AAC-Audio) werden beide Streams nur kopiert, sonst wird das Audio
+        nach AAC umgewandelt.
+        """
+        print(f"Kombiniere {video_file} und {audio_file} zu {output_file}")
+        
+        if copy_audio:
+            # Video und Audio unverändert übernehmen (keine Neucodierung)
+            codec_args = ["-c", "copy"]
+        else:
+            encoder = self.ffmpeg_info.aac_encoder if self.ffmpeg_info else None
+            if not encoder:
+                print("FFmpeg enthält keinen AAC-Encoder - Kombinieren nicht möglich")
+                return False
+            codec_args = [
+                "-c:v", "copy",       # Video-Codec kopieren (keine Neucodierung)
+                "-c:a", encoder,      # Audio zu AAC konvertieren (MP4-kompatibel)
+                "-strict", "experimental"
+            ]
+        
+        return self.run_ffmpeg(job, [
+            "-i", video_file,     # Video-Eingabe
+            "-i", audio_file,     # Audio-Eingabe
+            "-map", "0:v:0",      # Nur die erste Video- und Audiospur übernehmen
+            "-map", "1:a:0",
+            *codec_args
+        ], output_file, "Muxing", cancel_event, duration=duration)
+    
+    def convert_to_mp3(self, job, input_file, output_file, bitrate="192k", feed=None, duration=None):
+        """MP3-Konvertierung mit FFmpeg (mit feed wird die Eingabe über stdin geliefert)"""
+        print(f"Konvertiere {input_file} zu MP3 mit Bitrate {bitrate}")
+        
+        encoder = self.ffmpeg_info.mp3_encoder if self.ffmpeg_info else None
+        if not encoder:
+            print("FFmpeg enthält keinen MP3-Encoder - Konvertierung nicht möglich")
+            return False
+        
+        return self.run_ffmpeg(job, [
+            "-i", input_file,     # Eingabedatei
+            "-vn",                # Keine Videospur
+            "-c:a", encoder,      # MP3-Encoder (libmp3lame bevorzugt)
+            "-ab", bitrate,       # Audiobitrate
+            "-ar", "44100"        # Sample Rate
+        ], output_file, "Konvertierung", feed=feed, duration=duration)
+    
+    def extract_audio(self, job, input_file, output_file, duration=None):
+        """Audiospur ohne Neucodierung in einen passenden Container übernehmen (.m4a/.opus)"""
+        print(f"Extrahiere Audio aus {input_file} nach {output_file}")
+        
+        return self.run_ffmpeg(job, [
+            "-i", input_file,     # Eingabedatei
+            "-vn",                # Keine Videospur
+            "-c:a", "copy"        # Audio unverändert kopieren
+        ], output_file, "Extraktion", duration=duration)
+    
+    def run_ffmpeg(self, job, arguments, output_file, description, cancel_event=None, feed=None, duration=None):
+        """FFmpeg mit den angegebenen Argumenten ausführen, gibt True bei Erfolg zurück
+        
+        Bei Abbruch des Auftrags (oder gesetztem cancel_event) beendet der FFmpegSupervisor
+        den Prozess sofort; unvollständige Ausgabedateien werden gelöscht. feed(write) liefert
+        die Eingabe für "pipe:0" - schlägt feed fehl, gilt der Aufruf als fehlgeschlagen. Mit
+        bekannter Mediendauer (Sekunden) werden Fortschritt, Geschwindigkeit und Restzeit
+        laufend im Auftrag (job.processing_*) gemeldet.
+        """
+        info = self.ffmpeg_info
+        if not info:
+            return False
+        
+        try:
+            # Abbruch überprüfen
+            if job.aborted:
+                return False
+            
+            # Die Ausgabedatei ist per reserve_output() belegt - FFmpeg überschreibt sie mit -y
+            
+            # Fortschritt blockweise auswerten, bis FFmpeg stdout schließt (ältere
+            # Versionen ohne -progress laufen ohne Fortschrittsanzeige)
+            progress = FFmpegProgress(duration)
+            if duration and info.progress:
+                job.processing_progress = 0.0
+            
+            def on_output_line(line):
+                if progress.parse_line(line) and duration:
+                    job.processing_progress = progress.percent
+                    job.processing_speed = progress.speed
+                    job.processing_remaining_time = progress.remaining_time
+            
+            result = self.ffmpeg.run(
+                [
+                    info.path,
+                    "-hide_banner",       # Keine Versionsinformationen auf stderr
+                    "-nostats",           # Keine Statuszeilen auf stderr
+                    *(["-progress", "pipe:1"] if info.progress else []),  # Maschinenlesbarer Fortschritt
+                    *arguments,
+                    # Video-URL als Kommentar, damit DownloadArchive.rebuild die Datei zuordnen kann
+                    *(["-metadata", f"comment=https://youtu.be/{job.video_id}"] if job.video_id else []),
+                    "-y",                 # Überschreiben ohne Nachfrage
+                    output_file
+                ],
+                cancel_events=(job.cancel_event, cancel_event),
+                feed=feed,
+                on_output_line=on_output_line
+            )
+            
+            if result.feed_error:
+                print(f"Fehler beim Übergeben der Eingabe an FFmpeg: {result.feed_error}")
+            
+            # Ergebnis überprüfen
+            success = result.success and os.path.exists(output_file)
+            
+            if not success and not result.cancelled and result.stderr_tail:
+                print(f"FFmpeg-Ausgabe ({description}):\n" + "\n".join(result.stderr_tail))
+            
+            if result.cpu_time is not None:
+                print(f"{description}: CPU-Zeit {result.cpu_time:.1f} s, max. Speicher "
+                      f"{format_size(result.peak_rss)}, Laufzeit {result.wall_time:.1f} s")
+            
+            # Bei Abbruch oder Fehler: Datei löschen
+            if (not success or job.aborted) and os.path.exists(output_file):
+                try:
+                    os.remove(output_file)
+                    print(f"Fehlerhafte oder abgebrochene Datei gelöscht: {output_file}")
+                except Exception as e:
+                    print(f"Fehler beim Löschen der Datei: {e}")
+            
+            if job.aborted:
+                return False
+            
+            print(f"{description} erfolgreich: {success}")
+            return success
+        
+        except Exception as e:
+            print(f"Fehler bei {description}: {e}")
+            
+            # Bei Ausnahme: Versuche die Datei zu löschen
+            if os.path.exists(output_file):
+                try:
+                    os.remove(output_file)
+                except:
+                    pass
+            
+            return False
+
+
+class CollectionResolver:
+    """Löst Playlists und Kanäle in einzelne Videos auf
+    
+    Metadaten und Stream-Manifest der Videos werden in einem begrenzten Thread-Pool
+    parallel geladen und einzeln gemeldet, sobald sie verfügbar sind.
+    """
+    
+    def __init__(self, max_workers=8, metadata_cache=None):
+        self.max_workers = max_workers
+        self.metadata_cache = metadata_cache
+    
+    def open_collection(self, url):
+        """Playlist- bzw. Kanal-Objekt und dessen Titel ermitteln"""
+        load_network_modules()
+        if CHANNEL_URL_PATTERN.match(url):
+            channel = Channel(url)
+            return channel, channel.channel_name
+        playlist = Playlist(url)
+        return playlist, playlist.title
+    
+    def resolve(self, url, on_resolved, on_error=None, cancel_event=None, skip=None):
+        """Alle Videos einer Playlist bzw. eines Kanals auflösen (blockiert bis alle fertig sind)
+        
+        on_resolved(video_url, yt, stream_index) und on_error(video_url, fehler)
+        werden aus den Pool-Threads aufgerufen. Für Videos, bei denen skip(video_url) zutrifft
+        (z.B. bereits archiviert), werden keine Metadaten geladen - on_resolved erhält dann
+        yt=None und stream_index=None. Gibt (Titel, Anzahl aufgelöster Videos) zurück.
+        """
+        collection, title = self.open_collection(url)
+        print(f"Löse auf: {title}")
+        
+        resolved = [0]
+        counter_lock = threading.Lock()
+        
+        def resolve_video(video_url):
+            if cancel_event and cancel_event.is_set():
+                return
+            if skip and skip(video_url):
+                with counter_lock:
+                    resolved[0] += 1
+                on_resolved(video_url, None, None)
+                return
+            try:
+                if self.metadata_cache:
+                    yt, stream_index = self.metadata_cache.load(video_url)
+                else:
+                    yt = YouTube(video_url)
+                    stream_index = StreamIndex(yt)
+            except Exception as e:
+                print(f"Fehler beim Laden von {video_url}: {e}")
+                if on_error:
+                    on_error(video_url, e)
+                return
+            
+            with counter_lock:
+                resolved[0] += 1
+            on_resolved(video_url, yt, stream_index)
+        
+        # video_urls lädt die Playlist seitenweise nach - Videos werden schon während
+        # des Blätterns an den Pool übergeben
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for video_url in collection.video_urls:
+                if cancel_event and cancel_event.is_set():
+                    break
+                executor.submit(resolve_video, video_url)
+        
+        return title, resolved[0]
+
+
+class ThroughputEstimator:
+    """Geglättete Übertragungsrate als exponentiell gewichteter Mittelwert (EWMA)
+    
+    update() erhält die bisher übertragene Gesamtmenge. Die Momentanrate seit der letzten
+    Messung fließt mit einem Gewicht ein, das vom zeitlichen Abstand abhängt - nach
+    `half_life` Sekunden zählt ein alter Wert nur noch zur Hälfte, unabhängig vom Takt.
+    """
+    
+    def __init__(self, half_life=3.0):
+        self.half_life = half_life
+        self.reset()
+    
+    def reset(self):
+        self.rate = 0.0
+        self.last_time = None
+        self.last_amount = 0
+        self.measured = False
+    
+    def update(self, amount, current_time=None):
+        """Neue Gesamtmenge erfassen und die geglättete Rate (pro Sekunde) zurückgeben"""
+        if current_time is None:
+            current_time = time.time()
+        
+        if self.last_time is None:
+            self.last_time = current_time
+            self.last_amount = amount
+            return self.rate
+        
+        elapsed = current_time - self.last_time
+        if elapsed <= 0:
+            return self.rate
+        
+        instant_rate = max(0, amount - self.last_amount) / elapsed
+        if self.measured:
+            weight = 1 - 0.5 ** (elapsed / self.half_life)
+            self.rate += weight * (instant_rate - self.rate)
+        else:
+            # Erste Messung direkt übernehmen, statt langsam von 0 anzusteigen
+            self.rate = instant_rate
+            self.measured = True
+        
+        self.last_time = current_time
+        self.last_amount = amount
+        return self.rate
+    
+    def remaining_time(self, remaining):
+        """Geschätzte Restzeit in Sekunden für die verbleibende Menge"""
+        return remaining / self.rate if self.rate > 0 else 0
+
+
+class ProgressAggregator:
+    """Bündelt Fortschrittsmeldungen aller Aufträge in einem gemeinsamen, periodischen Takt
+    
+    Download-Threads schreiben nur Zähler in ihren Auftrag und melden Zustandswechsel über
+    mark(). Die Anzeige (Tk-Timer bzw. Warteschleife im Headless-Modus) ruft tick() alle
+    `interval` Sekunden auf; dort werden die Raten berechnet. Die Kosten pro Takt sind damit
+    unabhängig von der Chunk-Rate.
+    
+    Raten werden geglättet (ThroughputEstimator) pro Auftrag und Phase (job.speed,
+    job.remaining_time) und gesamt über alle laufenden Übertragungen (speed, remaining_time,
+    bytes_downloaded, total_bytes) geführt. Pro Phase über alle Aufträge (phase_rates) zählt
+    beim Download die Übertragungsrate, bei der Nachbearbeitung die summierte Geschwindigkeit
+    laut FFmpeg als Vielfaches der Echtzeit - Bytes fallen nur beim Download an.
+    """
+    
+    # Phasen mit eigener Rate (Download in Bytes/s, Nachbearbeitung als Vielfaches der Echtzeit)
+    PHASES = (DownloadJob.FETCHING, DownloadJob.MUXING, DownloadJob.CONVERTING)
+    
+    def __init__(self, interval=0.25):
+        self.interval = interval
+        self.changed = deque()
+        
+        # Schätzer pro Auftrag (job_id -> (Zustand, Schätzer, zuletzt gesehene Bytes)) -
+        # bei einem Phasenwechsel beginnt die Messung neu
+        self.job_rates = {}
+        
+        # Übertragene Bytes gesamt (monoton, auch wenn Aufträge enden)
+        self.transferred = 0
+        self.total_rate = ThroughputEstimator()
+        
+        # Pro Phase: laufende Aufträge und aktuelle Rate sowie aufsummierte aktive Zeit und
+        # geleistete Arbeit (Bytes bzw. Sekunden Medienzeit) für die Mittelwerte
+        self.phase_jobs = {}
+        self.phase_rates = {}
+        self.phase_time = {}
+        self.phase_work = {}
+        self.last_tick = time.time()
+        
+        # Gesamtwerte aller laufenden Übertragungen
+        self.speed = 0
+        self.remaining_time = 0
+        self.bytes_downloaded = 0
+        self.total_bytes = 0
+    
+    def mark(self, job):
+        """Zustandswechsel eines Auftrags vormerken (aus beliebigen Threads)"""
+        # deque.append ist thread-sicher
+        self.changed.append(job)
+    
+    def tick(self, active_jobs):
+        """Raten der laufenden Aufträge aktualisieren und geänderte Aufträge zurückgeben"""
+        changed = {}
+        while self.changed:
+            job = self.changed.popleft()
+            changed[job.job_id] = job
+        
+        current_time = time.time()
+        job_rates = {}
+        bytes_downloaded = 0
+        total_bytes = 0
+        
+        # Seit dem letzten Takt beendete Aufträge nur noch abrechnen
+        finished_jobs = [job for job in changed.values() if job.finished]
+        for job in itertools.chain(active_jobs, finished_jobs):
+            if not job.total_bytes:
+                continue
+            
+            job_bytes = job.bytes_downloaded
+            state, estimator, last_bytes = self.job_rates.get(job.job_id, (None, None, 0))
+            
+            # Zuwachs seit dem letzten Takt dem Gesamtzähler gutschreiben
+            self.transferred += max(0, job_bytes - last_bytes)
+            
+            if job.finished:
+                continue
+            if state != job.state:
+                estimator = ThroughputEstimator()
+            
+            job.speed = estimator.update(job_bytes, current_time)
+            job.remaining_time = estimator.remaining_time(job.total_bytes - job_bytes)
+            job_rates[job.job_id] = (job.state, estimator, job_bytes)
+            
+            if job.state == DownloadJob.FETCHING:
+                bytes_downloaded += job_bytes
+                total_bytes += job.total_bytes
+        self.job_rates = job_rates
+        
+        transferred_before = self.total_rate.last_amount
+        self.speed = self.total_rate.update(self.transferred, current_time)
+        self.bytes_downloaded = bytes_downloaded
+        self.total_bytes = total_bytes
+        self.remaining_time = self.total_rate.remaining_time(total_bytes - bytes_downloaded)
+        
+        self._update_phases(active_jobs, current_time, self.transferred - transferred_before)
+        
+        return list(changed.values())
+    
+    def _update_phases(self, active_jobs, current_time, transferred):
+        """Raten pro Phase bilden und aktive Zeit sowie Arbeit seit dem letzten Takt verbuchen"""
+        phase_jobs = {}
+        phase_rates = {}
+        for job in active_jobs:
+            if job.state not in self.PHASES:
+                continue
+            phase_jobs[job.state] = phase_jobs.get(job.state, 0) + 1
+            if job.state != DownloadJob.FETCHING:
+                phase_rates[job.state] = phase_rates.get(job.state, 0) + job.processing_speed
+        if DownloadJob.FETCHING in phase_jobs:
+            phase_rates[DownloadJob.FETCHING] = self.speed
+        
+        elapsed = current_time - self.last_tick
+        for state in phase_jobs:
+            if state == DownloadJob.FETCHING:
+                work = transferred
+            elif phase_rates[state]:
+                work = phase_rates[state] * elapsed
+            else:
+                # Nachbearbeitung erst zählen, sobald FFmpeg eine Geschwindigkeit gemeldet hat
+                continue
+            self.phase_time[state] = self.phase_time.get(state, 0) + elapsed
+            self.phase_work[state] = self.phase_work.get(state, 0) + work
+        
+        self.phase_jobs = phase_jobs
+        self.phase_rates = phase_rates
+        self.last_tick = current_time
+    
+    @staticmethod
+    def format_phase_rate(state, rate):
+        return f"{format_size(rate)}/s" if state == DownloadJob.FETCHING else f"{rate:.1f}x"
+    
+    def phase_status(self):
+        """Aktuelle Rate jeder laufenden Phase, z.B. Lädt herunter (2): 3.20 MB/s | Kombiniert (1): 14.2x"""
+        return " | ".join(
+            f"{DownloadJob.STATE_LABELS[state]} ({self.phase_jobs[state]}): "
+            f"{self.format_phase_rate(state, self.phase_rates[state])}"
+            for state in self.PHASES if state in self.phase_jobs
+        )
+    
+    def phase_summary(self):
+        """Mittlere Rate jeder Phase über die Zeit, in der sie aktiv war"""
+        return " | ".join(
+            f"{DownloadJob.STATE_LABELS[state]}: "
+            f"{self.format_phase_rate(state, self.phase_work[state] / self.phase_time[state])} "
+            f"über {format_time(self.phase_time[state])}"
+            for state in self.PHASES if self.phase_time.get(state)
+        )
+
+
+class DownloadQueue:
+    """Warteschlange für Download-Aufträge mit begrenztem Worker-Pool
+    
+    Die Netzwerkphase läuft in bis zu `workers` Threads. Muxing und Konvertierung laufen
+    in einem eigenen Pool, sodass ein Worker nach dem Download sofort den nächsten Auftrag
+    übernimmt und Netzwerk-, Muxing- und Konvertierungsarbeit sich überlappen.
+    """
+    
+    def __init__(self, engine, workers=3, postprocess_workers=None, on_update=None):
+        self.engine = engine
+        self.max_workers = max(1, int(workers))
+        self.on_update = on_update
+        
+        self.jobs = []
+        self.pending = deque()
+        self.running_workers = 0
+        self.unfinished = 0
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        
+        self.postprocess_executor = ThreadPoolExecutor(
+            max_workers=postprocess_workers or os.cpu_count() or 2
+        )
+    
+    def submit(self, job):
+        """Auftrag einreihen"""
+        with self.lock:
+            self.jobs.append(job)
+            self.pending.append(job)
+            self.unfinished += 1
+        self._notify(job)
+        self._start_workers()
+        return job
+    
+    def set_workers(self, workers):
+        """Anzahl gleichzeitiger Downloads ändern (wirkt ab dem nächsten Auftrag)"""
+        with self.lock:
+            self.max_workers = max(1, int(workers))
+        self._start_workers()
+    
+    def abort(self, job):
+        """Einzelnen Auftrag abbrechen"""
+        job.abort()
+        with self.lock:
+            # Wartende Aufträge sofort austragen
+            if job in self.pending:
+                self.pending.remove(job)
+            else:
+                return
+        self._finish(job)
+    
+    def abort_all(self):
+        """Alle unfertigen Aufträge abbrechen"""
+        for job in list(self.jobs):
+            if not job.finished:
+                self.abort(job)
+    
+    def active_jobs(self):
+        """Alle noch nicht abgeschlossenen Aufträge"""
+        return [job for job in self.jobs if not job.finished]
+    
+    def wait(self, timeout=None):
+        """Blockieren, bis alle Aufträge abgeschlossen sind"""
+        with self.idle:
+            return self.idle.wait_for(lambda: self.unfinished == 0, timeout)
+    
+    def _start_workers(self):
+        with self.lock:
+            while self.running_workers < min(self.max_workers, len(self.pending)):
+                self.running_workers += 1
+                threading.Thread(target=self._worker_loop, daemon=True).start()
+    
+    def _worker_loop(self):
+        while True:
+            with self.lock:
+                # Überzählige Worker beenden sich nach ihrem Auftrag (Pool wurde verkleinert)
+                if not self.pending or self.running_workers > self.max_workers:
+                    self.running_workers -= 1
+                    return
+                job = self.pending.popleft()
+            self._run_fetch(job)
+    
+    def _run_fetch(self, job):
+        if job.aborted:
+            self._finish(job)
+            return
+        
+        job.set_state(DownloadJob.FETCHING)
+        self._notify(job)
+        
+        try:
+            postprocess = self.engine.fetch(job, self._notify)
+        except Exception as e:
+            if not job.aborted:
+                self.engine.forget_cached_video(job)
+            self._finish(job, e)
+            return
+        
+        if postprocess:
+            state, function = postprocess
+            job.set_state(state)
+            self._notify(job)
+            self.postprocess_executor.submit(self._run_postprocess, job, function)
+        else:
+            self._finish(job)
+    
+    def _run_postprocess(self, job, function):
+        try:
+            function()
+        except Exception as e:
+            self._finish(job, e)
+            return
+        self._finish(job)
+    
+    def _finish(self, job, error=None):
+        if job.aborted:
+            job.set_state(DownloadJob.ABORTED)
+            self.engine.cleanup_job(job)
+        elif error:
+            job.error = str(error)
+            job.set_state(DownloadJob.FAILED, f"Fehler: {job.error}")
+            self.engine.cleanup_job(job)
+        else:
+            job.progress = 100
+            self.engine.cleanup_job(job)
+            self.engine.record_download(job)
+            job.set_state(DownloadJob.DONE, job.message)
+        
+        self._notify(job)
+        
+        with self.idle:
+            self.unfinished -= 1
+            self.idle.notify_all()
+    
+    def _notify(self, job):
+        if self.on_update:
+            try:
+                self.on_update(job)
+            except Exception as e:
+                print(f"Fehler im Fortschritts-Callback: {e}")
+
+
+class ThumbnailService:
+    """Lädt Thumbnails über eine gemeinsame HTTP-Session mit begrenzter Parallelität
+    
+    Verkleinerte Bilder werden auf der Festplatte (JPEG-Bytes pro URL und Größe) und im
+    Speicher (LRU fertig skalierter Bilder) zwischengespeichert. JPEGs werden per draft()
+    bereits beim Dekodieren verkleinert. Benötigt Pillow (load_gui_modules).
+    """
+    
+    def __init__(self, size=(240, 135), max_workers=4, memory_entries=256, disk_entries=2000, timeout=10):
+        self.size = size
+        self.timeout = timeout
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.cache_dir = get_cache_dir("thumbnails")
+        
+        # Gemeinsame Session - wird beim ersten Download angelegt (requests wird erst dann importiert)
+        self.max_workers = max_workers
+        self.session = None
+        
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="thumbnail")
+        self.lock = threading.Lock()
+        self.memory = OrderedDict()
+        # Laufende Anfragen pro URL, damit dasselbe Bild nur einmal geladen wird
+        self.pending = {}
+        
+        # Alte Einträge des Festplatten-Caches im Hintergrund aufräumen
+        self.executor.submit(self._prune_disk_cache)
+    
+    def _cache_file(self, url):
+        key = hashlib.sha1(f"{url}|{self.size[0]}x{self.size[1]}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key + ".jpg")
+    
+    def request(self, url, callback):
+        """Thumbnail im Hintergrund laden, callback(image) wird im Worker-Thread aufgerufen
+        
+        image ist ein bereits skaliertes PIL-Bild oder None bei einem Fehler.
+        """
+        with self.lock:
+            image = self.memory.get(url)
+            if image is not None:
+                self.memory.move_to_end(url)
+            elif url in self.pending:
+                self.pending[url].append(callback)
+                return
+            else:
+                self.pending[url] = [callback]
+        
+        if image is not None:
+            callback(image)
+            return
+        self.executor.submit(self._load, url)
+    
+    def _load(self, url):
+        try:
+            image = self.load(url)
+        except Exception as e:
+            print(f"Fehler beim Laden des Thumbnails: {e}")
+            image = None
+        
+        with self.lock:
+            callbacks = self.pending.pop(url, [])
+        for callback in callbacks:
+            callback(image)
+    
+    def load(self, url):
+        """Thumbnail blockierend laden (Speicher, Festplatte oder Netzwerk), gibt ein PIL-Bild zurück"""
+        with self.lock:
+            image = self.memory.get(url)
+            if image is not None:
+                self.memory.move_to_end(url)
+                return image
+        
+        cache_file = self._cache_file(url)
+        image = None
+        if os.path.exists(cache_file):
+            try:
+                image = Image.open(cache_file)
+                image.load()
+            except (OSError, ValueError):
+                image = None
+            else:
+                # Änderungszeit = letzter Zugriff, damit _prune_disk_cache die am längsten
+                # ungenutzten Bilder entfernt (LRU statt nach Alter)
+                try:
+                    os.utime(cache_file)
+                except OSError:
+                    pass
+        
+        if image is None:
+            # Über die gemeinsame Bandbreitengrenze laden (ein Datenfluss für alle Thumbnails)
+            data = bytearray()
+            with self._session().get(url, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    BANDWIDTH.acquire(len(chunk), "thumbnails")
+                    data += chunk
+            image = self._resize(data)
+            
+            # Verkleinertes Bild atomar speichern
+            buffer = BytesIO()
+            image.save(buffer, "JPEG", quality=90)
+            temp_file = cache_file + ".tmp"
+            with open(temp_file, "wb") as f:
+                f.write(buffer.getvalue())
+            os.replace(temp_file, cache_file)
+        
+        with self.lock:
+            self.memory[url] = image
+            while len(self.memory) > self.memory_entries:
+                self.memory.popitem(last=False)
+        return image
+    
+    def _session(self):
+        with self.lock:
+            if self.session is None:
+                # Verbindungen zum Thumbnail-Server werden wiederverwendet
+                load_network_modules()
+                self.session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=self.max_workers,
+                                                        pool_maxsize=self.max_workers)
+                self.session.mount("https://", adapter)
+                self.session.mount("http://", adapter)
+            return self.session
+    
+    def _resize(self, data):
+        image = Image.open(BytesIO(data))
+        # JPEG direkt in 1/2, 1/4 oder 1/8 der Größe dekodieren (mindestens Zielgröße)
+        image.draft("RGB", self.size)
+        image = image.convert("RGB")
+        # reducing_gap verkleinert zunächst ganzzahlig per reduce(), erst der Rest mit LANCZOS
+        return image.resize(self.size, Image.LANCZOS, reducing_gap=3.0)
+    
+    def _prune_disk_cache(self):
+        """Festplatten-Cache auf disk_entries begrenzen, die am längsten ungenutzten Bilder zuerst"""
+        try:
+            entries = sorted(os.scandir(self.cache_dir), key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[:max(0, len(entries) - self.disk_entries)]:
+                os.remove(entry.path)
+        except OSError as e:
+            print(f"Fehler beim Aufräumen des Thumbnail-Caches: {e}")
 
-# PyTubeFix für YouTube-Downloads
-try:
-    from pytubefix import YouTube
-except ImportError:
-    print("PyTubeFix nicht gefunden! Installiere mit: pip install pytubefix")
-    import sys
-    sys.exit(1)
-
-# PIL für Thumbnails
-try:
-    from PIL import Image, ImageTk
-except ImportError:
-    print("Pillow nicht gefunden! Installiere mit: pip install pillow")
-    import sys
-    sys.exit(1)
 
 class FetchioDownloader:
     def __init__(self, root):
         self.root = root
         self.root.title("Fetch.io")
-        self.root.geometry("600x550")
+        self.root.geometry("650x750")
         self.root.resizable(True, True)
         
         # Icon setzen
-        icon_path = self.find_resource_path("icon.ico")
+        icon_path = find_resource_path("icon.ico")
         if icon_path and os.path.exists(icon_path):
             self.root.iconbitmap(icon_path)
             # Zusätzlich als Titel-Icon setzen für bessere Sichtbarkeit
@@ -46,13 +3655,13 @@ class FetchioDownloader:
             except:
                 pass
         
-        # Für Zeitmessungen
-        self.download_start_time = None
-        self.last_update_time = None
-        self.last_bytes_downloaded = 0
+        # Für Zeitmessungen (Beginn der aktuellen Download-Serie)
+        self.batch_start_time = None
         
         # Thumbnail 
         self.thumbnail_image = None
+        self.thumbnail_url = None
+        self.thumbnails = ThumbnailService()
         
         # Menüleiste erstellen
         self.create_menu()
@@ -62,125 +3671,65 @@ class FetchioDownloader:
         
         # YouTube-Objekt - MUSS vor create_widgets initialisiert werden
         self.yt = None
+        self.yt_url = None
         
-        # Verfügbare Streams speichern - MUSS vor create_widgets initialisiert werden
-        self.available_video_streams = {}
-        self.best_audio_stream = None
+        # Stream-Index des angezeigten Videos - MUSS vor create_widgets initialisiert werden
+        self.stream_index = None
         
-        # FFmpeg-Pfad suchen - MUSS vor create_widgets aufgerufen werden
-        self.ffmpeg_path = self.find_ffmpeg()
-        print(f"FFmpeg-Pfad: {self.ffmpeg_path}")
+        # Laufende Abfrage der Video-Informationen und Timer für das Vorab-Laden
+        self.info_request = None
+        self.prefetch_timer = None
         
         # UI-Elemente erstellen
         self.create_widgets()
         
-        # Falls FFmpeg nicht gefunden wurde, automatisch herunterladen
-        if not self.ffmpeg_path:
-            self.status_var.set("FFmpeg nicht gefunden. Starte automatischen Download...")
-            self.root.after(100, self.download_ffmpeg)
-        
-        # Download-Status
-        self.download_in_progress = False
-        self.abort_requested = False
-        self.download_thread = None
-        self.last_audio_file = None  # Speichert Pfad zur letzten heruntergeladenen Audio-Datei
-    
-    def find_resource_path(self, filename):
-        """Findet den Pfad zu einer Ressourcendatei"""
-        # Prüfen, ob die Anwendung als exe ausgeführt wird
-        if getattr(sys, 'frozen', False):
-            # Im ausführbaren Verzeichnis suchen
-            base_dir = os.path.dirname(sys.executable)
-        else:
-            # Im Skriptverzeichnis suchen
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        # Verschiedene mögliche Pfade ausprobieren
-        paths = [
-            os.path.join(base_dir, filename),
-            os.path.join(base_dir, "resources", filename),
-        ]
-        
-        for path in paths:
-            if os.path.exists(path):
-                return path
+        # Download-Engine und Warteschlange - Updates aus den Worker-Threads werden nur
+        # vorgemerkt und im festen UI-Takt (progress_tick) angezeigt
+        self.progress = ProgressAggregator()
+        self.metadata_cache = MetadataCache()
+        self.archive = DownloadArchive()
+        self.engine = DownloadEngine(connections=self.connections_var.get(),
+                                     streaming=self.streaming_var.get(), metadata_cache=self.metadata_cache,
+                                     archive=self.archive)
         
-        return None
-    
-    def find_ffmpeg(self):
-        """FFmpeg im System finden"""
-        # Definiere potenzielle FFmpeg-Pfade
-        ffmpeg_paths = []
+        # FFmpeg im Hintergrund suchen, damit das Fenster sofort erscheint
+        self.engine.probe_ffmpeg(lambda path: self.root.after(0, lambda: self.ffmpeg_probed(path)))
+        self.queue = DownloadQueue(
+            self.engine,
+            workers=self.workers_var.get(),
+            on_update=self.progress.mark
+        )
+        self.jobs_by_id = {}
+        self.job_rows = {}
+        self.batch_jobs = []
+        self.finished_job_ids = set()
         
-        # Betriebssystemspezifische Pfade hinzufügen
-        if os.name == "nt":  # Windows
-            ffmpeg_paths = [
-                "resources/windows/bin/ffmpeg.exe",
-                "resources/ffmpeg.exe",
-                "ffmpeg.exe",
-                os.path.join(os.path.dirname(sys.executable), "ffmpeg.exe"),
-                self.find_resource_path("resources/windows/bin/ffmpeg.exe"),
-                self.find_resource_path("resources/ffmpeg.exe")
-            ]
-        else:  # macOS/Linux
-            ffmpeg_paths = [
-                "resources/ffmpeg/mac/ffmpeg",
-                "resources/ffmpeg",
-                "ffmpeg",
-                "/usr/bin/ffmpeg",
-                "/usr/local/bin/ffmpeg",
-                "/opt/local/bin/ffmpeg",
-                "/opt/homebrew/bin/ffmpeg",
-                os.path.join(os.path.dirname(sys.executable), "ffmpeg"),
-                self.find_resource_path("resources/ffmpeg/mac/ffmpeg"),
-                self.find_resource_path("resources/ffmpeg")
-            ]
+        # Playlists/Kanäle, deren Videos noch aufgelöst werden (Abbruch-Events)
+        self.resolver = CollectionResolver(metadata_cache=self.metadata_cache)
+        self.pending_collections = set()
         
-        # Filtere None-Werte aus der Liste
-        ffmpeg_paths = [path for path in ffmpeg_paths if path]
+        # URLs eines Download-Klicks, der auf das Ende der FFmpeg-Suche wartet
+        self.deferred_urls = None
         
-        # Prüfe, ob FFmpeg an einem der Pfade verfügbar ist
-        for path in ffmpeg_paths:
-            try:
-                # Wenn es ein relativer Pfad ist, wandle ihn in einen absoluten um
-                if not os.path.isabs(path):
-                    abs_path = os.path.abspath(path)
-                else:
-                    abs_path = path
-                
-                # Prüfe, ob die Datei existiert
-                if os.path.exists(abs_path):
-                    print(f"FFmpeg gefunden unter: {abs_path}")
-                    # Teste, ob FFmpeg funktioniert
-                    result = subprocess.run(
-                        [abs_path, "-version"], 
-                        stdout=subprocess.PIPE, 
-                        stderr=subprocess.PIPE, 
-                        check=False
-                    )
-                    if result.returncode == 0:
-                        print(f"FFmpeg funktioniert: {abs_path}")
-                        return abs_path
-            except Exception as e:
-                print(f"Fehler beim Testen von FFmpeg unter {path}: {e}")
-                continue
+        self.root.after(int(self.progress.interval * 1000), self.progress_tick)
         
-        # Versuche System-FFmpeg (ohne Pfad)
-        try:
-            subprocess.run(
-                ["ffmpeg", "-version"], 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE, 
-                check=False
-            )
-            print("System-FFmpeg gefunden")
-            return "ffmpeg"
-        except Exception:
-            pass
+        # Startzeit erfassen, sobald das Fenster gezeichnet und die FFmpeg-Suche fertig ist
+        STARTUP.mark("Fenster aufgebaut")
+        self.startup_report = False
+        self.startup_pending = {"window", "ffmpeg"}
+        self.root.after(0, self.window_shown)
         
-        # FFmpeg nicht gefunden
-        print("Warnung: FFmpeg nicht gefunden. MP3-Konvertierung nicht möglich.")
-        return None
+        # Veraltete Download-Zwischenstände und verwaiste Arbeitsverzeichnisse im Hintergrund aufräumen
+        threading.Thread(
+            target=ResumeJournal.prune,
+            args=(get_cache_dir("resume"),),
+            daemon=True
+        ).start()
+        threading.Thread(
+            target=ScratchDir.reclaim,
+            args=(self.engine.work_root,),
+            daemon=True
+        ).start()
     
     def create_menu(self):
         """Menüleiste erstellen"""
@@ -188,6 +3737,13 @@ class FetchioDownloader:
         
         # Datei-Menü
         file_menu = tk.Menu(self.menubar, tearoff=0)
+        file_menu.add_command(label="URL-Liste importieren...", command=self.import_url_list)
+        file_menu.add_command(label="Abgeschlossene Aufträge entfernen", command=self.remove_finished_jobs)
+        file_menu.add_command(label="Download-Archiv aus Ordner neu aufbauen...", command=self.rebuild_archive)
+        # Menüeintrag für die Dauer eines Neuaufbaus sperren (siehe rebuild_archive)
+        self.file_menu = file_menu
+        self.rebuild_menu_index = file_menu.index("end")
+        file_menu.add_separator()
         file_menu.add_command(label="Beenden", command=self.root.quit)
         self.menubar.add_cascade(label="Datei", menu=file_menu)
         
@@ -199,6 +3755,35 @@ class FetchioDownloader:
         view_menu.add_radiobutton(label="System-Design", variable=self.theme_var, value="system", command=self.apply_theme)
         self.menubar.add_cascade(label="Ansicht", menu=view_menu)
         
+        # Einstellungen-Menü
+        settings_menu = tk.Menu(self.menubar, tearoff=0)
+        connections_menu = tk.Menu(settings_menu, tearoff=0)
+        self.connections_var = tk.IntVar(value=4)
+        for connections in (1, 2, 4, 8, 16):
+            connections_menu.add_radiobutton(label=str(connections), variable=self.connections_var,
+                                             value=connections, command=self.update_connections)
+        settings_menu.add_cascade(label="Verbindungen pro Download", menu=connections_menu)
+        workers_menu = tk.Menu(settings_menu, tearoff=0)
+        self.workers_var = tk.IntVar(value=3)
+        for workers in (1, 2, 3, 4, 6, 8):
+            workers_menu.add_radiobutton(label=str(workers), variable=self.workers_var,
+                                         value=workers, command=self.update_workers)
+        settings_menu.add_cascade(label="Gleichzeitige Downloads", menu=workers_menu)
+        bandwidth_menu = tk.Menu(settings_menu, tearoff=0)
+        self.bandwidth_var = tk.IntVar(value=0)
+        bandwidth_menu.add_radiobutton(label="Unbegrenzt", variable=self.bandwidth_var, value=0,
+                                       command=self.update_bandwidth)
+        for megabytes in (1, 2, 5, 10, 25, 50):
+            bandwidth_menu.add_radiobutton(label=f"{megabytes} MB/s", variable=self.bandwidth_var,
+                                           value=megabytes, command=self.update_bandwidth)
+        settings_menu.add_cascade(label="Bandbreite begrenzen", menu=bandwidth_menu)
+        settings_menu.add_separator()
+        self.streaming_var = tk.BooleanVar(value=True)
+        settings_menu.add_checkbutton(label="Direkt an FFmpeg streamen (ohne Zwischendateien)",
+                                      variable=self.streaming_var, command=self.update_streaming)
+        settings_menu.add_command(label="Arbeitsverzeichnis für Zwischendateien...", command=self.choose_work_root)
+        self.menubar.add_cascade(label="Einstellungen", menu=settings_menu)
+        
         # Hilfe-Menü
         help_menu = tk.Menu(self.menubar, tearoff=0)
         help_menu.add_command(label="GitHub-Projekt", command=self.open_github)
@@ -207,6 +3792,65 @@ class FetchioDownloader:
         # Menüleiste an Root-Fenster anhängen
         self.root.config(menu=self.menubar)
     
+    def update_connections(self):
+        """Anzahl paralleler Verbindungen für neue Downloads übernehmen"""
+        self.engine.connections = self.connections_var.get()
+    
+    def update_streaming(self):
+        """Direktes Kombinieren/Konvertieren ohne Zwischendateien ein- bzw. ausschalten"""
+        self.engine.streaming = self.streaming_var.get()
+    
+    def choose_work_root(self):
+        """Verzeichnis für die Zwischendateien neuer Aufträge wählen (z.B. auf einer schnellen SSD)"""
+        folder = filedialog.askdirectory(initialdir=self.engine.work_root)
+        if folder:
+            self.engine.work_root = folder
+            self.status_var.set(f"Zwischendateien: {self.engine.work_root}")
+            threading.Thread(target=ScratchDir.reclaim, args=(self.engine.work_root,), daemon=True).start()
+    
+    def rebuild_archive(self):
+        """Download-Archiv aus den Dateien eines Ausgabeverzeichnisses neu aufbauen (im Hintergrund)"""
+        folder = filedialog.askdirectory(initialdir=self.path_var.get())
+        if not folder:
+            return
+        self.status_var.set("Baue Download-Archiv neu auf...")
+        self.file_menu.entryconfigure(self.rebuild_menu_index, state="disabled")
+        
+        def rebuild_thread():
+            try:
+                # Wartet ggf. auf die FFmpeg-Suche - hier im Hintergrund statt im Tk-Thread
+                ffmpeg_path = self.ffmpeg_path
+                if not ffmpeg_path:
+                    self.root.after(0, lambda: messagebox.showwarning(
+                        "FFmpeg fehlt", "Zum Auslesen der Dateien wird FFmpeg benötigt."))
+                    self.root.after(0, lambda: self.status_var.set("Download-Archiv nicht neu aufgebaut"))
+                    return
+                recorded, unknown = self.archive.rebuild(folder, ffmpeg_path)
+                message = f"Download-Archiv: {recorded} Datei(en) eingetragen"
+                if unknown:
+                    message += f", {unknown} ohne Video-Kennung"
+                self.root.after(0, lambda: self.status_var.set(message))
+            except OSError as e:
+                # z.B. Ordner nicht lesbar oder während des Durchlaufs entfernt
+                error = str(e)
+                print(f"Fehler beim Neuaufbau des Download-Archivs: {error}")
+                self.root.after(0, lambda: self.status_var.set("Download-Archiv nicht neu aufgebaut"))
+                self.root.after(0, lambda: messagebox.showerror(
+                    "Fehler", f"Download-Archiv konnte nicht neu aufgebaut werden:\n\n{error}"))
+            finally:
+                self.root.after(0, lambda: self.file_menu.entryconfigure(self.rebuild_menu_index, state="normal"))
+        
+        threading.Thread(target=rebuild_thread, daemon=True).start()
+    
+    def update_bandwidth(self):
+        """Gemeinsame Bandbreitengrenze aller Downloads sofort ändern"""
+        megabytes = self.bandwidth_var.get()
+        BANDWIDTH.set_rate(megabytes * 1024 * 1024 if megabytes else None)
+    
+    def update_workers(self):
+        """Anzahl gleichzeitiger Downloads in der Warteschlange übernehmen"""
+        self.queue.set_workers(self.workers_var.get())
+    
     def open_github(self):
         """Öffnet die GitHub-Projektseite im Standardbrowser"""
         import webbrowser
@@ -281,6 +3925,9 @@ class FetchioDownloader:
         self.url_entry = ttk.Entry(url_frame, textvariable=self.url_var, width=50)
         self.url_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
+        # Gültige URLs schon beim Eintippen/Einfügen im Hintergrund laden
+        self.url_var.trace_add("write", self.on_url_changed)
+        
         fetch_button = ttk.Button(url_frame, text="🔍", width=3, command=self.fetch_video_info)
         fetch_button.pack(side=tk.LEFT, padx=(5, 0))
         
@@ -298,7 +3945,9 @@ class FetchioDownloader:
         ttk.Radiobutton(format_left, text="MP4 Video", variable=self.format_var, 
                        value="mp4", command=self.update_quality_options).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Radiobutton(format_left, text="MP3 Audio", variable=self.format_var, 
-                       value="mp3", command=self.update_quality_options).pack(side=tk.LEFT)
+                       value="mp3", command=self.update_quality_options).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Radiobutton(format_left, text="Audio (Original)", variable=self.format_var, 
+                       value="audio", command=self.update_quality_options).pack(side=tk.LEFT)
         
         # Rechte Seite - Qualitätsauswahl
         quality_frame = ttk.Frame(format_frame)
@@ -382,6 +4031,35 @@ class FetchioDownloader:
         ttk.Label(right_info, text="Geschwindigkeit:").grid(row=1, column=0, sticky=tk.W, padx=(0, 5))
         ttk.Label(right_info, textvariable=self.speed_var).grid(row=1, column=1, sticky=tk.W)
         
+        # Warteschlange
+        queue_frame = ttk.LabelFrame(main_frame, text="Warteschlange", padding=10)
+        queue_frame.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+        
+        columns = ("title", "format", "status", "progress", "speed")
+        self.job_list = ttk.Treeview(queue_frame, columns=columns, show="headings", height=5)
+        self.job_list.heading("title", text="Titel")
+        self.job_list.heading("format", text="Format")
+        self.job_list.heading("status", text="Status")
+        self.job_list.heading("progress", text="Fortschritt")
+        self.job_list.heading("speed", text="Geschwindigkeit")
+        self.job_list.column("title", width=200)
+        self.job_list.column("format", width=90)
+        self.job_list.column("status", width=140)
+        self.job_list.column("progress", width=70, anchor=tk.E)
+        self.job_list.column("speed", width=90, anchor=tk.E)
+        
+        job_scrollbar = ttk.Scrollbar(queue_frame, orient=tk.VERTICAL, command=self.job_list.yview)
+        self.job_list.configure(yscrollcommand=job_scrollbar.set)
+        self.job_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        job_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        # Kontextmenü: Anteil an einer begrenzten Bandbreite (Gewicht) der ausgewählten Aufträge
+        self.job_menu = tk.Menu(self.job_list, tearoff=0)
+        for label, weight in (("Priorität hoch", 4.0), ("Priorität normal", 1.0), ("Priorität niedrig", 0.25)):
+            self.job_menu.add_command(label=label, command=lambda w=weight: self.set_job_weight(w))
+        self.job_list.bind("<Button-3>", self.show_job_menu)
+        self.job_list.bind("<Button-2>", self.show_job_menu)  # macOS
+        
         # Video-Info-Frame
         info_frame = ttk.LabelFrame(main_frame, text="Video-Informationen", padding=10)
         info_frame.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
@@ -429,10 +4107,6 @@ class FetchioDownloader:
         self.thumbnail_image = ImageTk.PhotoImage(placeholder)
         self.thumbnail_label.configure(image=self.thumbnail_image)
         
-        # FFmpeg Status anzeigen, falls nicht gefunden
-        if not self.ffmpeg_path:
-            self.status_var.set("Hinweis: FFmpeg nicht gefunden. MP3-Konvertierung nicht möglich.")
-            
         # Qualitätsoptionen aktualisieren
         self.update_quality_options()
         
@@ -487,18 +4161,15 @@ class FetchioDownloader:
             self.quality_var.set("highest")
             
             # Wenn Video-Info bereits abgerufen wurde, zeige verfügbare Qualitäten an
-            if self.yt and self.available_video_streams:
-                # Verfügbare Qualitätsoptionen aus den gespeicherten Streams erstellen
+            if self.yt and self.stream_index and self.stream_index.resolutions:
+                # Verfügbare Qualitätsoptionen aus dem Index erstellen (bereits absteigend sortiert)
                 quality_options = ["highest"]
-                # Sortiere die Auflösungen absteigend
-                resolutions = sorted(self.available_video_streams.keys(),
-                                    key=lambda x: int(x.replace('p', '')),
-                                    reverse=True)
+                resolutions = self.stream_index.resolutions
                 
                 # In Qualitätsoptionen umwandeln
                 for res in resolutions:
                     # Zeige an, ob adaptiver Stream (benötigt Muxing)
-                    stream = self.available_video_streams[res]
+                    stream = self.stream_index.video_streams[res]
                     if not stream.is_progressive:
                         quality_options.append(f"{res}* (beste)")
                     else:
@@ -509,18 +4180,23 @@ class FetchioDownloader:
                 # Hinweis für "highest" anzeigen
                 if resolutions:
                     highest_res = resolutions[0]
-                    highest_stream = self.available_video_streams[highest_res]
+                    highest_stream = self.stream_index.video_streams[highest_res]
                     if not highest_stream.is_progressive:
                         self.status_var.set("'Highest' = " + highest_res + "* (beste Qualität mit Audio-Kombination)")
                 
                 # Infotext hinzufügen, wenn adaptive Streams vorhanden sind
-                elif any(not stream.is_progressive for stream in self.available_video_streams.values()):
+                elif any(not stream.is_progressive for stream in self.stream_index.video_streams.values()):
                     self.status_var.set("* = Beste Qualität (separate Audio/Video-Streams werden kombiniert)")
         
         elif format_type == "mp3":
             self.quality_combo["values"] = ["highest", "192kbps", "128kbps", "96kbps", "64kbps"]
             self.quality_var.set("highest")
         
+        elif format_type == "audio":
+            # Beste Spur (meist Opus) oder beste AAC-Spur, jeweils ohne Umwandlung
+            self.quality_combo["values"] = ["highest", "m4a"]
+            self.quality_var.set("highest")
+        
         # Aktualisiere die Video-Informationen für die aktuelle Qualitätsauswahl
         if self.yt:
             self.update_selected_quality_info()
@@ -546,58 +4222,22 @@ class FetchioDownloader:
             best_resolution = self.resolution_var.get()
             
             try:
-                if selected_quality == "highest":
-                    # Höchste verfügbare Qualität - bereits angezeigt
-                    if self.available_video_streams:
-                        resolutions = sorted(self.available_video_streams.keys(), 
-                                          key=lambda x: int(x.replace('p', '')), 
-                                          reverse=True)
-                        if resolutions:
-                            highest_res = resolutions[0]
-                            self.resolution_var.set(highest_res)
-                            best_stream = self.available_video_streams[highest_res]
-                            
-                            if hasattr(best_stream, 'filesize'):
-                                size_str = self.format_size(best_stream.filesize)
-                                
-                                # Wenn es sich um einen adaptiven Stream handelt, zeige auch die Audio-Größe an
-                                if not best_stream.is_progressive and self.best_audio_stream:
-                                    size_str += f" + {self.format_size(self.best_audio_stream.filesize)} (Audio)"
-                elif "* (beste)" in selected_quality:
-                    # Adaptive Stream (benötigt Muxing)
-                    # Auflösung aus dem String extrahieren (z.B. "1080p* (beste)" -> "1080p")
-                    resolution = selected_quality.split("*")[0].strip()
-                    
-                    # Stream aus dem Cache holen
-                    if resolution in self.available_video_streams:
-                        self.resolution_var.set(resolution)
-                        stream = self.available_video_streams[resolution]
-                        
-                        if hasattr(stream, 'filesize'):
-                            size_str = self.format_size(stream.filesize)
-                            
-                            # Wenn es sich um einen adaptiven Stream handelt, zeige auch die Audio-Größe an
-                            if not stream.is_progressive and self.best_audio_stream:
-                                size_str += f" + {self.format_size(self.best_audio_stream.filesize)} (Audio)"
-                else:
-                    # Spezifische Qualität (z.B. 1080p, 720p, etc.)
+                # Nur Abfragen im vorab aufgebauten StreamIndex - kein Zugriff auf PyTubeFix im Tk-Thread
+                index = self.stream_index
+                stream = index.select_video(selected_quality) if index else None
+                
+                if stream:
+                    self.resolution_var.set(stream.resolution)
+                elif selected_quality != "highest" and "* (beste)" not in selected_quality:
                     self.resolution_var.set(selected_quality)
+                
+                if stream and stream.filesize:
+                    size_str = self.format_size(stream.filesize)
                     
-                    # Suche nach dem entsprechenden Stream
-                    if self.yt:
-                        # Zuerst progressive Streams prüfen (besser für die Anzeige)
-                        stream = self.yt.streams.filter(progressive=True, file_extension="mp4", resolution=selected_quality).first()
-                        
-                        # Wenn kein progressiver Stream gefunden wurde, prüfe adaptive Streams
-                        if not stream:
-                            stream = self.yt.streams.filter(adaptive=True, file_extension="mp4", resolution=selected_quality).first()
-                        
-                        if stream and hasattr(stream, 'filesize'):
-                            size_str = self.format_size(stream.filesize)
-                            
-                            # Wenn es sich um einen adaptiven Stream handelt, zeige auch die Audio-Größe an
-                            if not stream.is_progressive and self.best_audio_stream:
-                                size_str += f" + {self.format_size(self.best_audio_stream.filesize)} (Audio)"
+                    # Wenn es sich um einen adaptiven Stream handelt, zeige auch die Audio-Größe an
+                    audio_stream = index.mux_audio() if not stream.is_progressive else None
+                    if audio_stream:
+                        size_str += f" + {self.format_size(audio_stream.filesize)} (Audio)"
                 
                 # Größe aktualisieren
                 self.size_var.set(size_str)
@@ -612,12 +4252,22 @@ class FetchioDownloader:
             if selected_quality != "highest":
                 bitrate = selected_quality
             
-            # Finde den besten Audio-Stream
-            if self.yt and self.best_audio_stream and hasattr(self.best_audio_stream, 'filesize'):
-                size_str = self.format_size(self.best_audio_stream.filesize)
+            # Finde den passenden Audio-Stream
+            audio_stream = self.stream_index.mp3_audio(selected_quality) if self.stream_index else None
+            if self.yt and audio_stream and hasattr(audio_stream, 'filesize'):
+                size_str = self.format_size(audio_stream.filesize)
                 self.size_var.set(f"{size_str} (vor Konvertierung, {bitrate})")
             else:
                 self.size_var.set(f"Unbekannt ({bitrate})")
+        
+        elif selected_format == "audio":
+            # Im Original-Modus entspricht die Dateigröße der heruntergeladenen Spur
+            stream = self.stream_index.native_audio(selected_quality) if self.stream_index else None
+            if stream and hasattr(stream, 'filesize'):
+                extension = self.engine.native_audio_extension(stream) or stream.subtype
+                self.size_var.set(f"{self.format_size(stream.filesize)} ({extension}, {stream.abr})")
+            else:
+                self.size_var.set("Unbekannt")
     
     def browse_directory(self):
         """Download-Verzeichnis auswählen"""
@@ -628,64 +4278,110 @@ class FetchioDownloader:
         if directory:
             self.path_var.set(directory)
     
+    def on_url_changed(self, *args):
+        """Eingabe entprellen - erst nach einer kurzen Pause wird die URL vorab geladen"""
+        # Eine Vorab-Anfrage für eine inzwischen geänderte URL sofort verwerfen
+        urls = self.url_var.get().split()
+        request = self.info_request
+        if request and request["speculative"] and (not urls or urls[0] != request["url"]):
+            self.cancel_info_request()
+        
+        if self.prefetch_timer:
+            self.root.after_cancel(self.prefetch_timer)
+        self.prefetch_timer = self.root.after(400, self.prefetch_video_info)
+    
+    def prefetch_video_info(self):
+        """Metadaten, Streams und Thumbnail einer eingegebenen Video-URL schon vor dem Klick laden"""
+        self.prefetch_timer = None
+        urls = self.url_var.get().split()
+        url = urls[0] if urls else None
+        
+        if not url or not is_valid_url(url) or is_collection_url(url):
+            # Vorab-Anfrage für eine nicht mehr eingegebene URL verwerfen
+            if self.info_request and self.info_request["speculative"]:
+                self.cancel_info_request()
+            return
+        
+        if url != self.yt_url:
+            self.request_video_info(url, speculative=True)
+    
     def fetch_video_info(self):
         """Video-Informationen abrufen"""
-        url = self.url_var.get().strip()
-        if not url:
+        # Bei mehreren URLs Informationen zur ersten anzeigen
+        urls = self.url_var.get().split()
+        if not urls:
             messagebox.showerror("Fehler", "Bitte geben Sie eine YouTube-URL ein")
             return
+        url = urls[0]
         
         # Prüfen, ob URL gültig ist
-        if not re.match(r'^(https?://)?(www\.)?(youtube\.com|youtu\.be)/.+$', url):
+        if not is_valid_url(url):
             messagebox.showerror("Fehler", "Bitte geben Sie eine gültige YouTube-URL ein")
             return
         
+        # Info-Thread starten
+        if is_collection_url(url):
+            self.cancel_info_request()
+            self.status_var.set("Lade Video-Informationen...")
+            self.stream_index = None
+            threading.Thread(
+                target=self._fetch_collection_info_thread,
+                args=(url,),
+                daemon=True
+            ).start()
+            return
+        
+        self.request_video_info(url)
+    
+    def request_video_info(self, url, speculative=False):
+        """Video-Informationen im Hintergrund laden (speculative = Vorab-Laden ohne Fehlermeldungen)"""
+        request = self.info_request
+        if request and request["url"] == url and not request["done"]:
+            # Läuft bereits (z.B. als Vorab-Anfrage) - Ergebnis übernehmen, Fehler ab jetzt anzeigen
+            if not speculative:
+                request["speculative"] = False
+            return
+        
+        # Eine Abfrage für eine andere URL wird verworfen
+        self.cancel_info_request()
+        request = {"url": url, "cancel": threading.Event(), "speculative": speculative, "done": False}
+        self.info_request = request
+        
         # Status aktualisieren
         self.status_var.set("Lade Video-Informationen...")
         
-        # Stream-Cache zurücksetzen
-        self.available_video_streams = {}
-        self.best_audio_stream = None
+        # Stream-Index zurücksetzen
+        self.stream_index = None
         
-        # Info-Thread starten
         threading.Thread(
             target=self._fetch_video_info_thread,
-            args=(url,),
+            args=(request,),
             daemon=True
         ).start()
     
-    def _fetch_video_info_thread(self, url):
+    def cancel_info_request(self):
+        """Laufende Abfrage verwerfen - PyTubeFix lässt sich nicht unterbrechen, das Ergebnis wird ignoriert"""
+        if self.info_request:
+            self.info_request["cancel"].set()
+            self.info_request = None
+    
+    def _fetch_video_info_thread(self, request):
         """Video-Informationen in einem separaten Thread abrufen"""
+        url = request["url"]
         try:
-            self.yt = YouTube(url)
+            # Video und verfügbare Streams ermitteln (bei wiederholtem Abruf aus dem Cache)
+            # Der StreamIndex für die Qualitätsauswahl entsteht dabei im Hintergrund
+            yt, stream_index = self.metadata_cache.load(url)
             
-            # Alle verfügbaren Video-Streams ermitteln und nach Auflösung gruppieren
-            mp4_streams = self.yt.streams.filter(file_extension="mp4", type="video").order_by('resolution').desc()
-            webm_streams = self.yt.streams.filter(file_extension="webm", type="video").order_by('resolution').desc()
-            
-            # Streams nach Auflösungen gruppieren (pro Auflösung den besten Stream speichern)
-            video_streams_by_resolution = {}
-            
-            # MP4-Streams bevorzugen
-            for stream in mp4_streams:
-                resolution = stream.resolution
-                if resolution:
-                    # Wenn die Auflösung noch nicht vorhanden ist, oder ein progressiver Stream verfügbar ist
-                    if resolution not in video_streams_by_resolution or stream.is_progressive:
-                        video_streams_by_resolution[resolution] = stream
-            
-            # WebM-Streams nur hinzufügen, wenn die Auflösung noch nicht vorhanden ist
-            for stream in webm_streams:
-                resolution = stream.resolution
-                if resolution and resolution not in video_streams_by_resolution:
-                    video_streams_by_resolution[resolution] = stream
-            
-            # Besten Audio-Stream finden
-            audio_streams = self.yt.streams.filter(only_audio=True).order_by('abr').desc()
-            self.best_audio_stream = audio_streams.first() if audio_streams else None
+            # Inzwischen wurde eine andere URL eingegeben - der Cache ist trotzdem gefüllt
+            if request["cancel"].is_set():
+                return
             
-            # Speichere die Streams für späteren Zugriff
-            self.available_video_streams = video_streams_by_resolution
+            # Erst vollständig ermittelte Informationen übernehmen, damit ein gleichzeitig
+            # gestarteter Download nie das neue Video mit den alten Streams kombiniert
+            self.stream_index = stream_index
+            self.yt = yt
+            self.yt_url = url
             
             # Informationen im Hauptthread anzeigen
             self.root.after(0, lambda: self.update_video_info(self.yt))
@@ -697,31 +4393,55 @@ class FetchioDownloader:
             self.load_thumbnail(self.yt.thumbnail_url)
             
         except Exception as e:
+            if request["cancel"].is_set():
+                return
             error_message = str(e)
-            self.root.after(0, lambda: messagebox.showerror("Fehler", f"Beim Abrufen der Video-Informationen ist ein Fehler aufgetreten:\n\n{error_message}"))
+            if request["speculative"]:
+                print(f"Vorab-Laden von {url} fehlgeschlagen: {error_message}")
+            else:
+                self.root.after(0, lambda: messagebox.showerror("Fehler", f"Beim Abrufen der Video-Informationen ist ein Fehler aufgetreten:\n\n{error_message}"))
             self.root.after(0, lambda: self.status_var.set("Bereit"))
+        finally:
+            request["done"] = True
     
-    def load_thumbnail(self, thumbnail_url):
-        """Thumbnail laden und anzeigen"""
+    def _fetch_collection_info_thread(self, url):
+        """Titel einer Playlist bzw. eines Kanals anzeigen - die Videos werden erst beim Download aufgelöst"""
         try:
-            response = requests.get(thumbnail_url)
-            image_data = BytesIO(response.content)
-            image = Image.open(image_data)
-            
-            # Auf passende Größe skalieren
-            image = image.resize((240, 135), Image.LANCZOS)
+            _, title = self.resolver.open_collection(url)
+            kind = "Kanal" if CHANNEL_URL_PATTERN.match(url) else "Playlist"
             
-            # In Tkinter-PhotoImage umwandeln
-            photo = ImageTk.PhotoImage(image)
+            def show_collection_info():
+                self.title_var.set(title)
+                self.length_var.set(kind)
+                self.resolution_var.set("-")
+                self.size_var.set("-")
+                self.status_var.set(f"{kind} erkannt - alle Videos werden beim Download eingereiht")
             
-            # Bild im Hauptthread anzeigen
-            self.root.after(0, lambda: self.update_thumbnail(photo))
+            self.root.after(0, show_collection_info)
         except Exception as e:
-            print(f"Fehler beim Laden des Thumbnails: {e}")
+            error_message = str(e)
+            self.root.after(0, lambda: messagebox.showerror("Fehler", f"Beim Abrufen der Playlist ist ein Fehler aufgetreten:\n\n{error_message}"))
+            self.root.after(0, lambda: self.status_var.set("Bereit"))
+    
+    def load_thumbnail(self, thumbnail_url):
+        """Thumbnail über den ThumbnailService laden und anzeigen"""
+        self.thumbnail_url = thumbnail_url
+        
+        def on_loaded(image):
+            if image is not None:
+                # Bild im Hauptthread anzeigen
+                self.root.after(0, lambda: self.update_thumbnail(thumbnail_url, image))
+        
+        self.thumbnails.request(thumbnail_url, on_loaded)
     
-    def update_thumbnail(self, photo):
+    def update_thumbnail(self, thumbnail_url, image):
         """Thumbnail in der UI aktualisieren"""
-        self.thumbnail_image = photo  # Wichtig: Referenz behalten!
+        # Verspätete Bilder eines zuvor angezeigten Videos ignorieren
+        if thumbnail_url != self.thumbnail_url:
+            return
+        
+        # PhotoImage nur im Tk-Hauptthread erzeugen
+        self.thumbnail_image = ImageTk.PhotoImage(image)  # Wichtig: Referenz behalten!
         self.thumbnail_label.configure(image=self.thumbnail_image)
     
     def update_video_info(self, yt):
@@ -739,33 +4459,22 @@ class FetchioDownloader:
         else:
             self.length_var.set(f"{minutes}:{seconds:02d}")
         
-        # Beste verfügbare Auflösung ermitteln
-        highest_resolution = "?"
-        if self.available_video_streams:
-            # Sortiere nach numerischer Auflösung
-            resolutions = sorted(self.available_video_streams.keys(), 
-                               key=lambda x: int(x.replace('p', '')), 
-                               reverse=True)
-            highest_resolution = resolutions[0] if resolutions else "?"
-        
-        self.resolution_var.set(highest_resolution)
+        # Beste verfügbare Auflösung ermitteln (Index ist bereits absteigend sortiert)
+        index = self.stream_index
+        highest_resolution = index.highest_resolution if index else None
+        self.resolution_var.set(highest_resolution or "?")
         
         # Dateigröße
         try:
-            best_stream = None
-            if self.available_video_streams:
-                # Nehme den Stream mit der höchsten Auflösung
-                resolutions = sorted(self.available_video_streams.keys(), 
-                                   key=lambda x: int(x.replace('p', '')), 
-                                   reverse=True)
-                best_stream = self.available_video_streams[resolutions[0]] if resolutions else None
+            best_stream = index.video_streams[highest_resolution] if highest_resolution else None
             
             if best_stream and hasattr(best_stream, 'filesize'):
                 size_str = self.format_size(best_stream.filesize)
                 
                 # Wenn es sich um einen adaptiven Stream handelt, zeige auch die Audio-Größe an
-                if not best_stream.is_progressive and self.best_audio_stream:
-                    size_str += f" + {self.format_size(self.best_audio_stream.filesize)} (Audio)"
+                audio_stream = index.mux_audio() if not best_stream.is_progressive else None
+                if audio_stream:
+                    size_str += f" + {self.format_size(audio_stream.filesize)} (Audio)"
                 
                 self.size_var.set(size_str)
             else:
@@ -776,28 +4485,74 @@ class FetchioDownloader:
         # Status zurücksetzen
         self.status_var.set("Bereit")
     
+    def show_job_menu(self, event):
+        """Kontextmenü der Warteschlange öffnen (Zeile unter dem Mauszeiger auswählen)"""
+        row = self.job_list.identify_row(event.y)
+        if not row:
+            return
+        if row not in self.job_list.selection():
+            self.job_list.selection_set(row)
+        self.job_menu.tk_popup(event.x_root, event.y_root)
+    
+    def set_job_weight(self, weight):
+        """Gewicht der ausgewählten Aufträge setzen - wirkt ab dem nächsten Chunk"""
+        for iid in self.job_list.selection():
+            self.jobs_by_id[int(iid)].weight = weight
+    
     def abort_download(self):
-        """Download-Vorgang abbrechen"""
-        if not self.download_in_progress:
+        """Ausgewählte Aufträge abbrechen (ohne Auswahl alle laufenden)"""
+        selected = [self.jobs_by_id[int(iid)] for iid in self.job_list.selection()]
+        jobs = [job for job in selected if not job.finished]
+        if not jobs:
+            # Ohne Auswahl alles abbrechen - auch noch laufende Playlist-Auflösungen
+            jobs = self.queue.active_jobs()
+            for cancel_event in self.pending_collections:
+                cancel_event.set()
+        if not jobs and not self.pending_collections:
             return
-            
-        self.abort_requested = True
+        
+        for job in jobs:
+            self.queue.abort(job)
         self.status_var.set("Breche Download ab...")
     
-    def start_download(self):
-        """Download in einem separaten Thread starten"""
-        # Wenn bereits ein Download läuft, nicht erneut starten
-        if self.download_in_progress:
+    def import_url_list(self):
+        """Textdatei mit einer URL pro Zeile in die Warteschlange übernehmen"""
+        filename = filedialog.askopenfilename(
+            title="URL-Liste importieren",
+            filetypes=[("Textdateien", "*.txt"), ("Alle Dateien", "*.*")]
+        )
+        if not filename:
             return
-            
-        url = self.url_var.get().strip()
-        if not url:
+        
+        try:
+            with open(filename, "r", encoding="utf-8") as f:
+                urls = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        except Exception as e:
+            messagebox.showerror("Fehler", f"URL-Liste konnte nicht gelesen werden: {str(e)}")
+            return
+        
+        self.start_download(urls)
+    
+    def start_download(self, urls=None):
+        """Download-Aufträge für die eingegebene(n) URL(s) in die Warteschlange stellen"""
+        # Mehrere URLs können durch Leerzeichen oder Zeilenumbrüche getrennt werden
+        if urls is None:
+            urls = self.url_var.get().split()
+        if not urls:
             messagebox.showerror("Fehler", "Bitte geben Sie eine YouTube-URL ein")
             return
         
-        # Prüfen, ob URL gültig ist
-        if not re.match(r'^(https?://)?(www\.)?(youtube\.com|youtu\.be)/.+$', url):
-            messagebox.showerror("Fehler", "Bitte geben Sie eine gültige YouTube-URL ein")
+        # Prüfen, ob URLs gültig sind
+        invalid_urls = [url for url in urls if not is_valid_url(url)]
+        if invalid_urls:
+            messagebox.showerror("Fehler", f"Bitte geben Sie eine gültige YouTube-URL ein:\n\n{invalid_urls[0]}")
+            return
+        
+        # Die FFmpeg-Prüfungen unten dürfen den Tk-Thread nicht blockieren - läuft die Suche
+        # noch, startet ffmpeg_probed() den Download nach ihrem Ende
+        if not self.engine.ffmpeg_ready:
+            self.deferred_urls = urls
+            self.status_var.set("FFmpeg wird geprüft...")
             return
         
         # Download-Pfad prüfen
@@ -818,593 +4573,239 @@ class FetchioDownloader:
                 "Möchten Sie stattdessen die Audiodatei im Originalformat (m4a) herunterladen?",
                 icon="warning"
             )
-            if not result:
-                return
-        
-        # Prüfen ob ein adaptive Stream gewählt wurde aber kein FFmpeg vorhanden ist
-        selected_quality = self.quality_var.get()
-        if self.format_var.get() == "mp4" and "* (beste)" in selected_quality and not self.ffmpeg_path:
-            messagebox.showerror(
-                "Fehler",
-                "FFmpeg wurde nicht gefunden, daher ist das Kombinieren von Video und Audio nicht möglich.\n\n"
-                "Bitte wählen Sie eine andere Qualität oder installieren Sie FFmpeg."
-            )
-            return
-        
-        # UI während Download anpassen
-        self.download_button["state"] = "disabled"
-        self.abort_button["state"] = "normal"
-        self.progress_var.set(0)
-        self.status_var.set("Lade Video-Informationen...")
-        
-        # Zeitvariablen zurücksetzen
-        self.elapsed_var.set("")
-        self.remaining_var.set("")
-        self.filesize_var.set("")
-        self.speed_var.set("")
-        
-        # Videoformat und Qualität
-        format_type = self.format_var.get()
-        quality = self.quality_var.get()
-        
-        # Download-Status setzen
-        self.download_in_progress = True
-        self.abort_requested = False
-        
-        # Download-Thread starten
-        self.download_thread = threading.Thread(
-            target=self.download_video,
-            args=(url, output_path, format_type, quality)
-        )
-        self.download_thread.daemon = True
-        self.download_thread.start()
-    
-    def download_video(self, url, output_path, format_type, quality):
-        """Video herunterladen (läuft in separatem Thread)"""
-        try:
-            # Zeitvariablen initialisieren
-            self.download_start_time = time.time()
-            self.last_update_time = self.download_start_time
-            self.last_bytes_downloaded = 0
-            
-            # Fortschritts-Callback
-            def progress_callback(stream, chunk, bytes_remaining):
-                # Abbruch prüfen
-                if self.abort_requested:
-                    # PyTubefix hat keine integrierte Möglichkeit, den Download zu stoppen,
-                    # daher lösen wir eine Exception aus, um den Prozess zu beenden
-                    raise Exception("Download abgebrochen")
-                
-                total_size = stream.filesize
-                bytes_downloaded = total_size - bytes_remaining
-                percentage = bytes_downloaded / total_size * 100
-                
-                # Zeitberechnungen
-                current_time = time.time()
-                elapsed_time = current_time - self.download_start_time
-                
-                # Nur alle 0.5 Sekunden aktualisieren, um UI-Überlastung zu vermeiden
-                if current_time - self.last_update_time >= 0.5:
-                    # Download-Geschwindigkeit (Bytes pro Sekunde)
-                    download_speed = (bytes_downloaded - self.last_bytes_downloaded) / (current_time - self.last_update_time)
-                    
-                    # Verbleibende Zeit schätzen
-                    if download_speed > 0:
-                        remaining_time = bytes_remaining / download_speed
-                    else:
-                        remaining_time = 0
-                    
-                    # UI im Hauptthread aktualisieren
-                    self.root.after(0, lambda: self.update_download_progress(
-                        percentage, 
-                        elapsed_time, 
-                        remaining_time,
-                        bytes_downloaded,
-                        download_speed
-                    ))
-                    
-                    # Werte für nächste Berechnung aktualisieren
-                    self.last_bytes_downloaded = bytes_downloaded
-                    self.last_update_time = current_time
-                else:
-                    # Nur den Fortschrittsbalken aktualisieren
-                    self.root.after(0, lambda: self.progress_var.set(percentage))
-            
-            # YouTube-Objekt erstellen
-            yt = self.yt if self.yt else YouTube(url, on_progress_callback=progress_callback)
-            
-            # Video-Informationen im Hauptthread anzeigen, wenn noch nicht geschehen
-            if not self.yt:
-                self.root.after(0, lambda: self.update_video_info(yt))
-            
-            # Video herunterladen
-            if format_type == "mp4":
-                self.root.after(0, lambda: self.status_var.set("Lade Video herunter..."))
-                
-                # Stream basierend auf der gewählten Qualität finden
-                stream = None
-                requires_muxing = False
-                
-                if quality == "highest":
-                    # Höchste verfügbare Qualität (auch adaptive Streams)
-                    # Wenn wir bereits Video-Info haben, nutze die gespeicherten Streams
-                    if self.available_video_streams:
-                        # Nach numerischer Auflösung sortieren
-                        resolutions = sorted(self.available_video_streams.keys(), 
-                                          key=lambda x: int(x.replace('p', '')), 
-                                          reverse=True)
-                        if resolutions:
-                            highest_res = resolutions[0]
-                            stream = self.available_video_streams[highest_res]
-                            requires_muxing = not stream.is_progressive
-                        else:
-                            # Fallback zur Standard-Methode
-                            stream = yt.streams.get_highest_resolution()
-                    else:
-                        # Wenn wir noch keine Streams geladen haben, hole alle verfügbaren Streams
-                        mp4_streams = yt.streams.filter(file_extension="mp4", type="video").order_by('resolution').desc()
-                        webm_streams = yt.streams.filter(file_extension="webm", type="video").order_by('resolution').desc()
-                        
-                        all_streams = list(mp4_streams) + list(webm_streams)
-                        highest_res_stream = None
-                        highest_resolution_value = 0
-                        
-                        # Finde Stream mit höchster Auflösung
-                        for stream_item in all_streams:
-                            if stream_item.resolution:
-                                resolution_value = int(stream_item.resolution.replace('p', ''))
-                                if resolution_value > highest_resolution_value:
-                                    highest_resolution_value = resolution_value
-                                    highest_res_stream = stream_item
-                        
-                        if highest_res_stream:
-                            stream = highest_res_stream
-                            requires_muxing = not stream.is_progressive
-                            
-                            # Besten Audio-Stream finden, wenn er noch nicht gefunden wurde
-                            if not self.best_audio_stream and requires_muxing:
-                                audio_streams = yt.streams.filter(only_audio=True).order_by('abr').desc()
-                                self.best_audio_stream = audio_streams.first() if audio_streams else None
-                        else:
-                            # Fallback zur Standard-Methode
-                            stream = yt.streams.get_highest_resolution()
-                elif "* (beste)" in quality:
-                    # Adaptive Stream (benötigt Muxing)
-                    # Auflösung aus dem String extrahieren (z.B. "1080p* (beste)" -> "1080p")
-                    resolution = quality.split("*")[0].strip()
-                    
-                    # Stream aus dem Cache holen
-                    if resolution in self.available_video_streams:
-                        stream = self.available_video_streams[resolution]
-                        requires_muxing = not stream.is_progressive
-                else:
-                    # Spezifische Qualität (z.B. 1080p, 720p, etc.)
-                    # Zuerst versuchen wir progressive Streams (Video + Audio zusammen)
-                    stream = yt.streams.filter(progressive=True, file_extension="mp4", resolution=quality).first()
-                    
-                    # Wenn kein passender Stream gefunden wurde, versuchen wir adaptive Streams
-                    if not stream:
-                        print(f"Kein progressiver Stream für {quality} gefunden, verwende adaptiven Stream...")
-                        stream = yt.streams.filter(adaptive=True, file_extension="mp4", resolution=quality).first()
-                        if stream:
-                            requires_muxing = True
-                    
-                    # Wenn immer noch kein Stream gefunden wurde, fallback zur höchsten Auflösung
-                    if not stream:
-                        print(f"Keine {quality} Auflösung verfügbar, verwende höchste verfügbare Auflösung")
-                        stream = yt.streams.get_highest_resolution()
-                
-                if not stream:
-                    raise Exception("Kein passender Video-Stream gefunden")
-                
-                print(f"Ausgewählter Stream: {stream.resolution}, {stream.fps} fps, {self.format_size(stream.filesize)}")
-                
-                if requires_muxing and self.ffmpeg_path:
-                    self.root.after(0, lambda: self.status_var.set("Lade Video herunter (Phase 1/3)..."))
-                    
-                    # Temporäre Dateinamen generieren
-                    temp_video_file = os.path.join(tempfile.gettempdir(), f"video_{int(time.time())}.{stream.subtype}")
-                    
-                    # Video-Stream herunterladen
-                    stream.download(output_path=tempfile.gettempdir(), filename=os.path.basename(temp_video_file))
-                    
-                    # Nach dem ersten Download Abbruch prüfen
-                    if self.abort_requested:
-                        raise Exception("Download abgebrochen")
-                    
-                    # Audio-Stream herunterladen
-                    if self.best_audio_stream:
-                        self.root.after(0, lambda: self.status_var.set("Lade Audio herunter (Phase 2/3)..."))
-                        self.root.after(0, lambda: self.progress_var.set(0))  # Fortschritt zurücksetzen
-                        
-                        # Zeitvariablen für Audio-Download zurücksetzen
-                        self.download_start_time = time.time()
-                        self.last_update_time = self.download_start_time
-                        self.last_bytes_downloaded = 0
-                        
-                        temp_audio_file = os.path.join(tempfile.gettempdir(), f"audio_{int(time.time())}.{self.best_audio_stream.subtype}")
-                        self.best_audio_stream.download(output_path=tempfile.gettempdir(), filename=os.path.basename(temp_audio_file))
-                        
-                        # Noch einmal Abbruch prüfen
-                        if self.abort_requested:
-                            raise Exception("Download abgebrochen")
-                            
-                        # Zieldateiname generieren
-                        sanitized_title = re.sub(r'[\\/*?:"<>|]', "_", yt.title)  # Ungültige Zeichen entfernen
-                        output_file = os.path.join(output_path, f"{sanitized_title}.mp4")
-                        
-                        # Mit FFmpeg kombinieren
-                        self.root.after(0, lambda: self.status_var.set("Kombiniere Video und Audio (Phase 3/3)..."))
-                        self.root.after(0, lambda: self.set_progress_indeterminate(True))  # Animation starten
-                        
-                        combine_success = self.combine_video_audio(temp_video_file, temp_audio_file, output_file)
-                        
-                        # Temporäre Dateien löschen
-                        try:
-                            os.remove(temp_video_file)
-                            os.remove(temp_audio_file)
-                        except:
-                            pass
-                        
-                        if combine_success:
-                            # Animation stoppen
-                            self.root.after(0, lambda: self.set_progress_indeterminate(False))
-                            
-                            # Download abgeschlossen
-                            self.root.after(0, lambda: self.download_completed(output_file))
-                        else:
-                            # Animation stoppen
-                            self.root.after(0, lambda: self.set_progress_indeterminate(False))
-                            
-                            # Fehler beim Kombinieren - Nur Video behalten
-                            error_msg = "Kombinieren von Video und Audio fehlgeschlagen. Nur Video-Stream wird gespeichert."
-                            # Kopiere das Video in das Ausgabeverzeichnis
-                            fallback_file = os.path.join(output_path, f"{sanitized_title}_video_only.{stream.subtype}")
-                            shutil.copy2(temp_video_file, fallback_file)
-                            self.root.after(0, lambda: self.download_completed(fallback_file, error_msg))
-                    else:
-                        # Kein Audio-Stream gefunden - Nur Video speichern
-                        sanitized_title = re.sub(r'[\\/*?:"<>|]', "_", yt.title)
-                        fallback_file = os.path.join(output_path, f"{sanitized_title}_video_only.{stream.subtype}")
-                        shutil.copy2(temp_video_file, fallback_file)
-                        self.root.after(0, lambda: self.download_completed(
-                            fallback_file, 
-                            "Kein Audio-Stream gefunden. Nur Video wird gespeichert."
-                        ))
-                else:
-                    # Normaler Download ohne Muxing
-                    file_path = stream.download(output_path=output_path)
-                    
-                    # Download abgeschlossen
-                    self.root.after(0, lambda: self.download_completed(file_path))
-                
-            elif format_type == "mp3":
-                self.root.after(0, lambda: self.status_var.set("Lade Audio herunter..."))
-                
-                # Audio-Stream basierend auf Qualität auswählen
-                stream = None
-                
-                if quality == "highest":
-                    # Höchste Audioqualität
-                    stream = yt.streams.filter(only_audio=True).order_by("abr").desc().first()
-                else:
-                    # Versuchen, die angegebene Audioqualität zu finden (z.B. 192kbps)
-                    # Entferne "kbps" vom String für den Vergleich
-                    target_abr = quality.replace("kbps", "")
-                    
-                    # Suche nach einem Stream mit passender Bitrate
-                    audio_streams = yt.streams.filter(only_audio=True).order_by("abr").desc()
-                    
-                    for audio_stream in audio_streams:
-                        # Extrahiere Bitrate für Vergleich (z.B. "128kbps" -> "128")
-                        if hasattr(audio_stream, 'abr') and audio_stream.abr:
-                            stream_abr = audio_stream.abr.replace("kbps", "")
-                            if stream_abr == target_abr:
-                                stream = audio_stream
-                                break
-                    
-                    # Wenn keine exakte Übereinstimmung gefunden wurde, nimm den nächstbesten Stream
-                    if not stream:
-                        stream = yt.streams.filter(only_audio=True).order_by("abr").desc().first()
-                
-                if not stream:
-                    raise Exception("Kein Audio-Stream gefunden")
-                
-                print(f"Ausgewählter Audio-Stream: {stream.abr if hasattr(stream, 'abr') else 'unbekannte Bitrate'}")
-                
-                # Audio herunterladen
-                temp_file = stream.download(output_path=output_path)
-                
-                # Merke dir die original Audio-Datei für möglichen Abbruch
-                self.last_audio_file = temp_file
-                
-                # Zu MP3 konvertieren wenn FFmpeg verfügbar
-                if self.ffmpeg_path:
-                    # MP3-Konvertierung starten
-                    self.root.after(0, lambda: self.status_var.set("Konvertiere zu MP3..."))
-                    
-                    # Ladeanimation für Progressbar starten
-                    self.root.after(0, lambda: self.set_progress_indeterminate(True))
-                    
-                    # Zeit- und Geschwindigkeitsanzeige während Konvertierung anpassen
-                    self.root.after(0, lambda: self.elapsed_var.set("Konvertierung läuft..."))
-                    self.root.after(0, lambda: self.remaining_var.set(""))
-                    self.root.after(0, lambda: self.filesize_var.set(""))
-                    self.root.after(0, lambda: self.speed_var.set(""))
-                    
-                    # Basisname für MP3-Datei
-                    base_file = os.path.splitext(temp_file)[0]  # Ohne Erweiterung
-                    mp3_file = base_file + ".mp3"
-                    
-                    # Bitrate für MP3-Konvertierung festlegen
-                    bitrate = "192k"  # Standardwert
-                    if quality == "192kbps":
-                        bitrate = "192k"
-                    elif quality == "128kbps":
-                        bitrate = "128k"
-                    elif quality == "96kbps":
-                        bitrate = "96k"
-                    elif quality == "64kbps":
-                        bitrate = "64k"
-                    
-                    # FFmpeg-Konvertierung starten
-                    conversion_success = self.convert_to_mp3(temp_file, mp3_file, bitrate)
-                    
-                    # Animation stoppen
-                    self.root.after(0, lambda: self.set_progress_indeterminate(False))
-                    
-                    # Prüfen, ob Abbruch angefordert wurde
-                    if self.abort_requested:
-                        # Keine Fehlermeldung, stattdessen direkt den Abbruch-Prozess ausführen
-                        self.root.after(0, lambda: self.download_aborted())
-                    elif conversion_success:
-                        # Temporäre Datei löschen
-                        try:
-                            os.remove(temp_file)
-                            self.last_audio_file = None  # Referenz zurücksetzen
-                        except:
-                            pass
-                        
-                        # Download abgeschlossen
-                        self.root.after(0, lambda: self.download_completed(mp3_file))
-                    else:
-                        # Echter Fehler bei der Konvertierung - Original behalten
-                        error_msg = "Konvertierung zu MP3 fehlgeschlagen. Datei bleibt im Originalformat."
-                        self.root.after(0, lambda: self.download_completed(temp_file, error_msg))
-                else:
-                    # Kein FFmpeg verfügbar, Audio im Originalformat behalten
-                    self.root.after(0, lambda: self.download_completed(
-                        temp_file, 
-                        "FFmpeg nicht gefunden. Audio bleibt im Originalformat."
-                    ))
-            else:
-                raise Exception(f"Unbekanntes Format: {format_type}")
-                
-        except Exception as e:
-            # Wenn es ein Abbruch war, zeige keine Fehlermeldung
-            if self.abort_requested:
-                self.root.after(0, lambda: self.download_aborted())
-            else:
-                # Fehler im Hauptthread anzeigen
-                error_message = str(e)
-                self.root.after(0, lambda: self.download_error(error_message))
-    
-    def combine_video_audio(self, video_file, audio_file, output_file):
-        """Video und Audio mit FFmpeg kombinieren"""
-        if not self.ffmpeg_path:
-            return False
-        
-        try:
-            print(f"Kombiniere {video_file} und {audio_file} zu {output_file}")
-            
-            # Abbruch überprüfen
-            if self.abort_requested:
-                return False
-            
-            # Sicherstellen, dass die Ausgabedatei nicht schon existiert
-            if os.path.exists(output_file):
-                try:
-                    os.remove(output_file)
-                except:
-                    pass
-                
-            # FFmpeg-Prozess starten - Windows-spezifische Flags zur Verhinderung des Konsolenfensters
-            startupinfo = None
-            if os.name == 'nt':
-                # Importiere subprocess.STARTUPINFO in Windows
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                startupinfo.wShowWindow = 0  # SW_HIDE
-
-            process = subprocess.Popen(
-                [
-                    self.ffmpeg_path,
-                    "-i", video_file,     # Video-Eingabe
-                    "-i", audio_file,     # Audio-Eingabe
-                    "-c:v", "copy",       # Video-Codec kopieren (keine Neucodierung)
-                    "-c:a", "aac",        # Audio zu AAC konvertieren (MP4-kompatibel)
-                    "-strict", "experimental",
-                    "-y",                 # Überschreiben ohne Nachfrage
-                    output_file
-                ],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                startupinfo=startupinfo,  # Windows-spezifisch für verstecktes Fenster
-                bufsize=10**8  # Großer Buffer, um Blockieren zu vermeiden
-            )
-            
-            # Thread zur Überwachung des Abbruch-Status
-            abort_thread_active = True
+            if not result:
+                return
+        
+        # Prüfen ob ein adaptive Stream gewählt wurde aber kein FFmpeg vorhanden ist
+        selected_quality = self.quality_var.get()
+        if self.format_var.get() == "mp4" and "* (beste)" in selected_quality and not self.ffmpeg_path:
+            messagebox.showerror(
+                "Fehler",
+                "FFmpeg wurde nicht gefunden, daher ist das Kombinieren von Video und Audio nicht möglich.\n\n"
+                "Bitte wählen Sie eine andere Qualität oder installieren Sie FFmpeg."
+            )
+            return
+        
+        # Neue Serie beginnen, wenn die Warteschlange leer war
+        if not self.queue.active_jobs() and not self.pending_collections:
+            self.batch_jobs = []
+            self.batch_start_time = time.time()
+            self.progress_var.set(0)
+            self.elapsed_var.set("")
+            self.remaining_var.set("")
+            self.filesize_var.set("")
+            self.speed_var.set("")
+        
+        self.abort_button["state"] = "normal"
+        self.status_var.set("Lade Video-Informationen...")
+        
+        # Videoformat und Qualität
+        format_type = self.format_var.get()
+        quality = self.quality_var.get()
+        
+        for url in urls:
+            # Playlists und Kanäle werden im Hintergrund in einzelne Videos aufgelöst
+            if is_collection_url(url):
+                self.enqueue_collection(url, output_path, format_type, quality)
+                continue
             
-            def check_abort():
-                while abort_thread_active and process.poll() is None:
-                    if self.abort_requested:
-                        try:
-                            process.terminate()
-                            # Zeit zum Beenden geben
-                            time.sleep(0.5)
-                            if process.poll() is None:
-                                process.kill()
-                                
-                            # Unvollständige Datei löschen
-                            if os.path.exists(output_file):
-                                os.remove(output_file)
-                        except:
-                            pass
-                    time.sleep(0.2)
+            job = DownloadJob(url, output_path, format_type, quality)
             
-            # Thread starten für Abbruchüberwachung
-            abort_thread = threading.Thread(target=check_abort)
-            abort_thread.daemon = True
-            abort_thread.start()
+            # Bereits geladene Video-Informationen weiterverwenden
+            if self.yt and url == self.yt_url:
+                job.yt = self.yt
+                job.stream_index = self.stream_index
+                job.title = self.yt.title
             
+            self.add_job(job)
+    
+    def add_job(self, job):
+        """Auftrag anzeigen und in die Warteschlange stellen"""
+        self.jobs_by_id[job.job_id] = job
+        self.batch_jobs.append(job)
+        self.job_list.insert("", tk.END, iid=str(job.job_id), values=self.job_row_values(job))
+        self.queue.submit(job)
+    
+    def enqueue_collection(self, url, output_path, format_type, quality):
+        """Playlist oder Kanal auflösen und jedes Video einreihen, sobald seine Metadaten vorliegen"""
+        cancel_event = threading.Event()
+        self.pending_collections.add(cancel_event)
+        self.status_var.set("Lade Playlist...")
+        
+        def on_resolved(video_url, yt, stream_index):
+            job = DownloadJob(video_url, output_path, format_type, quality, yt, stream_index)
+            if yt:
+                job.title = yt.title
+            self.root.after(0, lambda: self.add_job(job))
+        
+        errors = []
+        
+        def resolve_thread():
             try:
-                # Auf Prozessende warten
-                stdout, stderr = process.communicate()
-                
-                # Thread-Überwachung beenden
-                abort_thread_active = False
-                
-                # Ergebnis überprüfen
-                muxing_success = process.returncode == 0 and os.path.exists(output_file)
-                
-                # Bei Abbruch oder Fehler: Datei löschen
-                if (not muxing_success or self.abort_requested) and os.path.exists(output_file):
-                    try:
-                        os.remove(output_file)
-                        print(f"Fehlerhafte oder abgebrochene MP4-Datei gelöscht: {output_file}")
-                    except Exception as e:
-                        print(f"Fehler beim Löschen der Datei: {e}")
-                
-                if self.abort_requested:
-                    return False
-                
-                print(f"Muxing erfolgreich: {muxing_success}")
-                return muxing_success
-            finally:
-                # Sicherstellen, dass der Thread beendet wird
-                abort_thread_active = False
-                
-        except Exception as e:
-            print(f"Fehler beim Kombinieren: {e}")
-            
-            # Bei Ausnahme: Versuche die Datei zu löschen
-            if os.path.exists(output_file):
-                try:
-                    os.remove(output_file)
-                except:
-                    pass
-                
-            return False
+                title, count = self.resolver.resolve(
+                    url, on_resolved,
+                    on_error=lambda video_url, error: errors.append(video_url),
+                    cancel_event=cancel_event,
+                    skip=lambda video_url: self.archive.lookup(video_url, format_type, quality, output_path)
+                )
+                error_message = None
+            except Exception as e:
+                title, count = url, 0
+                error_message = str(e)
+            self.root.after(0, lambda: self.collection_resolved(cancel_event, title, count, len(errors), error_message))
+        
+        threading.Thread(target=resolve_thread, daemon=True).start()
     
-    def convert_to_mp3(self, input_file, output_file, bitrate="192k"):
-        """MP3-Konvertierung mit FFmpeg"""
-        if not self.ffmpeg_path:
-            return False
+    def collection_resolved(self, cancel_event, title, count, error_count, error_message=None):
+        """Auflösung einer Playlist bzw. eines Kanals ist abgeschlossen (läuft im Hauptthread)"""
+        self.pending_collections.discard(cancel_event)
         
+        if error_message:
+            messagebox.showerror("Fehler", f"Playlist konnte nicht geladen werden:\n\n{error_message}")
+        elif error_count:
+            print(f"{title}: {error_count} Videos konnten nicht geladen werden")
+        
+        print(f"{title}: {count} Videos eingereiht")
+        
+        # Serie abschließen, falls alle eingereihten Aufträge bereits fertig sind
+        if not self.pending_collections and not self.queue.active_jobs():
+            if self.batch_jobs:
+                self.batch_finished()
+            else:
+                self.reset_download_ui()
+                self.status_var.set("Bereit")
+
+    def progress_tick(self):
+        """Periodischer UI-Takt: Zustandswechsel und Fortschritt aller Aufträge anzeigen"""
         try:
-            print(f"Konvertiere {input_file} zu MP3 mit Bitrate {bitrate}")
-            
-            # Abbruch prüfen
-            if self.abort_requested:
-                return False
-                
-            # Sicherstellen, dass die Ausgabedatei nicht schon existiert
-            if os.path.exists(output_file):
-                try:
-                    os.remove(output_file)
-                except:
-                    pass
+            active_jobs = self.queue.active_jobs()
+            for job in self.progress.tick(active_jobs):
+                self.on_job_update(job)
             
-            # Windows-spezifische Flags zur Verhinderung des Konsolenfensters
-            startupinfo = None
-            if os.name == 'nt':
-                # Importiere subprocess.STARTUPINFO in Windows
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                startupinfo.wShowWindow = 0  # SW_HIDE
-            
-            # FFmpeg-Prozess starten mit optimierter Pipe-Kommunikation
-            process = subprocess.Popen(
-                [
-                    self.ffmpeg_path,
-                    "-i", input_file,     # Eingabedatei
-                    "-vn",                # Keine Videospur
-                    "-ab", bitrate,       # Audiobitrate
-                    "-ar", "44100",       # Sample Rate
-                    "-y",                 # Überschreiben ohne Nachfrage
-                    output_file
-                ],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                startupinfo=startupinfo,  # Windows-spezifisch für verstecktes Fenster
-                bufsize=10**8  # Großer Buffer, um Blockieren zu vermeiden
-            )
+            for job in active_jobs:
+                self.update_job_row(job)
             
-            # Thread zur Überwachung des Abbruch-Status
-            abort_thread_active = True
+            self.update_overall_progress()
+        finally:
+            self.root.after(int(self.progress.interval * 1000), self.progress_tick)
+    
+    def on_job_update(self, job):
+        """Zustandsänderung eines Auftrags in der UI anzeigen (läuft im Hauptthread)"""
+        self.update_job_row(job)
+        
+        if job.finished and job.job_id not in self.finished_job_ids:
+            self.finished_job_ids.add(job.job_id)
+            if not self.queue.active_jobs() and not self.pending_collections:
+                self.batch_finished()
+    
+    def update_job_row(self, job):
+        """Zeile eines Auftrags nur neu zeichnen, wenn sich die angezeigten Werte geändert haben"""
+        values = self.job_row_values(job)
+        if self.job_rows.get(job.job_id) != values and self.job_list.exists(str(job.job_id)):
+            self.job_list.item(str(job.job_id), values=values)
+            self.job_rows[job.job_id] = values
+    
+    def job_row_values(self, job):
+        """Spaltenwerte eines Auftrags für die Warteschlangen-Ansicht"""
+        if job.state == DownloadJob.FETCHING and job.total_bytes:
+            progress = f"{job.progress:.1f}%"
+            speed = f"{self.format_size(job.speed)}/s"
+        elif job.state in (DownloadJob.MUXING, DownloadJob.CONVERTING) and job.processing_progress is not None:
+            # Fortschritt laut FFmpeg, Geschwindigkeit als Vielfaches der Echtzeit
+            progress = f"{job.processing_progress:.1f}%"
+            speed = f"{job.processing_speed:.1f}x" if job.processing_speed else ""
+        elif job.state == DownloadJob.DONE:
+            progress = "100%"
+            speed = ""
+        else:
+            progress = ""
+            speed = ""
+        
+        return (job.title, f"{job.format_type.upper()} {job.quality}", job.status, progress, speed)
+    
+    def update_overall_progress(self):
+        """Gesamtfortschritt aller aktiven Aufträge anzeigen"""
+        active_jobs = self.queue.active_jobs()
+        if not active_jobs:
+            return
+        
+        fetching = [job for job in active_jobs if job.state == DownloadJob.FETCHING]
+        postprocessing = [job for job in active_jobs if job.state in (DownloadJob.MUXING, DownloadJob.CONVERTING)]
+        
+        if fetching:
+            if self.progress_bar["mode"] == "indeterminate":
+                self.set_progress_indeterminate(False)
             
-            def check_abort():
-                while abort_thread_active and process.poll() is None:
-                    if self.abort_requested:
-                        try:
-                            process.terminate()
-                            # Zeit zum Beenden geben
-                            time.sleep(0.5)
-                            if process.poll() is None:
-                                process.kill()
-                                
-                            # Unvollständige Datei löschen
-                            if os.path.exists(output_file):
-                                os.remove(output_file)
-                        except:
-                            pass
-                    time.sleep(0.2)
+            # Geglättete Gesamtwerte aller laufenden Übertragungen
+            bytes_downloaded = self.progress.bytes_downloaded
+            total_size = self.progress.total_bytes
+            percentage = bytes_downloaded / total_size * 100 if total_size > 0 else 0
+            elapsed_time = time.time() - self.batch_start_time
             
-            # Thread starten für Abbruchüberwachung
-            abort_thread = threading.Thread(target=check_abort)
-            abort_thread.daemon = True
-            abort_thread.start()
+            self.update_download_progress(percentage, elapsed_time, self.progress.remaining_time,
+                                          bytes_downloaded, self.progress.speed)
             
-            try:
-                # Auf Prozessende warten
-                stdout, stderr = process.communicate()
-                
-                # Thread-Überwachung beenden
-                abort_thread_active = False
-                
-                # Ergebnis überprüfen
-                conversion_success = process.returncode == 0 and os.path.exists(output_file)
-                
-                # Bei Abbruch oder Fehler: Datei löschen
-                if (not conversion_success or self.abort_requested) and os.path.exists(output_file):
-                    try:
-                        os.remove(output_file)
-                        print(f"Fehlerhafte oder abgebrochene MP3-Datei gelöscht: {output_file}")
-                    except Exception as e:
-                        print(f"Fehler beim Löschen der Datei: {e}")
-                
-                if self.abort_requested:
-                    return False
-                
-                print(f"Konvertierung erfolgreich: {conversion_success}")
-                return conversion_success
-            finally:
-                # Sicherstellen, dass der Thread beendet wird
-                abort_thread_active = False
-                
-        except Exception as e:
-            print(f"Fehler bei der Konvertierung: {e}")
+            if len(active_jobs) > 1:
+                self.status_var.set(f"{len(active_jobs)} Aufträge aktiv - Download: {percentage:.1f}% - "
+                                    f"{self.progress.phase_status()}")
+            else:
+                self.status_var.set(fetching[0].status if fetching[0].total_bytes == 0 else f"Download: {percentage:.1f}%")
+        elif postprocessing:
+            measured = [job for job in postprocessing if job.processing_progress is not None]
+            if measured:
+                # Fortschritt laut FFmpeg (-progress): Mittel über alle Nachbearbeitungen
+                if self.progress_bar["mode"] == "indeterminate":
+                    self.set_progress_indeterminate(False)
+                percentage = sum(job.processing_progress for job in measured) / len(measured)
+                self.progress_var.set(percentage)
+                self.elapsed_var.set(self.format_time(time.time() - self.batch_start_time))
+                self.remaining_var.set(self.format_time(max(job.processing_remaining_time for job in measured)))
+                speeds = [job.processing_speed for job in measured if job.processing_speed]
+                self.speed_var.set(f"{sum(speeds) / len(speeds):.1f}x Echtzeit" if speeds else "-")
+            elif self.progress_bar["mode"] != "indeterminate":
+                # Muxing/Konvertierung ohne messbaren Fortschritt - Ladeanimation anzeigen
+                self.set_progress_indeterminate(True)
             
-            # Bei Ausnahme: Versuche die Datei zu löschen
-            if os.path.exists(output_file):
-                try:
-                    os.remove(output_file)
-                except:
-                    pass
-                
-            return False
+            if len(active_jobs) == 1:
+                job = postprocessing[0]
+                self.status_var.set(job.status if job.processing_progress is None
+                                    else f"{job.status} {job.processing_progress:.0f}%")
+            else:
+                self.status_var.set(f"{len(active_jobs)} Aufträge aktiv - {len(postprocessing)} in Nachbearbeitung")
+        else:
+            self.status_var.set(f"{len(active_jobs)} Aufträge wartend")
+    
+    def batch_finished(self):
+        """Alle Aufträge der aktuellen Serie sind abgeschlossen"""
+        jobs = self.batch_jobs
+        self.batch_jobs = []
+        
+        done = [job for job in jobs if job.state == DownloadJob.DONE]
+        failed = [job for job in jobs if job.state == DownloadJob.FAILED]
+        
+        if not done and not failed:
+            self.download_aborted()
+        elif len(jobs) == 1 and done:
+            self.download_completed(done[0].output_file, done[0].message)
+        elif len(jobs) == 1:
+            self.download_error(failed[0].error)
+        else:
+            self.download_completed(
+                done[0].output_file if done else None,
+                f"{len(done)} von {len(jobs)} Downloads abgeschlossen"
+                + (f", {len(failed)} fehlgeschlagen" if failed else ""),
+                count=len(done)
+            )
     
+    def remove_finished_jobs(self):
+        """Abgeschlossene Aufträge aus der Warteschlangen-Ansicht entfernen"""
+        for job in list(self.jobs_by_id.values()):
+            if job.finished:
+                self.job_list.delete(str(job.job_id))
+                self.job_rows.pop(job.job_id, None)
+                del self.jobs_by_id[job.job_id]
+                self.queue.jobs.remove(job)
+
     def update_download_progress(self, percentage, elapsed_time, remaining_time, bytes_downloaded, download_speed):
         """Downloadfortschritt aktualisieren"""
         # Fortschrittsbalken
@@ -1423,33 +4824,17 @@ class FetchioDownloader:
     
     def format_time(self, seconds):
         """Zeit formatieren"""
-        if seconds < 0:
-            return "--:--"
-            
-        minutes, seconds = divmod(int(seconds), 60)
-        hours, minutes = divmod(minutes, 60)
-        
-        if hours > 0:
-            return f"{hours}:{minutes:02d}:{seconds:02d}"
-        else:
-            return f"{minutes}:{seconds:02d}"
+        return format_time(seconds)
     
     def format_size(self, size_bytes):
         """Dateigröße formatieren"""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.2f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.2f} PB"
+        return format_size(size_bytes)
     
-    def download_completed(self, file_path, message=None):
-        """Download abgeschlossen"""
-        self.progress_var.set(100)
-        
-        if message:
-            self.status_var.set(message)
-        else:
-            self.status_var.set("Download abgeschlossen!")
+    def reset_download_ui(self):
+        """Fortschrittsanzeige nach Ende einer Serie zurücksetzen"""
+        # Animation stoppen falls aktiv
+        if self.progress_bar["mode"] == "indeterminate":
+            self.set_progress_indeterminate(False)
         
         # Zeit- und Größen-Infos zurücksetzen
         self.elapsed_var.set("")
@@ -1457,166 +4842,101 @@ class FetchioDownloader:
         self.filesize_var.set("")
         self.speed_var.set("")
         
-        # UI-Status zurücksetzen
-        self.download_button["state"] = "normal"
         self.abort_button["state"] = "disabled"
-        self.download_in_progress = False
-        self.abort_requested = False
-        self.last_audio_file = None  # Audio-Datei-Referenz zurücksetzen
+    
+    def download_completed(self, file_path, message=None, count=1):
+        """Download abgeschlossen"""
+        self.reset_download_ui()
+        self.progress_var.set(100)
+        
+        if message:
+            self.status_var.set(message)
+        else:
+            self.status_var.set("Download abgeschlossen!")
         
         # Ergebnis anzeigen
+        if count == 1:
+            text = f"Download abgeschlossen!\n\nDatei: {os.path.basename(file_path)}"
+        else:
+            text = f"{message}!"
+        
+        if not file_path:
+            messagebox.showerror("Download-Fehler", text)
+            return
+        
         result = messagebox.askquestion(
             "Download abgeschlossen",
-            f"Download abgeschlossen!\n\nDatei: {os.path.basename(file_path)}\n\nMöchten Sie den Ordner öffnen?",
+            f"{text}\n\nMöchten Sie den Ordner öffnen?",
             icon="info"
         )
         
         if result == "yes":
-            # Ordner im Datei-Explorer öffnen
-            if os.name == "nt":  # Windows
-                os.startfile(os.path.dirname(file_path))
-            elif os.name == "posix":  # macOS and Linux
+            self.open_folder(os.path.dirname(file_path))
+    
+    def open_folder(self, folder):
+        """Ordner im Datei-Explorer öffnen"""
+        if os.name == "nt":  # Windows
+            os.startfile(folder)
+        elif os.name == "posix":  # macOS and Linux
+            try:
+                subprocess.run(["open", folder])
+            except:
                 try:
-                    subprocess.run(["open", os.path.dirname(file_path)])
+                    subprocess.run(["xdg-open", folder])
                 except:
-                    try:
-                        subprocess.run(["xdg-open", os.path.dirname(file_path)])
-                    except:
-                        pass
+                    pass
     
     def download_aborted(self):
         """Download wurde abgebrochen"""
-        # Animation stoppen falls aktiv
-        self.set_progress_indeterminate(False)
-        
+        self.reset_download_ui()
         self.progress_var.set(0)
         self.status_var.set("Download abgebrochen")
-        self.download_button["state"] = "normal"
-        self.abort_button["state"] = "disabled"
-        
-        # Bei MP3-Konvertierung auch die ursprüngliche Audiodatei löschen
-        if self.last_audio_file and os.path.exists(self.last_audio_file):
-            try:
-                os.remove(self.last_audio_file)
-                print(f"Ursprüngliche Audio-Datei nach Abbruch gelöscht: {self.last_audio_file}")
-            except Exception as e:
-                print(f"Fehler beim Löschen der ursprünglichen Audio-Datei: {e}")
-        
-        # Download-Status zurücksetzen
-        self.download_in_progress = False
-        self.abort_requested = False
-        self.last_audio_file = None
-        
-        # Zeit- und Größen-Infos zurücksetzen
-        self.elapsed_var.set("")
-        self.remaining_var.set("")
-        self.filesize_var.set("")
-        self.speed_var.set("")
-        
-        # Temporäre Dateien und unvollständige Ausgabedateien löschen
-        self.cleanup_temp_files()
-        
-        # Prüfen, ob es unvollständige MP4-Dateien im Zielverzeichnis gibt und diese auch löschen
-        try:
-            target_dir = self.path_var.get()
-            for filename in os.listdir(target_dir):
-                # Suche nach kürzlich erstellten MP4-Dateien, die möglicherweise unvollständig sind
-                filepath = os.path.join(target_dir, filename)
-                # Nur Dateien prüfen, die in den letzten 30 Sekunden erstellt/modifiziert wurden
-                file_mod_time = os.path.getmtime(filepath)
-                if time.time() - file_mod_time < 30 and filename.endswith('.mp4'):
-                    try:
-                        file_size = os.path.getsize(filepath)
-                        # Wenn Datei kleiner als 1 MB ist, ist sie wahrscheinlich unvollständig
-                        if file_size < 1024 * 1024:
-                            os.remove(filepath)
-                            print(f"Unvollständige MP4-Datei im Zielverzeichnis gelöscht: {filepath}")
-                    except Exception as e:
-                        print(f"Fehler beim Prüfen/Löschen der möglicherweise unvollständigen Datei: {e}")
-        except Exception as e:
-            print(f"Fehler beim Aufräumen des Zielverzeichnisses: {e}")
     
     def download_error(self, error_message):
         """Fehler anzeigen"""
-        # Animation stoppen falls aktiv
-        self.set_progress_indeterminate(False)
-        
+        self.reset_download_ui()
         self.progress_var.set(0)
         self.status_var.set(f"Fehler: {error_message}")
-        self.download_button["state"] = "normal"
-        self.abort_button["state"] = "disabled"
-        
-        # Bei MP3-Konvertierungsfehlern auch die ursprüngliche Audiodatei löschen, wenn gewünscht
-        if self.last_audio_file and os.path.exists(self.last_audio_file):
-            result = messagebox.askyesno(
-                "Ursprüngliche Audio-Datei",
-                f"Möchten Sie die ursprüngliche Audio-Datei behalten?\n\n{os.path.basename(self.last_audio_file)}",
-                icon="question"
-            )
-            if not result:  # Wenn nein (nicht behalten)
-                try:
-                    os.remove(self.last_audio_file)
-                    print(f"Ursprüngliche Audio-Datei nach Fehler gelöscht: {self.last_audio_file}")
-                except Exception as e:
-                    print(f"Fehler beim Löschen der ursprünglichen Audio-Datei: {e}")
         
-        # Download-Status zurücksetzen
-        self.download_in_progress = False
-        self.abort_requested = False
-        self.last_audio_file = None
+        messagebox.showerror("Download-Fehler", f"Beim Download ist ein Fehler aufgetreten:\n\n{error_message}")
+
+    @property
+    def ffmpeg_path(self):
+        """FFmpeg-Pfad der Engine - wartet auf die Suche im Hintergrund, im Tk-Thread daher nur
+        nach engine.ffmpeg_ready verwenden"""
+        return self.engine.ffmpeg_path
+    
+    def ffmpeg_probed(self, path):
+        """Ergebnis der FFmpeg-Suche im Hintergrund übernehmen"""
+        print(f"FFmpeg-Pfad: {path}")
         
-        # Zeit- und Größen-Infos zurücksetzen
-        self.elapsed_var.set("")
-        self.remaining_var.set("")
-        self.filesize_var.set("")
-        self.speed_var.set("")
+        # Falls FFmpeg nicht gefunden wurde, automatisch herunterladen
+        if not path:
+            self.status_var.set("FFmpeg nicht gefunden. Starte automatischen Download...")
+            self.root.after(100, self.download_ffmpeg)
         
-        # Temporäre Dateien löschen (falls vorhanden)
-        self.cleanup_temp_files()
+        # Während der Suche angeklickten Download jetzt starten
+        if self.deferred_urls:
+            urls, self.deferred_urls = self.deferred_urls, None
+            self.start_download(urls)
         
-        messagebox.showerror("Download-Fehler", f"Beim Download ist ein Fehler aufgetreten:\n\n{error_message}")
+        self.startup_finished("ffmpeg")
+    
+    def window_shown(self):
+        """Erster Durchlauf der Ereignisschleife - das Fenster ist sichtbar"""
+        self.root.update_idletasks()
+        STARTUP.mark("Fenster angezeigt")
+        self.startup_finished("window")
+    
+    def startup_finished(self, step):
+        """Startzeiten speichern (bzw. ausgeben), sobald Fenster und FFmpeg-Suche fertig sind"""
+        self.startup_pending.discard(step)
+        if self.startup_pending:
+            return
+        if self.startup_report:
+            print("\n".join(STARTUP.report()))
+        STARTUP.save(os.path.join(get_cache_dir(), "startup.jsonl"))
     
-    def cleanup_temp_files(self):
-        """Temporäre Dateien löschen"""
-        try:
-            temp_dir = tempfile.gettempdir()
-            removed_files = 0
-            failed_files = 0
-            
-            # Lösche alle temporären Dateien, die von Fetch.io erstellt wurden
-            for filename in os.listdir(temp_dir):
-                # Video, Audio oder teilweise fertige Ausgabedateien
-                if (filename.startswith(("video_", "audio_")) and 
-                    any(filename.endswith(ext) for ext in ['.mp4', '.webm', '.mp3', '.m4a', '.part'])):
-                    try:
-                        filepath = os.path.join(temp_dir, filename)
-                        
-                        # Versuche bis zu 3 Mal zu löschen (für den Fall, dass die Datei noch verwendet wird)
-                        for attempt in range(3):
-                            try:
-                                os.remove(filepath)
-                                print(f"Temporäre Datei gelöscht: {filepath}")
-                                removed_files += 1
-                                break
-                            except PermissionError:
-                                # Datei ist noch in Verwendung, kurz warten und erneut versuchen
-                                time.sleep(0.5)
-                            except Exception as e:
-                                print(f"Fehler beim Löschen von {filename}: {e}")
-                                failed_files += 1
-                                break
-                    except Exception as e:
-                        print(f"Fehler beim Zugriff auf {filename}: {e}")
-                        failed_files += 1
-            
-            if removed_files > 0:
-                print(f"{removed_files} temporäre Dateien wurden erfolgreich gelöscht.")
-            if failed_files > 0:
-                print(f"Bei {failed_files} temporären Dateien trat ein Fehler beim Löschen auf.")
-                
-        except Exception as e:
-            print(f"Fehler beim Aufräumen temporärer Dateien: {e}")
-
     def download_ffmpeg(self):
         """Lädt FFmpeg automatisch herunter, wenn es nicht gefunden wurde"""
         # Fortschrittsanzeige anzeigen
@@ -1660,88 +4980,315 @@ class FetchioDownloader:
     def _download_ffmpeg_thread(self, url, target_file, target_dir):
         """Lädt FFmpeg in einem separaten Thread herunter"""
         try:
-            import zipfile
-            import io
-            
-            # FFmpeg-Archiv herunterladen
-            response = requests.get(url, stream=True)
-            response.raise_for_status()
-            
-            # Größe des Downloads ermitteln
-            total_size = int(response.headers.get('content-length', 0))
+            installer = FFmpegInstaller(url, target_file, "ffmpeg.exe" if os.name == "nt" else "ffmpeg")
             
-            # Daten in Blöcken herunterladen und Fortschritt anzeigen
-            zip_data = io.BytesIO()
-            downloaded = 0
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    zip_data.write(chunk)
-                    downloaded += len(chunk)
-                    # Fortschritt berechnen und anzeigen
-                    if total_size > 0:
-                        percent = downloaded / total_size * 100
-                        self.root.after(0, lambda p=percent: self.progress_var.set(p))
-                        self.root.after(0, lambda d=downloaded: self.status_var.set(
-                            f"Lade FFmpeg herunter... {self.format_size(d)} von {self.format_size(total_size)} ({percent:.1f}%)"
-                        ))
-            
-            # Zurück zum Anfang der BytesIO-Datei
-            zip_data.seek(0)
+            # Archiv herunterladen (ein früherer, abgebrochener Download wird fortgesetzt)
+            installer.download(
+                lambda downloaded, total: self.root.after(0, lambda: self.update_ffmpeg_progress(downloaded, total))
+            )
             
             # Statusanzeige aktualisieren
             self.root.after(0, lambda: self.status_var.set("Extrahiere FFmpeg..."))
             self.root.after(0, lambda: self.set_progress_indeterminate(True))
             
-            # ZIP-Datei extrahieren
-            with zipfile.ZipFile(zip_data) as zipf:
-                # FFmpeg-Exe-Datei im ZIP suchen
-                ffmpeg_exe = None
-                for file in zipf.namelist():
-                    if os.name == "nt":  # Windows
-                        if file.endswith("ffmpeg.exe"):
-                            ffmpeg_exe = file
-                            break
-                    else:  # macOS/Linux
-                        if file.endswith("ffmpeg") and not file.endswith(".exe"):
-                            ffmpeg_exe = file
-                            break
-                
-                if ffmpeg_exe:
-                    # FFmpeg-Datei extrahieren
-                    with open(target_file, 'wb') as f:
-                        f.write(zipf.read(ffmpeg_exe))
-                    
-                    # Ausführungsrechte unter macOS/Linux setzen
-                    if os.name != "nt":
-                        os.chmod(target_file, 0o755)
-                    
-                    # FFmpeg-Pfad aktualisieren
-                    self.ffmpeg_path = target_file
-                    
-                    # Statusanzeige zurücksetzen
-                    self.root.after(0, lambda: self.status_var.set("FFmpeg wurde erfolgreich installiert!"))
-                    self.root.after(0, lambda: self.progress_var.set(100))
-                    
-                    # Nach 3 Sekunden auf "Bereit" zurücksetzen
-                    self.root.after(3000, lambda: self.status_var.set("Bereit"))
-                    self.root.after(3000, lambda: self.progress_var.set(0))
-                else:
-                    # Keine FFmpeg-Datei im ZIP gefunden
-                    self.root.after(0, lambda: self.status_var.set("Fehler: FFmpeg-Datei nicht im Archiv gefunden."))
+            installer.verify()
+            installer.extract()
+            
+            # FFmpeg-Pfad aktualisieren
+            self.engine.ffmpeg_path = target_file
+            
+            # Statusanzeige zurücksetzen
+            self.root.after(0, lambda: self.status_var.set("FFmpeg wurde erfolgreich installiert!"))
+            self.root.after(0, lambda: self.progress_var.set(100))
+            
+            # Nach 3 Sekunden auf "Bereit" zurücksetzen
+            self.root.after(3000, lambda: self.status_var.set("Bereit"))
+            self.root.after(3000, lambda: self.progress_var.set(0))
         
         except Exception as e:
-            # Bei Fehler Statusanzeige aktualisieren
-            self.root.after(0, lambda: self.status_var.set(f"Fehler beim Herunterladen von FFmpeg: {str(e)}"))
-            print(f"Fehler beim Herunterladen von FFmpeg: {e}")
+            # Bei Fehler Statusanzeige aktualisieren (e ist nach dem except-Block nicht mehr gebunden)
+            message = f"Fehler beim Herunterladen von FFmpeg: {e}"
+            self.root.after(0, lambda: self.status_var.set(message))
+            print(message)
         
         finally:
             # Animation stoppen
             self.root.after(0, lambda: self.set_progress_indeterminate(False))
+    
+    def update_ffmpeg_progress(self, downloaded, total):
+        """Fortschritt des FFmpeg-Downloads anzeigen (gedrosselt durch den FFmpegInstaller)"""
+        if total > 0:
+            percent = downloaded / total * 100
+            if self.progress_bar["mode"] == "indeterminate":
+                self.set_progress_indeterminate(False)
+            self.progress_var.set(percent)
+            self.status_var.set(
+                f"Lade FFmpeg herunter... {self.format_size(downloaded)} von {self.format_size(total)} ({percent:.1f}%)"
+            )
+        else:
+            self.status_var.set(f"Lade FFmpeg herunter... {self.format_size(downloaded)}")
+
+def parse_arguments(argv=None):
+    """Kommandozeilenargumente auswerten"""
+    parser = argparse.ArgumentParser(
+        prog="fetchio",
+        description="Fetch.io - YouTube-Downloader (ohne Argumente startet die grafische Oberfläche)"
+    )
+    parser.add_argument("urls", nargs="*", metavar="URL", help="YouTube-URL(s) für den Headless-Modus")
+    parser.add_argument("--headless", action="store_true",
+                        help="Ohne grafische Oberfläche herunterladen (z.B. auf Servern oder per Cron)")
+    parser.add_argument("-i", "--input", metavar="DATEI",
+                        help="Datei mit einer URL pro Zeile ('-' für Standardeingabe)")
+    parser.add_argument("-f", "--format", choices=["mp4", "mp3", "audio"], default="mp4",
+                        help="Ausgabeformat, 'audio' = Audiospur ohne Umwandlung (Standard: mp4)")
+    parser.add_argument("-q", "--quality", default="highest",
+                        help="Qualität, z.B. highest, 1080p, 720p, 192kbps für MP3 oder m4a für audio (Standard: highest)")
+    parser.add_argument("-o", "--output", default=os.path.join(os.path.expanduser("~"), "Downloads"),
+                        help="Ausgabeverzeichnis (Standard: ~/Downloads)")
+    parser.add_argument("-j", "--jobs", type=int, default=3, help="Gleichzeitige Downloads (Standard: 3)")
+    parser.add_argument("-c", "--connections", type=int, default=4,
+                        help="Parallele Verbindungen pro Stream (Standard: 4)")
+    parser.add_argument("--no-streaming", dest="streaming", action="store_false",
+                        help="Downloads über Zwischendateien statt direkt an FFmpeg übergeben")
+    parser.add_argument("--resumable-streaming", action="store_true",
+                        help="Direkt übergebene Downloads zusätzlich zwischenspeichern, damit sie nach "
+                             "einem Abbruch fortgesetzt werden können (doppelte Schreibzugriffe)")
+    parser.add_argument("--ffmpeg-processes", type=int, default=None, metavar="N",
+                        help="Maximal gleichzeitig laufende FFmpeg-Prozesse (Standard: Anzahl CPU-Kerne)")
+    parser.add_argument("--limit-rate", type=rate_value, default=0, metavar="RATE",
+                        help="Gesamte Bandbreite begrenzen, z.B. 500K oder 2M (Bytes/s, Standard: unbegrenzt)")
+    parser.add_argument("--work-dir", metavar="VERZEICHNIS",
+                        help="Verzeichnis für Zwischendateien (Standard: FETCHIO_WORK_DIR bzw. System-Temp)")
+    parser.add_argument("--no-cache", dest="metadata_cache", action="store_false",
+                        help="Video-Informationen immer neu laden statt aus dem Metadaten-Cache")
+    parser.add_argument("--no-archive", dest="archive", action="store_false",
+                        help="Bereits heruntergeladene Videos erneut laden statt sie zu überspringen")
+    parser.add_argument("--rebuild-archive", metavar="VERZEICHNIS",
+                        help="Download-Archiv aus den Dateien eines Ausgabeverzeichnisses neu aufbauen")
+    parser.add_argument("--startup-report", action="store_true",
+                        default=bool(os.environ.get("FETCHIO_STARTUP_REPORT")),
+                        help="Aufschlüsselung der Startzeit ausgeben (auch über FETCHIO_STARTUP_REPORT=1)")
+    
+    # Auswahlregeln für Video- und Audio-Streams (StreamPolicy)
+    parser.add_argument("--max-resolution", type=resolution_value, metavar="AUFLÖSUNG",
+                        help="Höchstens diese Auflösung laden, z.B. 1080 oder 720p")
+    parser.add_argument("--prefer-fps", type=int, metavar="FPS", help="Bevorzugte Bildrate, z.B. 30 oder 60")
+    parser.add_argument("--prefer-codec", choices=sorted(StreamPolicy.CODEC_PREFIXES),
+                        help="Bevorzugter Video-Codec")
+    parser.add_argument("--max-filesize", type=float, metavar="MB",
+                        help="Höchstgröße von Video und Audio zusammen in MB")
+    parser.add_argument("--audio-language", metavar="SPRACHE",
+                        help="Bevorzugte Audiosprache bei mehreren Tonspuren, z.B. de oder en")
+    
+    # Unbekannte Argumente (z.B. -psn_* unter macOS) nur im GUI-Modus tolerieren
+    args, unknown = parser.parse_known_args(argv)
+    if args.headless and unknown:
+        parser.error(f"Unbekannte Argumente: {' '.join(unknown)}")
+    return args
+
+
+def read_url_list(source):
+    """URLs aus einer Datei (oder '-' für Standardeingabe) lesen, Kommentare ignorieren"""
+    f = sys.stdin if source == "-" else open(source, "r", encoding="utf-8")
+    try:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def run_headless(args):
+    """Downloads ohne grafische Oberfläche ausführen, gibt den Exit-Code zurück"""
+    urls = list(args.urls)
+    if args.input:
+        urls.extend(read_url_list(args.input))
+    
+    archive = DownloadArchive() if args.archive or args.rebuild_archive else None
+    if args.rebuild_archive:
+        ffmpeg_path = find_ffmpeg()
+        if not ffmpeg_path:
+            print("Fehler: Zum Neuaufbau des Download-Archivs wird FFmpeg benötigt")
+            return 1
+        try:
+            recorded, unknown = archive.rebuild(args.rebuild_archive, ffmpeg_path)
+        except OSError as e:
+            print(f"Fehler beim Neuaufbau des Download-Archivs: {e}")
+            return 1
+        print(f"Download-Archiv: {recorded} Datei(en) aus {args.rebuild_archive} eingetragen"
+              + (f", {unknown} ohne Video-Kennung übersprungen" if unknown else ""))
+        if not urls:
+            return 0
+    
+    if not urls:
+        print("Fehler: Keine URL angegeben")
+        return 2
+    
+    invalid_urls = [url for url in urls if not is_valid_url(url)]
+    if invalid_urls:
+        print(f"Fehler: Ungültige YouTube-URL: {invalid_urls[0]}")
+        return 2
+    
+    os.makedirs(args.output, exist_ok=True)
+    
+    policy = StreamPolicy(
+        max_resolution=args.max_resolution,
+        prefer_fps=args.prefer_fps,
+        prefer_codec=args.prefer_codec,
+        max_filesize=int(args.max_filesize * 1024 * 1024) if args.max_filesize else None,
+        audio_language=args.audio_language
+    )
+    
+    ffmpeg_path = find_ffmpeg()
+    if not ffmpeg_path:
+        print("Warnung: Ohne FFmpeg ist weder MP3-Konvertierung noch das Kombinieren von Video und Audio möglich.")
+    STARTUP.mark("FFmpeg-Suche")
+    
+    show_progress = sys.stdout.isatty()
+    progress = ProgressAggregator(interval=0.5)
+    
+    def report_progress():
+        """Zustandswechsel ausgeben und Fortschrittszeile aktualisieren (ein Takt)"""
+        active_jobs = queue.active_jobs()
+        for job in progress.tick(active_jobs):
+            if job.state == DownloadJob.FETCHING and job.total_bytes:
+                continue
+            if show_progress:
+                sys.stdout.write("\r")
+            print(f"[{job.job_id}] {job.status}: {job.title}")
+            if job.state == DownloadJob.DONE:
+                print(f"[{job.job_id}] Gespeichert: {job.output_file}")
+        
+        # Fortschritt nur im Terminal laufend überschreiben, nicht in Logdateien
+        fetching = [job for job in active_jobs if job.state == DownloadJob.FETCHING and job.total_bytes]
+        processing = [job for job in active_jobs if job.state in (DownloadJob.MUXING, DownloadJob.CONVERTING)
+                      and job.processing_progress is not None]
+        if not show_progress or not (fetching or processing):
+            return
+        
+        if not fetching:
+            # Nur Nachbearbeitung aktiv - Fortschritt laut FFmpeg anzeigen
+            job = processing[0]
+            line = f"[{job.job_id}] {job.STATE_LABELS[job.state]} {job.processing_progress:5.1f}%  " \
+                   f"{job.processing_speed:.1f}x  ETA {format_time(job.processing_remaining_time)}  {job.title[:50]}"
+        elif len(fetching) == 1:
+            job = fetching[0]
+            line = f"[{job.job_id}] {job.progress:5.1f}%  {format_size(job.speed)}/s  " \
+                   f"ETA {format_time(job.remaining_time)}  {job.title[:50]}"
+        else:
+            percentage = progress.bytes_downloaded / progress.total_bytes * 100 if progress.total_bytes else 0
+            line = f"{percentage:5.1f}%  ETA {format_time(progress.remaining_time)}  {progress.phase_status()}"
+        sys.stdout.write(f"\r{line}   ")
+        sys.stdout.flush()
+    
+    metadata_cache = MetadataCache() if args.metadata_cache else None
+    engine = DownloadEngine(ffmpeg_path, connections=args.connections, streaming=args.streaming,
+                            ffmpeg_processes=args.ffmpeg_processes, metadata_cache=metadata_cache,
+                            work_root=args.work_dir, archive=archive if args.archive else None,
+                            resumable_streaming=args.resumable_streaming)
+    queue = DownloadQueue(engine, workers=args.jobs, on_update=progress.mark)
+    
+    # Zwischendateien abgestürzter Läufe aufräumen
+    ScratchDir.reclaim(engine.work_root)
+    
+    if args.limit_rate:
+        BANDWIDTH.set_rate(args.limit_rate)
+    
+    jobs = []
+    resolve_errors = []
+    jobs_lock = threading.Lock()
+    cancel_event = threading.Event()
+    resolver = CollectionResolver(metadata_cache=metadata_cache)
+    
+    def submit(job):
+        with jobs_lock:
+            jobs.append(queue.submit(job))
+    
+    def resolve_collection(url):
+        def on_resolved(video_url, yt, stream_index):
+            job = DownloadJob(video_url, args.output, args.format, args.quality, yt, stream_index, policy)
+            if yt:
+                job.title = yt.title
+            submit(job)
+        
+        def archived(video_url):
+            return engine.archive and engine.archive.lookup(video_url, args.format, args.quality, args.output)
+        
+        try:
+            title, count = resolver.resolve(
+                url, on_resolved,
+                on_error=lambda video_url, error: resolve_errors.append((video_url, error)),
+                cancel_event=cancel_event,
+                skip=archived
+            )
+            print(f"{title}: {count} Videos eingereiht")
+        except Exception as e:
+            print(f"Fehler beim Laden der Playlist {url}: {e}")
+            resolve_errors.append((url, e))
+    
+    # Playlists und Kanäle parallel auflösen, Videos werden eingereiht, sobald sie bereitstehen
+    resolver_threads = []
+    for url in urls:
+        if is_collection_url(url):
+            thread = threading.Thread(target=resolve_collection, args=(url,), daemon=True)
+            thread.start()
+            resolver_threads.append(thread)
+        else:
+            submit(DownloadJob(url, args.output, args.format, args.quality, policy=policy))
+    
+    try:
+        # Im Takt des ProgressAggregator warten, damit Strg+C nicht blockiert wird
+        while True:
+            resolving = any(thread.is_alive() for thread in resolver_threads)
+            idle = queue.wait(progress.interval)
+            report_progress()
+            if idle:
+                if not resolving:
+                    break
+                time.sleep(progress.interval)
+    except KeyboardInterrupt:
+        print("\nBreche Downloads ab...")
+        cancel_event.set()
+        queue.abort_all()
+        queue.wait()
+        return 130
+    
+    done = [job for job in jobs if job.state == DownloadJob.DONE]
+    failed = [(job.url, job.error) for job in jobs if job.state == DownloadJob.FAILED] + resolve_errors
+    total = len(jobs) + len(resolve_errors)
+    print(f"{len(done)} von {total} Downloads abgeschlossen" + (f", {len(failed)} fehlgeschlagen" if failed else "")
+          + f" ({format_size(progress.transferred)} übertragen)")
+    if progress.phase_summary():
+        print(f"Phasen: {progress.phase_summary()}")
+    if engine.ffmpeg.process_count:
+        print(f"FFmpeg: {engine.ffmpeg.process_count} Prozess(e), CPU-Zeit {engine.ffmpeg.total_cpu_time:.1f} s, "
+              f"max. Speicher {format_size(engine.ffmpeg.peak_rss)}")
+    for url, error in failed:
+        print(f"  {url}: {error}")
+    if args.startup_report:
+        print("\n".join(STARTUP.report()))
+    
+    return 1 if failed else 0
+
 
 # Main-Funktion
 def main():
+    STARTUP.mark("Module importiert")
+    args = parse_arguments()
+    
+    # PyTubeFix wird erst bei der ersten Netzwerkaktion importiert - hier nur prüfen, ob es installiert ist
+    if importlib.util.find_spec("pytubefix") is None:
+        print("PyTubeFix nicht gefunden! Installiere mit: pip install pytubefix")
+        sys.exit(1)
+    
+    if args.headless or args.rebuild_archive:
+        sys.exit(run_headless(args))
+    
+    load_gui_modules()
+    STARTUP.mark("GUI-Module geladen")
+    
     root = tk.Tk()
     app = FetchioDownloader(root)
+    app.startup_report = args.startup_report
     
     # Sun Valley Theme falls verfügbar
     try:
@@ -1749,6 +5296,7 @@ def main():
         sv_ttk.set_theme("dark")
     except ImportError:
         pass
+    STARTUP.mark("Theme geladen")
     
     root.mainloop()
 
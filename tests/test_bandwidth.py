@@ -0,0 +1,135 @@
+"""Rate-Test des BandwidthLimiter gegen einen lokalen HTTP-Server
+
+Lädt mit SegmentedDownloader über mehrere Verbindungen und prüft, dass die globale
+Grenze eingehalten wird und sich gleichzeitige Aufträge die Bandbreite im Verhältnis
+ihrer Gewichte teilen. Gemessen wird an den Zuteilungen des Limiters (Zeitpunkt und
+Bytes jedes acquire()), nicht an der Laufzeit der Downloads - Verbindungsaufbau und
+eine ausgelastete Maschine verfälschen so nur die Untergrenze, die deshalb großzügig ist.
+
+Aufruf: python -m unittest discover tests
+"""
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import http.server
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fetchio
+
+MB = 1024 * 1024
+
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    """Liefert server.data mit Unterstützung für Range-Anfragen"""
+    
+    protocol_version = "HTTP/1.1"
+    
+    def log_message(self, *args):
+        pass
+    
+    def do_GET(self):
+        data = memoryview(self.server.data)
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else len(data) - 1
+            data = data[start:end + 1]
+            self.send_response(206)
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        try:
+            for offset in range(0, len(data), 64 * 1024):
+                self.wfile.write(data[offset:offset + 64 * 1024])
+        except OSError:
+            pass
+
+
+class BandwidthLimiterTest(unittest.TestCase):
+    # Erlaubte Abweichung nach oben (Rate bzw. Verhältnis der Gewichte)
+    TOLERANCE = 0.1
+    # Untergrenze der Rate - langsamer wird es nur durch eine ausgelastete Maschine
+    MIN_RATE_FACTOR = 0.5
+    
+    @classmethod
+    def setUpClass(cls):
+        fetchio.load_network_modules()
+        cls.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+        cls.server.data = os.urandom(8 * MB)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/data"
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.limiter = fetchio.BandwidthLimiter()
+        # (Zeitpunkt, Datenfluss, Bytes) jeder Zuteilung durch den Limiter
+        self.grants = []
+    
+    def tearDown(self):
+        self.limiter.set_rate(None)
+        self.temp_dir.cleanup()
+    
+    def throttle(self, amount, flow, weight):
+        self.limiter.acquire(amount, flow, weight)
+        self.grants.append((time.monotonic(), flow, amount))
+    
+    def download(self, size, flow, weight=1.0):
+        # Kleine Chunks, damit die Zuteilungen fein genug für das Verhältnis sind
+        downloader = fetchio.SegmentedDownloader(
+            connections=4, chunk_size=64 * 1024, throttle=lambda amount: self.throttle(amount, flow, weight))
+        downloader.download(self.url, os.path.join(self.temp_dir.name, f"{flow}.bin"), size)
+    
+    def granted_rate(self, grants):
+        """Rate der Zuteilungen nach der ersten (deren Bytes stammen aus dem Anfangsguthaben)"""
+        elapsed = grants[-1][0] - grants[0][0]
+        return sum(amount for _, _, amount in grants[1:]) / elapsed
+    
+    def test_global_cap(self):
+        """Vier Verbindungen zusammen überschreiten die Grenze nicht"""
+        rate = 2 * MB
+        self.limiter.set_rate(rate)
+        self.download(4 * MB, "job")
+        
+        measured = self.granted_rate(self.grants)
+        self.assertLessEqual(measured, rate * (1 + self.TOLERANCE))
+        self.assertGreaterEqual(measured, rate * self.MIN_RATE_FACTOR)
+    
+    def test_weight_split(self):
+        """Zwei Aufträge mit Gewicht 1 und 3 teilen sich die Grenze etwa 1:3"""
+        rate = 8 * MB
+        self.limiter.set_rate(rate)
+        
+        # Bei 1:3 werden beide Aufträge etwa gleichzeitig fertig
+        threads = [threading.Thread(target=self.download, args=(size, flow, weight))
+                   for flow, weight, size in (("light", 1.0, 2 * MB), ("heavy", 3.0, 6 * MB))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        # Nur Zuteilungen zählen, während beide Aufträge um die Bandbreite konkurrieren
+        flows = ("light", "heavy")
+        first = max(next(index for index, grant in enumerate(self.grants) if grant[1] == flow) for flow in flows)
+        last = min(max(index for index, grant in enumerate(self.grants) if grant[1] == flow) for flow in flows)
+        contended = self.grants[first:last + 1]
+        light = sum(amount for _, flow, amount in contended if flow == "light")
+        heavy = sum(amount for _, flow, amount in contended if flow == "heavy")
+        
+        measured = self.granted_rate(contended)
+        self.assertLessEqual(measured, rate * (1 + self.TOLERANCE))
+        self.assertGreaterEqual(measured, rate * self.MIN_RATE_FACTOR)
+        self.assertAlmostEqual(heavy / light, 3.0, delta=3.0 * self.TOLERANCE * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()